@@ -0,0 +1,89 @@
+import importlib.util
+
+from harness import benchmark
+
+from chirpstack_fuota_client import FuotaUtils, models
+from chirpstack_fuota_client.proto.fuota import fuota_pb2
+
+DEVICE_COUNTS = [1_000, 10_000, 100_000]
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def make_devices(count):
+    return [{"dev_eui": f"{i:016x}", "gen_app_key": f"{i:032x}"} for i in range(count)]
+
+
+def make_status(count):
+    status = fuota_pb2.GetDeploymentStatusResponse()
+    for field in ("created_at", "updated_at", "mc_group_setup_completed_at", "frag_session_setup_completed_at"):
+        getattr(status, field).seconds = 1_700_000_000
+    for i in range(count):
+        device = status.device_status.add(dev_eui=f"{i:016x}")
+        device.created_at.seconds = 1_700_000_000
+        device.updated_at.seconds = 1_700_000_000 + i
+        device.mc_group_setup_completed_at.seconds = 1_700_000_100 + i
+        if i % 3:
+            device.frag_session_setup_completed_at.seconds = 1_700_000_200 + i
+    return status
+
+
+def make_logs(count):
+    logs = fuota_pb2.GetDeploymentDeviceLogsResponse()
+    for i in range(count):
+        log = logs.logs.add(f_port=200 + i % 2, command="McGroupSetupReq")
+        log.created_at.seconds = 1_700_000_000 + i
+        log.fields["mc_group_id"] = "0"
+        log.fields["mc_addr"] = f"{i:08x}"
+    return logs
+
+
+@benchmark("create_deployment_devices", params={"devices": DEVICE_COUNTS})
+def create_deployment_devices(devices):
+    data = make_devices(devices)
+    return (lambda: FuotaUtils.create_deployment_devices(data)), devices
+
+
+@benchmark("create_deployment_devices_cached", params={"devices": DEVICE_COUNTS})
+def create_deployment_devices_cached(devices):
+    data = make_devices(devices)
+    return (lambda: FuotaUtils.create_deployment_devices_batch(data, use_cache=True)), devices
+
+
+@benchmark("create_deployment_request", params={"devices": DEVICE_COUNTS})
+def create_deployment_request(devices):
+    data = make_devices(devices)
+    config = FuotaUtils.create_deployment_config()
+    payload = b"\x00" * 100_000
+
+    def run():
+        FuotaUtils.create_deployment_request(
+            "app", data, "CLASS_C", 5, 869525000, multicast_region="EU868", payload=payload, **config
+        ).SerializeToString()
+
+    return run, devices
+
+
+@benchmark("serialize_deployment_status", params={"devices": [1_000, 10_000]})
+def serialize_deployment_status(devices):
+    status = make_status(devices)
+    return (lambda: FuotaUtils.serialize_deployment_status(status)), devices
+
+
+@benchmark("serialize_deployment_status_columnar", params={"devices": [1_000, 10_000]})
+def serialize_deployment_status_columnar(devices):
+    if not HAS_NUMPY:
+        return None
+    status = make_status(devices)
+    return (lambda: FuotaUtils.serialize_deployment_status(status, fmt="columnar")), devices
+
+
+@benchmark("serialize_device_logs", params={"logs": [1_000, 10_000]})
+def serialize_device_logs(logs):
+    response = make_logs(logs)
+    return (lambda: FuotaUtils.serialize_device_logs(response)), logs
+
+
+@benchmark("models_from_deployment_status", params={"devices": [1_000, 10_000]})
+def models_from_deployment_status(devices):
+    status = make_status(devices)
+    return (lambda: models.DeploymentDeviceStatus.from_protos(status.device_status)), devices
@@ -0,0 +1,12 @@
+import subprocess
+import sys
+
+from harness import benchmark
+
+STATEMENTS = ["import chirpstack_fuota_client", "from chirpstack_fuota_client import FuotaService"]
+
+
+@benchmark("import", params={"statement": STATEMENTS})
+def import_time(statement):
+    # Every run imports in a fresh interpreter, its startup time included.
+    return lambda: subprocess.run([sys.executable, "-c", statement], check=True)  # noqa: S603
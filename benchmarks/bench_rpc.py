@@ -0,0 +1,115 @@
+import atexit
+import importlib.util
+import shutil
+import tempfile
+
+from harness import benchmark
+
+from chirpstack_fuota_client import ApplicationService, DeviceService, FuotaService, SnapshotExporter, futures
+from chirpstack_fuota_client.testing import FakeChirpstackServer
+from chirpstack_fuota_client.utils.bulk import run_bulk
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+from chirpstack_fuota_client.utils.helpers import create_channel
+
+REQUESTS = 2_000
+CONCURRENCY = [1, 8, 32]
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+_server = None
+
+
+def server():
+    """Start the shared local server on first use, seeded with one application and its devices."""
+    global _server
+    if _server is None:
+        _server = FakeChirpstackServer(max_workers=64).start()
+        atexit.register(_server.stop)
+    return _server
+
+
+@benchmark("create_channel")
+def channel_creation():
+    address = server().address
+    return lambda: create_channel(address).close()
+
+
+@benchmark("channel_pool_get")
+def channel_pool_get():
+    address = server().address
+    with ChannelPool() as pool:
+        pool.get(address)
+        yield lambda: pool.get(address)
+
+
+def _device_service(pool):
+    fake = server()
+    devices = DeviceService(fake.address, "token", channel_pool=pool)
+    if not fake.state.devices:
+        application_id = ApplicationService(fake.address, "token", channel_pool=pool).create("tenant", "bench").id
+        devices.create_many(
+            application_id,
+            [
+                {"name": f"dev-{i}", "dev_eui": f"{i:016x}", "app_key": "00" * 16, "mac_version": "LORAWAN_1_0_3"}
+                for i in range(100)
+            ],
+            concurrency=16,
+            known_new=True,
+        )
+    return devices
+
+
+@benchmark("device_get_throughput", params={"concurrency": CONCURRENCY})
+def device_get_throughput(concurrency):
+    dev_euis = [f"{i % 100:016x}" for i in range(REQUESTS)]
+    with ChannelPool(stripes=4 if concurrency > 8 else 1) as pool:
+        devices = _device_service(pool)
+        yield (lambda: run_bulk(devices.get, dev_euis, concurrency=concurrency).raise_for_errors()), REQUESTS
+
+
+@benchmark("device_get_futures_throughput", params={"in_flight": CONCURRENCY})
+def device_get_futures_throughput(in_flight):
+    """Same calls as device_get_throughput, pipelined from a single thread with get_async."""
+    dev_euis = [f"{i % 100:016x}" for i in range(REQUESTS)]
+    with ChannelPool(stripes=4 if in_flight > 8 else 1) as pool:
+        devices = _device_service(pool)
+
+        def run():
+            for start in range(0, REQUESTS, in_flight):
+                batch = dev_euis[start : start + in_flight]
+                futures.gather(devices.get_async(dev_eui) for dev_eui in batch).result()
+
+        yield run, REQUESTS
+
+
+@benchmark("queue_downlink_many", params={"concurrency": CONCURRENCY})
+def queue_downlink_many(concurrency):
+    downlinks = [{"dev_eui": f"{i % 100:016x}", "data": b"\x01", "fport": 20} for i in range(REQUESTS // 4)]
+    with ChannelPool(stripes=4 if concurrency > 8 else 1) as pool:
+        devices = _device_service(pool)
+        yield (
+            (lambda: devices.queue_downlink_many(downlinks, concurrency=concurrency).raise_for_errors()),
+            len(downlinks),
+        )
+
+
+@benchmark("deployment_status_throughput", params={"concurrency": CONCURRENCY})
+def deployment_status_throughput(concurrency):
+    devices = [{"dev_eui": f"{i:016x}", "gen_app_key": "00" * 16} for i in range(100)]
+    with ChannelPool(stripes=4 if concurrency > 8 else 1) as pool:
+        fuota = FuotaService(server().address, "token", channel_pool=pool)
+        deployment_id = fuota.create_deployment("app", devices, "CLASS_C", 5, 869525000).id
+        ids = [deployment_id] * (REQUESTS // 4)
+        yield (lambda: run_bulk(fuota.get_deployment_status, ids, concurrency=concurrency).raise_for_errors()), len(ids)
+
+
+@benchmark("snapshot_export")
+def snapshot_export():
+    """Export of the seeded tenant, one application of 100 devices, listed and written as columns."""
+    if not HAS_NUMPY:
+        return None
+    path = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, path, True)
+    with ChannelPool() as pool:
+        _device_service(pool)
+        exporter = SnapshotExporter(server().address, "token", channel_pool=pool)
+        yield (lambda: exporter.export("tenant", path)), 100
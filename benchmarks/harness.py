@@ -0,0 +1,140 @@
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+BENCHMARKS = []
+
+
+class Benchmark:
+    def __init__(self, name, fn, params, group):
+        self.name = name
+        self.fn = fn
+        self.params = params
+        self.group = group
+
+    def cases(self):
+        """Yield (case name, kwargs) for every parameter combination."""
+        if not self.params:
+            yield self.name, {}
+            return
+        key, values = next(iter(self.params.items()))
+        for value in values:
+            yield f"{self.name}[{key}={value}]", {key: value}
+
+
+def benchmark(name, params=None, group=None):
+    """Register a benchmark.
+
+    The decorated function does the setup for one parameter value and returns either the
+    callable to time, or a (callable, items) tuple to also report items per second. It may
+    return None to skip the case (e.g. when an optional dependency is missing). Cases holding
+    resources yield that value instead of returning it: the generator is closed once the case
+    is timed, so that ``with`` blocks around the yield release them.
+    """
+
+    def decorator(fn):
+        BENCHMARKS.append(Benchmark(name, fn, params, group or fn.__module__))
+        return fn
+
+    return decorator
+
+
+def measure(fn, min_time=0.5, min_runs=3, max_runs=50):
+    """Time ``fn`` after one warmup call, until ``min_time`` seconds and ``min_runs`` runs are reached."""
+    fn()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_runs and (len(timings) < min_runs or time.perf_counter() - started < min_time):
+        begin = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - begin)
+    return timings
+
+
+def run(pattern=None, min_time=0.5, log=print):
+    """Run the registered benchmarks whose case name contains ``pattern``, returning the results dict."""
+    results = {}
+    for bench in BENCHMARKS:
+        for case, kwargs in bench.cases():
+            if pattern and pattern not in case:
+                continue
+            prepared = bench.fn(**kwargs)
+            teardown = None
+            if inspect.isgenerator(prepared):
+                teardown, prepared = prepared, next(prepared, None)
+            if prepared is None:
+                log(f"{case:<60} skipped")
+                continue
+            fn, items = prepared if isinstance(prepared, tuple) else (prepared, None)
+            try:
+                timings = measure(fn, min_time=min_time)
+            finally:
+                if teardown is not None:
+                    teardown.close()
+            median = statistics.median(timings)
+            result = {
+                "median": median,
+                "min": min(timings),
+                "mean": statistics.fmean(timings),
+                "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "runs": len(timings),
+            }
+            if items:
+                result["items"] = items
+                result["throughput"] = items / median
+            results[case] = result
+            throughput = f"  {result['throughput']:>12,.0f} items/s" if items else ""
+            log(f"{case:<60} {median * 1000:>10.3f} ms{throughput}")
+    return results
+
+
+def environment():
+    try:
+        version = metadata.version("chirpstack_fuota_client")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "package_version": version,
+    }
+
+
+def save(path, results):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline, results, threshold=0.1):
+    """Compare the median of every case present in both runs.
+
+    Returns:
+        List of (case, baseline median, new median, ratio, status) tuples, status being
+        "regression" when the new median is slower by more than ``threshold``, "improvement"
+        when faster by more than ``threshold``, "ok" otherwise
+    """
+    rows = []
+    for case in sorted(set(baseline) & set(results)):
+        old = baseline[case]["median"]
+        new = results[case]["median"]
+        ratio = new / old if old else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((case, old, new, ratio, status))
+    return rows
@@ -0,0 +1,50 @@
+"""Run the client benchmarks, record them as JSON and compare against a baseline.
+
+Usage:
+    python benchmarks/run.py                                    # run and print
+    python benchmarks/run.py --output benchmarks/baseline.json  # record a baseline
+    python benchmarks/run.py --compare benchmarks/baseline.json # fail on regressions
+"""
+
+import argparse
+import sys
+
+import bench_fuota_utils  # noqa: F401
+import bench_import  # noqa: F401
+import bench_rpc  # noqa: F401
+import harness
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", help="Only run cases whose name contains this string")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file")
+    parser.add_argument("-c", "--compare", help="Compare the results against this JSON baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression (default 0.1)"
+    )
+    parser.add_argument("--min-time", type=float, default=0.5, help="Min seconds spent timing each case")
+    args = parser.parse_args(argv)
+
+    results = harness.run(args.filter, min_time=args.min_time)
+    if args.output:
+        harness.save(args.output, results)
+        print(f"\nResults written to {args.output}")
+
+    if not args.compare:
+        return 0
+
+    rows = harness.compare(harness.load(args.compare), results, threshold=args.threshold)
+    print(f"\n{'case':<60} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for case, old, new, ratio, status in rows:
+        flag = "" if status == "ok" else f"  {status}"
+        print(f"{case:<60} {old * 1000:>9.3f} ms {new * 1000:>9.3f} ms {ratio:>7.2f}{flag}")
+    regressions = [row for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,66 @@
-import logging
+from typing import TYPE_CHECKING
 
-from .api.application import ApplicationService
-from .api.device import DeviceService
-from .api.device_profile import DeviceProfileService
-from .api.fuota import (
-    FuotaService,  # Add this line
-    FuotaUtils,
-)
-from .api.gateway import GatewayService
-from .api.integration import IntegrationService
-from .api.tenant import TenantService
-from .utils.logging import setup_logging
+from .utils.lazy import lazy_exports
+
+# Services and their dependencies (chirpstack_api, grpc.aio, pycryptodome) are imported on
+# first access, so importing the package or a single service stays cheap.
+_EXPORTS = {
+    "ApplicationService": ".api.application",
+    "DeviceProfileService": ".api.device_profile",
+    "DeviceService": ".api.device",
+    "GatewayService": ".api.gateway",
+    "IntegrationService": ".api.integration",
+    "TenantService": ".api.tenant",
+    "FuotaService": ".api.fuota",
+    "FuotaUtils": ".api.fuota",
+    "Reconciler": ".api.reconcile",
+    "Snapshot": ".api.snapshot",
+    "SnapshotExporter": ".api.snapshot",
+    "AsyncApplicationService": ".api.aio",
+    "AsyncDeviceProfileService": ".api.aio",
+    "AsyncDeviceService": ".api.aio",
+    "AsyncFuotaService": ".api.aio",
+    "AsyncGatewayService": ".api.aio",
+    "AsyncIntegrationService": ".api.aio",
+    "AsyncTenantService": ".api.aio",
+    "ChannelPool": ".utils.channel_pool",
+    "AsyncChannelPool": ".utils.channel_pool",
+    "NameCache": ".utils.cache",
+    "ChirpstackRpcError": ".exceptions",
+    "RpcMetrics": ".utils.metrics",
+    "setup_logging": ".utils.logging",
+    "models": ".models",
+    "futures": ".utils.futures",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from . import models
+    from .api.aio import (
+        AsyncApplicationService,
+        AsyncDeviceProfileService,
+        AsyncDeviceService,
+        AsyncFuotaService,
+        AsyncGatewayService,
+        AsyncIntegrationService,
+        AsyncTenantService,
+    )
+    from .api.application import ApplicationService
+    from .api.device import DeviceService
+    from .api.device_profile import DeviceProfileService
+    from .api.fuota import FuotaService, FuotaUtils
+    from .api.gateway import GatewayService
+    from .api.integration import IntegrationService
+    from .api.reconcile import Reconciler
+    from .api.snapshot import Snapshot, SnapshotExporter
+    from .api.tenant import TenantService
+    from .exceptions import ChirpstackRpcError
+    from .utils import futures
+    from .utils.cache import NameCache
+    from .utils.channel_pool import AsyncChannelPool, ChannelPool
+    from .utils.logging import setup_logging
+    from .utils.metrics import RpcMetrics
 
 __all__ = [
     "ApplicationService",
@@ -19,7 +69,23 @@ __all__ = [
     "GatewayService",
     "IntegrationService",
     "TenantService",
+    "ChannelPool",
+    "AsyncApplicationService",
+    "AsyncDeviceProfileService",
+    "AsyncDeviceService",
+    "AsyncGatewayService",
+    "AsyncIntegrationService",
+    "AsyncTenantService",
+    "AsyncFuotaService",
+    "AsyncChannelPool",
+    "NameCache",
+    "ChirpstackRpcError",
+    "RpcMetrics",
     "FuotaService",
     "FuotaUtils",
+    "Reconciler",
+    "Snapshot",
+    "SnapshotExporter",
     "models",
+    "futures",
 ]
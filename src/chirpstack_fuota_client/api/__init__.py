@@ -1,10 +1,23 @@
-from .application import ApplicationService
-from .device import DeviceService
-from .device_profile import DeviceProfileService
-from .fuota import FuotaService, FuotaUtils
-from .gateway import GatewayService
-from .integration import IntegrationService
-from .tenant import TenantService
+from ..utils.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "ApplicationService": ".application",
+        "DeviceProfileService": ".device_profile",
+        "DeviceService": ".device",
+        "FuotaService": ".fuota",
+        "FuotaUtils": ".fuota",
+        "GatewayService": ".gateway",
+        "IntegrationService": ".integration",
+        "TenantService": ".tenant",
+        "Change": ".reconcile",
+        "ReconcilePlan": ".reconcile",
+        "Reconciler": ".reconcile",
+        "Snapshot": ".snapshot",
+        "SnapshotExporter": ".snapshot",
+    },
+)
 
 __all__ = [
     "ApplicationService",
@@ -15,4 +28,9 @@ __all__ = [
     "TenantService",
     "FuotaService",
     "FuotaUtils",
+    "Change",
+    "ReconcilePlan",
+    "Reconciler",
+    "Snapshot",
+    "SnapshotExporter",
 ]
@@ -0,0 +1,26 @@
+from ...utils.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "AsyncApplicationService": ".application",
+        "AsyncDeviceService": ".device",
+        "AsyncDeviceProfileService": ".device_profile",
+        "AsyncFuotaService": ".fuota",
+        "AsyncGatewayService": ".gateway",
+        "AsyncHttpIntegration": ".integration",
+        "AsyncIntegrationService": ".integration",
+        "AsyncTenantService": ".tenant",
+    },
+)
+
+__all__ = [
+    "AsyncApplicationService",
+    "AsyncDeviceProfileService",
+    "AsyncDeviceService",
+    "AsyncGatewayService",
+    "AsyncHttpIntegration",
+    "AsyncIntegrationService",
+    "AsyncTenantService",
+    "AsyncFuotaService",
+]
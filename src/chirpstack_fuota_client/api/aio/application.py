@@ -0,0 +1,87 @@
+import grpc
+from chirpstack_api import api
+
+from ...exceptions import ChirpstackRpcError
+from ...utils import helpers
+from ...utils.channel_pool import get_aio_channel
+from ...utils.helpers import auth_header
+from ...utils.pagination import aiter_items
+
+
+class AsyncApplicationService:
+    """asyncio counterpart of ApplicationService built on a ``grpc.aio`` channel."""
+
+    def __init__(self, server_address, api_token, channel_pool=None, optimistic=False, is_conflict=None):
+        self.server_address = server_address
+        self.api_token = api_token
+        self.channel = get_aio_channel(self.server_address, channel_pool)
+        self.stub = api.ApplicationServiceStub(self.channel)
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
+
+    async def create(self, tenant_id, name, description="", optimistic=None, **kwargs):
+        req = api.CreateApplicationRequest(
+            application=api.Application(name=name, description=description, tenant_id=tenant_id, **kwargs)
+        )
+        try:
+            return await helpers.acreate_or_get(
+                lambda: self.stub.Create(req, metadata=auth_header(self.api_token)),
+                lambda: self.get_by_name(tenant_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
+            )
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to create application: {str(e)}", e)
+
+    async def get(self, application_id):
+        req = api.GetApplicationRequest(id=application_id)
+        try:
+            return await self.stub.Get(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get application: {str(e)}", e)
+
+    async def get_by_name(self, tenant_id, name):
+        req = api.ListApplicationsRequest(
+            limit=1,
+            search=name,
+            tenant_id=tenant_id,
+        )
+        try:
+            resp = await self.stub.List(req, metadata=auth_header(self.api_token))
+            for app in resp.result:
+                if app.name == name:
+                    return app
+            return None
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get application by name: {str(e)}", e)
+
+    async def update(self, application_id, name, description="", **kwargs):
+        req = api.UpdateApplicationRequest(
+            application=api.Application(id=application_id, name=name, description=description, **kwargs)
+        )
+        try:
+            await self.stub.Update(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update application: {str(e)}", e)
+
+    async def delete(self, application_id):
+        req = api.DeleteApplicationRequest(id=application_id)
+        try:
+            await self.stub.Delete(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to delete application: {str(e)}", e)
+
+    async def list(self, tenant_id, limit=10, offset=0):
+        req = api.ListApplicationsRequest(
+            tenant_id=tenant_id,
+            limit=limit,
+            offset=offset,
+        )
+        try:
+            return await self.stub.List(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to list applications: {str(e)}", e)
+
+    def iter_all(self, tenant_id, page_size=100, prefetch=True):
+        """Async iterator over all applications of a tenant across pages, prefetching the next page."""
+        return aiter_items(lambda limit, offset: self.list(tenant_id, limit, offset), page_size, prefetch)
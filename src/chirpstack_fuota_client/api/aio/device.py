@@ -0,0 +1,171 @@
+import grpc
+from chirpstack_api import api
+
+from ...exceptions import ChirpstackRpcError
+from ...utils import helpers
+from ...utils.channel_pool import get_aio_channel
+from ...utils.helpers import auth_header
+from ...utils.pagination import aiter_items
+from ..device import DeviceService
+
+
+class AsyncDeviceService:
+    """asyncio counterpart of DeviceService built on a ``grpc.aio`` channel.
+
+    Method signatures and return values match DeviceService; every method is a coroutine.
+    """
+
+    def __init__(self, server_address, api_token, channel_pool=None, optimistic=False, is_conflict=None):
+        """Initialize the async device service.
+
+        Args:
+            server_address: ChirpStack server address
+            api_token: API token for authentication
+            channel_pool: Optional AsyncChannelPool, defaults to the process-wide async pool
+            optimistic: Have ``create`` call Create first and only look up the name on conflict
+            is_conflict: Callable telling whether a grpc.RpcError of Create is a conflict
+        """
+        self.server_address = server_address
+        self.api_token = api_token
+        self.channel = get_aio_channel(self.server_address, channel_pool)
+        self.stub = api.DeviceServiceStub(self.channel)
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
+
+    _DeviceKeys = DeviceService._DeviceKeys
+
+    async def create(
+        self, application_id, name, dev_eui, app_key, mac_version, description="", tags=None, optimistic=None, **kwargs
+    ):
+        """Create a new device, returning the existing one if the name is already taken."""
+        req = api.CreateDeviceRequest(
+            device=api.Device(
+                application_id=application_id,
+                name=name,
+                dev_eui=dev_eui,
+                description=description,
+                tags={} if tags is None else tags,
+                **kwargs,
+            )
+        )
+        keys_req = api.CreateDeviceKeysRequest(device_keys=self._DeviceKeys(dev_eui, app_key, mac_version))
+
+        async def create():
+            device = await self.stub.Create(req, metadata=auth_header(self.api_token))
+            await self.stub.CreateKeys(keys_req, metadata=auth_header(self.api_token))
+            return device
+
+        try:
+            return await helpers.acreate_or_get(
+                create,
+                lambda: self.get_by_name(application_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
+            )
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to create device: {str(e)}", e)
+
+    async def get(self, dev_eui):
+        """Get a device by its EUI."""
+        req = api.GetDeviceRequest(dev_eui=dev_eui)
+        try:
+            return await self.stub.Get(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get device: {str(e)}", e)
+
+    async def get_by_name(self, application_id, name):
+        """Get a device by its name within an application, None if not found."""
+        req = api.ListDevicesRequest(
+            limit=1,
+            search=name,
+            application_id=application_id,
+        )
+        try:
+            resp = await self.stub.List(req, metadata=auth_header(self.api_token))
+            for device in resp.result:
+                if device.name == name:
+                    return device
+            return None
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get device by name: {str(e)}", e)
+
+    async def update(self, dev_eui, name, app_key, mac_version, description="", tags=None, **kwargs):
+        """Update an existing device and its keys."""
+        device = (await self.get(dev_eui)).device
+        current_tags = dict(device.tags)
+
+        if tags is not None:
+            current_tags.update(tags)
+
+        req = api.UpdateDeviceRequest(
+            device=api.Device(dev_eui=dev_eui, name=name, description=description, tags=current_tags, **kwargs)
+        )
+        try:
+            await self.stub.Update(req, metadata=auth_header(self.api_token))
+            await self.update_keys(dev_eui, app_key, mac_version)
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update device: {str(e)}", e)
+
+    async def delete(self, dev_eui):
+        """Delete a device."""
+        req = api.DeleteDeviceRequest(dev_eui=dev_eui)
+        try:
+            await self.stub.Delete(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to delete device: {str(e)}", e)
+
+    async def list(self, application_id, limit=10, offset=0):
+        """List devices in an application."""
+        req = api.ListDevicesRequest(
+            application_id=application_id,
+            limit=limit,
+            offset=offset,
+        )
+        try:
+            return await self.stub.List(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to list devices: {str(e)}", e)
+
+    def iter_all(self, application_id, page_size=100, prefetch=True):
+        """Async iterator over all devices in an application across pages, prefetching the next page."""
+        return aiter_items(lambda limit, offset: self.list(application_id, limit, offset), page_size, prefetch)
+
+    async def create_keys(self, dev_eui, app_key, mac_version, **kwargs):
+        """Create device keys."""
+        device_keys = self._DeviceKeys(dev_eui, app_key, mac_version, **kwargs)
+        req = api.CreateDeviceKeysRequest(device_keys=device_keys)
+        await self.stub.CreateKeys(req, metadata=auth_header(self.api_token))
+
+    async def update_keys(self, dev_eui, app_key, mac_version, **kwargs):
+        """Update device keys."""
+        device_keys = self._DeviceKeys(dev_eui, app_key, mac_version, **kwargs)
+        req = api.UpdateDeviceKeysRequest(device_keys=device_keys)
+        await self.stub.UpdateKeys(req, metadata=auth_header(self.api_token))
+
+    async def queue_downlink(self, dev_eui, data, fport=10, **kwargs):
+        """Queue a downlink message for a device."""
+        if isinstance(data, str):
+            data = data.encode()
+        req = api.EnqueueDeviceQueueItemRequest(
+            queue_item=api.DeviceQueueItem(dev_eui=dev_eui, f_port=fport, data=data, **kwargs)
+        )
+        try:
+            return await self.stub.Enqueue(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to send downlink: {str(e)}", e)
+
+    async def get_queue_items(self, dev_eui):
+        """Get queued items for a device."""
+        req = api.GetDeviceQueueItemsRequest(dev_eui=dev_eui)
+        try:
+            return await self.stub.GetQueue(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get queue items: {str(e)}", e)
+
+    async def flush_queue(self, dev_eui):
+        """Flush the queue for a device."""
+        req = api.FlushDeviceQueueRequest(dev_eui=dev_eui)
+        try:
+            return await self.stub.FlushQueue(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to flush queue: {str(e)}", e)
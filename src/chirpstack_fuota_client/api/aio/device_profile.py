@@ -0,0 +1,86 @@
+import grpc
+from chirpstack_api import api
+
+from ...exceptions import ChirpstackRpcError
+from ...utils import helpers
+from ...utils.channel_pool import get_aio_channel
+from ...utils.helpers import auth_header
+from ...utils.pagination import aiter_items
+
+
+class AsyncDeviceProfileService:
+    """asyncio counterpart of DeviceProfileService built on a ``grpc.aio`` channel."""
+
+    def __init__(self, server_address, api_token, channel_pool=None, optimistic=False, is_conflict=None):
+        self.server_address = server_address
+        self.api_token = api_token
+        self.channel = get_aio_channel(self.server_address, channel_pool)
+        self.stub = api.DeviceProfileServiceStub(self.channel)
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
+
+    async def create(self, tenant_id, name, optimistic=None, **kwargs):
+        req = api.CreateDeviceProfileRequest(device_profile=api.DeviceProfile(name=name, tenant_id=tenant_id, **kwargs))
+        try:
+            return await helpers.acreate_or_get(
+                lambda: self.stub.Create(req, metadata=auth_header(self.api_token)),
+                lambda: self.get_by_name(tenant_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
+            )
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to create device profile: {str(e)}", e)
+
+    async def get(self, device_profile_id):
+        req = api.GetDeviceProfileRequest(id=device_profile_id)
+        try:
+            resp = await self.stub.Get(req, metadata=auth_header(self.api_token))
+            return resp.device_profile
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get device profile: {str(e)}", e)
+
+    async def get_by_name(self, tenant_id, name):
+        req = api.ListDeviceProfilesRequest(
+            limit=1,
+            search=name,
+            tenant_id=tenant_id,
+        )
+        try:
+            resp = await self.stub.List(req, metadata=auth_header(self.api_token))
+            for profile in resp.result:
+                if profile.name == name:
+                    return profile
+            return None
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get device profile by name: {str(e)}", e)
+
+    async def update(self, device_profile_id, name, **kwargs):
+        req = api.UpdateDeviceProfileRequest(
+            device_profile=api.DeviceProfile(id=device_profile_id, name=name, **kwargs)
+        )
+        try:
+            await self.stub.Update(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update device profile: {str(e)}", e)
+
+    async def delete(self, device_profile_id):
+        req = api.DeleteDeviceProfileRequest(id=device_profile_id)
+        try:
+            await self.stub.Delete(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to delete device profile: {str(e)}", e)
+
+    async def list(self, tenant_id, limit=10, offset=0):
+        req = api.ListDeviceProfilesRequest(
+            tenant_id=tenant_id,
+            limit=limit,
+            offset=offset,
+        )
+        try:
+            return await self.stub.List(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to list device profiles: {str(e)}", e)
+
+    def iter_all(self, tenant_id, page_size=100, prefetch=True):
+        """Async iterator over all device profiles of a tenant across pages, prefetching the next page."""
+        return aiter_items(lambda limit, offset: self.list(tenant_id, limit, offset), page_size, prefetch)
@@ -0,0 +1,90 @@
+import asyncio
+import itertools
+import time
+
+import grpc
+
+from ...exceptions import ChirpstackRpcError
+from ...proto.fuota import fuota_pb2, fuota_pb2_grpc
+from ...utils.channel_pool import get_aio_channel
+from ...utils.helpers import auth_header
+from ..fuota.utils import FuotaUtils
+from ..fuota.watch import DeploymentWatch
+
+
+class AsyncFuotaService:
+    """asyncio counterpart of FuotaService built on a ``grpc.aio`` channel."""
+
+    def __init__(self, server_address, api_token, channel_pool=None):
+        self.server_address = server_address
+        self.api_token = api_token
+        self.channel = get_aio_channel(self.server_address, channel_pool)
+        self.stub = fuota_pb2_grpc.FuotaServerServiceStub(self.channel)
+
+    async def create_deployment(
+        self, application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
+    ):
+        try:
+            request = FuotaUtils.create_deployment_request(
+                application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
+            )
+            return await self.stub.CreateDeployment(request, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to create FUOTA deployment: {str(e)}", e)
+
+    async def get_deployment_status(self, deployment_id):
+        try:
+            request = fuota_pb2.GetDeploymentStatusRequest(id=deployment_id)
+            return await self.stub.GetDeploymentStatus(request, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get FUOTA deployment status: {str(e)}", e)
+
+    async def get_deployment_device_logs(self, deployment_id, dev_eui):
+        try:
+            request = fuota_pb2.GetDeploymentDeviceLogsRequest(deployment_id=deployment_id, dev_eui=dev_eui)
+            return await self.stub.GetDeploymentDeviceLogs(request, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get FUOTA deployment device logs: {str(e)}", e)
+
+    async def get_deployment_logs_many(self, deployment_id, dev_euis, concurrency=8, serialize=False, fmt="iso"):
+        """Async iterator counterpart of FuotaService.get_deployment_logs_many."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        async def fetch(dev_eui):
+            try:
+                logs = await self.get_deployment_device_logs(deployment_id, dev_eui)
+            except ChirpstackRpcError as e:
+                return dev_eui, None, e
+            return dev_eui, FuotaUtils.serialize_device_logs(logs, fmt) if serialize else logs, None
+
+        dev_euis = iter(dev_euis)
+        pending = set()
+        try:
+            for dev_eui in itertools.islice(dev_euis, concurrency):
+                pending.add(asyncio.ensure_future(fetch(dev_eui)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+                    for dev_eui in itertools.islice(dev_euis, 1):
+                        pending.add(asyncio.ensure_future(fetch(dev_eui)))
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def watch_deployment(
+        self, deployment_id, intervals=None, max_interval=60.0, timeout=None, sleep=asyncio.sleep
+    ):
+        """Async iterator counterpart of FuotaService.watch_deployment."""
+        watch = DeploymentWatch(intervals=intervals, max_interval=max_interval)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            event = watch.update(await self.get_deployment_status(deployment_id))
+            if event is not None:
+                yield event
+            if watch.done:
+                return
+            if deadline is not None and time.monotonic() + watch.interval > deadline:
+                raise TimeoutError(f"FUOTA deployment {deployment_id} did not complete within {timeout}s")
+            await sleep(watch.interval)
@@ -0,0 +1,99 @@
+import grpc
+from chirpstack_api import api
+
+from ...exceptions import ChirpstackRpcError
+from ...utils.channel_pool import get_aio_channel
+from ...utils.helpers import auth_header
+
+
+class AsyncHttpIntegration:
+    """asyncio counterpart of HttpIntegration."""
+
+    def __init__(self, stub, api_token):
+        self.stub = stub
+        self.api_token = api_token
+
+    async def create(self, application_id, event_endpoint_url, headers=None):
+        req = api.CreateHttpIntegrationRequest(
+            integration=api.HttpIntegration(
+                application_id=application_id,
+                headers={} if headers is None else headers,
+                event_endpoint_url=event_endpoint_url,
+            )
+        )
+        try:
+            return await self.stub.CreateHttpIntegration(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to create HTTP integration: {str(e)}", e)
+
+    async def get(self, application_id):
+        req = api.GetHttpIntegrationRequest(application_id=application_id)
+        try:
+            return await self.stub.GetHttpIntegration(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return None
+            raise ChirpstackRpcError(f"Failed to get HTTP integration: {str(e)}", e)
+
+    async def update(self, application_id, event_endpoint_url, headers=None):
+        req = api.UpdateHttpIntegrationRequest(
+            integration=api.HttpIntegration(
+                application_id=application_id,
+                headers={} if headers is None else headers,
+                event_endpoint_url=event_endpoint_url,
+            )
+        )
+        try:
+            return await self.stub.UpdateHttpIntegration(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update HTTP integration: {str(e)}", e)
+
+    async def delete(self, application_id):
+        req = api.DeleteHttpIntegrationRequest(application_id=application_id)
+        try:
+            return await self.stub.DeleteHttpIntegration(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to delete HTTP integration: {str(e)}", e)
+
+
+class AsyncIntegrationService:
+    """asyncio counterpart of IntegrationService built on a ``grpc.aio`` channel."""
+
+    def __init__(self, server_address, api_token, channel_pool=None):
+        self.server_address = server_address
+        self.api_token = api_token
+        self.channel = get_aio_channel(self.server_address, channel_pool)
+        self.stub = api.ApplicationServiceStub(self.channel)
+        self.integrations = {"http": AsyncHttpIntegration(self.stub, self.api_token)}
+
+    def _integration(self, integration_type):
+        if integration_type not in self.integrations:
+            raise ValueError(f"Unsupported integration type: {integration_type}")
+        return self.integrations[integration_type]
+
+    async def create(self, integration_type, application_id, **kwargs):
+        integration = self._integration(integration_type)
+
+        existing_integration = await integration.get(application_id)
+        if existing_integration is not None:
+            raise Exception(
+                f"{integration_type.capitalize()} integration already exists for application {application_id}"
+            )
+
+        return await integration.create(application_id, **kwargs)
+
+    async def get(self, integration_type, application_id):
+        return await self._integration(integration_type).get(application_id)
+
+    async def update(self, integration_type, application_id, **kwargs):
+        return await self._integration(integration_type).update(application_id, **kwargs)
+
+    async def delete(self, integration_type, application_id):
+        return await self._integration(integration_type).delete(application_id)
+
+    async def list(self, application_id):
+        req = api.ListIntegrationsRequest(application_id=application_id)
+        try:
+            return await self.stub.ListIntegrations(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to list integrations: {str(e)}", e)
@@ -0,0 +1,93 @@
+import grpc
+from chirpstack_api import api
+
+from ...exceptions import ChirpstackRpcError
+from ...utils import helpers
+from ...utils.channel_pool import get_aio_channel
+from ...utils.helpers import auth_header
+from ...utils.pagination import aiter_items
+
+
+class AsyncTenantService:
+    """asyncio counterpart of TenantService built on a ``grpc.aio`` channel."""
+
+    def __init__(self, server_address, api_token, channel_pool=None, optimistic=False, is_conflict=None):
+        self.server_address = server_address
+        self.api_token = api_token
+        self.channel = get_aio_channel(self.server_address, channel_pool)
+        self.stub = api.TenantServiceStub(self.channel)
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
+
+    async def create(self, name, description="", optimistic=None):
+        req = api.CreateTenantRequest(
+            tenant=api.Tenant(
+                name=name,
+                description=description,
+                can_have_gateways=True,
+            )
+        )
+        try:
+            return await helpers.acreate_or_get(
+                lambda: self.stub.Create(req, metadata=auth_header(self.api_token)),
+                lambda: self.get_by_name(name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
+            )
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to create tenant: {str(e)}", e)
+
+    async def get(self, tenant_id):
+        req = api.GetTenantRequest(id=tenant_id)
+        try:
+            return await self.stub.Get(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get tenant: {str(e)}", e)
+
+    async def get_by_name(self, name):
+        req = api.ListTenantsRequest(
+            limit=1,
+            search=name,
+        )
+        try:
+            resp = await self.stub.List(req, metadata=auth_header(self.api_token))
+            for tenant in resp.result:
+                if tenant.name == name:
+                    return tenant
+            return None
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to get tenant by name: {str(e)}", e)
+
+    async def update(self, tenant_id, name, description=""):
+        req = api.UpdateTenantRequest(
+            tenant=api.Tenant(
+                id=tenant_id,
+                name=name,
+                description=description,
+            )
+        )
+        try:
+            await self.stub.Update(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update tenant: {str(e)}", e)
+
+    async def delete(self, tenant_id):
+        req = api.DeleteTenantRequest(id=tenant_id)
+        try:
+            await self.stub.Delete(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to delete tenant: {str(e)}", e)
+
+    async def list(self, limit=10, offset=0):
+        req = api.ListTenantsRequest(
+            limit=limit,
+            offset=offset,
+        )
+        try:
+            return await self.stub.List(req, metadata=auth_header(self.api_token))
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to list tenants: {str(e)}", e)
+
+    def iter_all(self, page_size=100, prefetch=True):
+        """Async iterator over all tenants across pages, prefetching the next page."""
+        return aiter_items(lambda limit, offset: self.list(limit, offset), page_size, prefetch)
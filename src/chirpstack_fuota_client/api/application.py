@@ -1,50 +1,110 @@
 import grpc
 from chirpstack_api import api
 
-from ..utils.helpers import auth_header, create_channel
+from ..exceptions import ChirpstackRpcError
+from ..utils import futures, helpers
+from ..utils.channel_pool import get_channel
+from ..utils.helpers import auth_header
+from ..utils.pagination import iter_items
 
 
 class ApplicationService:
-    def __init__(self, server_address, api_token):
+    def __init__(
+        self, server_address, api_token, channel_pool=None, name_cache=None, optimistic=False, is_conflict=None
+    ):
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = api.ApplicationServiceStub(self.channel)
+        self.name_cache = name_cache
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
 
-    def create(self, tenant_id, name, description="", **kwargs):
+    def create(self, tenant_id, name, description="", optimistic=None, **kwargs):
+        req = api.CreateApplicationRequest(
+            application=api.Application(name=name, description=description, tenant_id=tenant_id, **kwargs)
+        )
         try:
-            existing_application = self.get_by_name(tenant_id, name)
-            if existing_application:
-                return existing_application
-
-            req = api.CreateApplicationRequest(
-                application=api.Application(name=name, description=description, tenant_id=tenant_id, **kwargs)
+            return helpers.create_or_get(
+                lambda: self._created(req, self.stub.Create(req, metadata=auth_header(self.api_token))),
+                lambda: self.get_by_name(tenant_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
             )
-            return self.stub.Create(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create application: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create application: {str(e)}", e)
+
+    def create_async(self, tenant_id, name, description="", optimistic=None, **kwargs):
+        """Non-blocking ``create``, returning a concurrent.futures.Future of the application."""
+        req = api.CreateApplicationRequest(
+            application=api.Application(name=name, description=description, tenant_id=tenant_id, **kwargs)
+        )
+        future = helpers.create_or_get_future(
+            lambda: futures.then(
+                futures.call(self.stub.Create, req, metadata=auth_header(self.api_token)),
+                lambda resp: self._created(req, resp),
+            ),
+            lambda: self.get_by_name_async(tenant_id, name),
+            self.optimistic if optimistic is None else optimistic,
+            self.is_conflict,
+        )
+        return futures.wrap_errors(future, "Failed to create application")
+
+    def _created(self, req, resp):
+        if self.name_cache is not None:
+            app = req.application
+            application = api.ApplicationListItem(id=resp.id, name=app.name, description=app.description)
+            self.name_cache.put("application", app.tenant_id, app.name, resp.id, application)
+        return resp
 
     def get(self, application_id):
         req = api.GetApplicationRequest(id=application_id)
         try:
             return self.stub.Get(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get application: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get application: {str(e)}", e)
+
+    def get_async(self, application_id):
+        """Non-blocking ``get``, returning a concurrent.futures.Future of the application."""
+        req = api.GetApplicationRequest(id=application_id)
+        future = futures.call(self.stub.Get, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get application")
 
     def get_by_name(self, tenant_id, name):
+        if self.name_cache is not None:
+            cached = self.name_cache.get("application", tenant_id, name)
+            if cached is not None:
+                return cached
+
         req = api.ListApplicationsRequest(
             limit=1,
             search=name,
             tenant_id=tenant_id,
         )
         try:
-            resp = self.stub.List(req, metadata=auth_header(self.api_token))
-            for app in resp.result:
-                if app.name == name:
-                    return app
-            return None
+            return self._find(tenant_id, name, self.stub.List(req, metadata=auth_header(self.api_token)))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get application by name: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get application by name: {str(e)}", e)
+
+    def get_by_name_async(self, tenant_id, name):
+        """Non-blocking ``get_by_name``, returning a concurrent.futures.Future of the application or None."""
+        if self.name_cache is not None:
+            cached = self.name_cache.get("application", tenant_id, name)
+            if cached is not None:
+                return futures.completed(cached)
+
+        req = api.ListApplicationsRequest(limit=1, search=name, tenant_id=tenant_id)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda resp: self._find(tenant_id, name, resp))
+        return futures.wrap_errors(future, "Failed to get application by name")
+
+    def _find(self, tenant_id, name, resp):
+        for app in resp.result:
+            if app.name == name:
+                if self.name_cache is not None:
+                    self.name_cache.put("application", tenant_id, name, app.id, app)
+                return app
+        return None
 
     def update(self, application_id, name, description="", **kwargs):
         req = api.UpdateApplicationRequest(
@@ -52,16 +112,37 @@ class ApplicationService:
         )
         try:
             self.stub.Update(req, metadata=auth_header(self.api_token))
+            self._invalidate(application_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to update application: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to update application: {str(e)}", e)
+
+    def update_async(self, application_id, name, description="", **kwargs):
+        """Non-blocking ``update``, returning a concurrent.futures.Future resolving to None."""
+        req = api.UpdateApplicationRequest(
+            application=api.Application(id=application_id, name=name, description=description, **kwargs)
+        )
+        future = futures.call(self.stub.Update, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(application_id))
+        return futures.wrap_errors(future, "Failed to update application")
 
     def delete(self, application_id):
         req = api.DeleteApplicationRequest(id=application_id)
         try:
-            resp = self.stub.Delete(req, metadata=auth_header(self.api_token))
-            print(resp)
+            self.stub.Delete(req, metadata=auth_header(self.api_token))
+            self._invalidate(application_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to delete application: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to delete application: {str(e)}", e)
+
+    def delete_async(self, application_id):
+        """Non-blocking ``delete``, returning a concurrent.futures.Future resolving to None."""
+        req = api.DeleteApplicationRequest(id=application_id)
+        future = futures.call(self.stub.Delete, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(application_id))
+        return futures.wrap_errors(future, "Failed to delete application")
+
+    def _invalidate(self, application_id):
+        if self.name_cache is not None:
+            self.name_cache.invalidate_id("application", application_id)
 
     def list(self, tenant_id, limit=10, offset=0):
         req = api.ListApplicationsRequest(
@@ -72,4 +153,22 @@ class ApplicationService:
         try:
             return self.stub.List(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to list applications: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to list applications: {str(e)}", e)
+
+    def list_async(self, tenant_id, limit=10, offset=0):
+        """Non-blocking ``list``, returning a concurrent.futures.Future of the list response."""
+        req = api.ListApplicationsRequest(tenant_id=tenant_id, limit=limit, offset=offset)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to list applications")
+
+    def iter_all(self, tenant_id, page_size=100, prefetch=True):
+        """Iterate over all applications of a tenant across pages, prefetching the next page in the background."""
+        applications = iter_items(lambda limit, offset: self.list(tenant_id, limit, offset), page_size, prefetch)
+        if self.name_cache is None:
+            return applications
+        return self._cached(tenant_id, applications)
+
+    def _cached(self, tenant_id, applications):
+        for app in applications:
+            self.name_cache.put("application", tenant_id, app.name, app.id, app)
+            yield app
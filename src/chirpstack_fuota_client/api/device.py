@@ -1,8 +1,14 @@
 import grpc
 from chirpstack_api import api
-import logging
 
-from ..utils.helpers import auth_header, create_channel
+from ..exceptions import ChirpstackRpcError
+from ..utils import futures, helpers
+from ..utils.bulk import BulkResult, run_bulk
+from ..utils.channel_pool import get_channel
+from ..utils.helpers import auth_header
+from ..utils.logging import logger
+from ..utils.pagination import iter_items
+from ..utils.ratelimit import KeyedRateLimiter
 
 
 class DeviceService:
@@ -12,21 +18,37 @@ class DeviceService:
     as well as managing device keys, queue and state.
     """
 
-    def __init__(self, server_address, api_token):
+    def __init__(
+        self, server_address, api_token, channel_pool=None, name_cache=None, optimistic=False, is_conflict=None
+    ):
         """Initialize the device service.
 
         Args:
             server_address: ChirpStack server address
             api_token: API token for authentication
+            channel_pool: Optional ChannelPool to share connections with, defaults to the process-wide pool
+            name_cache: Optional NameCache answering get_by_name without a round trip
+            optimistic: Have ``create`` call Create first and only look up the name on conflict
+            is_conflict: Callable telling whether a grpc.RpcError of Create means the device
+                already exists, defaults to checking for ALREADY_EXISTS
         """
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = api.DeviceServiceStub(self.channel)
+        self.name_cache = name_cache
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
 
-    def create(self, application_id, name, dev_eui, app_key, mac_version, description="", tags=None, **kwargs):
+    def create(
+        self, application_id, name, dev_eui, app_key, mac_version, description="", tags=None, optimistic=None, **kwargs
+    ):
         """Create a new device.
 
+        Unless optimistic, an existing device with the same name is looked up first and
+        returned instead. In optimistic mode Create and CreateKeys are issued straight away
+        and the existing device is only looked up when Create reports a conflict.
+
         Args:
             application_id: Application ID UUID string
             name: Device name
@@ -35,35 +57,146 @@ class DeviceService:
             mac_version: LoRaWAN MAC version (e.g. "LORAWAN_1_0_3")
             description: Optional device description
             tags: Optional dict of device tags
+            optimistic: Create before looking up the name, defaults to the service setting
             **kwargs: Additional device attributes
 
         Returns:
             The created device object
 
         Raises:
-            Exception: If device creation fails
+            ChirpstackRpcError: If device creation fails
         """
-        try:
-            existing_device = self.get_by_name(application_id, name)
-            if existing_device:
-                return existing_device
-
-            req = api.CreateDeviceRequest(
-                device=api.Device(
-                    application_id=application_id,
-                    name=name,
-                    dev_eui=dev_eui,
-                    description=description,
-                    tags={} if tags is None else tags,
-                    **kwargs,
-                )
-            )
+        return self._create(
+            application_id, name, dev_eui, app_key, mac_version, description, tags, True, optimistic, **kwargs
+        )
+
+    def _create(
+        self,
+        application_id,
+        name,
+        dev_eui,
+        app_key,
+        mac_version,
+        description,
+        tags,
+        check_existing,
+        optimistic,
+        **kwargs,
+    ):
+        req, keys_req = self._create_requests(
+            application_id, name, dev_eui, app_key, mac_version, description, tags, **kwargs
+        )
+
+        def create():
             device = self.stub.Create(req, metadata=auth_header(self.api_token))
-            self.create_keys(dev_eui, app_key, mac_version)
-            return device
+            self.stub.CreateKeys(keys_req, metadata=auth_header(self.api_token))
+            return self._created(req, device)
 
+        try:
+            if not check_existing:
+                return create()
+            return helpers.create_or_get(
+                create,
+                lambda: self.get_by_name(application_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
+            )
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create device: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create device: {str(e)}", e)
+
+    def create_async(
+        self, application_id, name, dev_eui, app_key, mac_version, description="", tags=None, optimistic=None, **kwargs
+    ):
+        """Non-blocking ``create``, returning a concurrent.futures.Future of the device.
+
+        CreateKeys is sent from the completion callback of Create, so no thread waits in between.
+        """
+        req, keys_req = self._create_requests(
+            application_id, name, dev_eui, app_key, mac_version, description, tags, **kwargs
+        )
+
+        def create_keys(device):
+            keys = futures.call(self.stub.CreateKeys, keys_req, metadata=auth_header(self.api_token))
+            return futures.then(keys, lambda _: self._created(req, device))
+
+        def create():
+            return futures.then(futures.call(self.stub.Create, req, metadata=auth_header(self.api_token)), create_keys)
+
+        future = helpers.create_or_get_future(
+            create,
+            lambda: self.get_by_name_async(application_id, name),
+            self.optimistic if optimistic is None else optimistic,
+            self.is_conflict,
+        )
+        return futures.wrap_errors(future, "Failed to create device")
+
+    def _create_requests(self, application_id, name, dev_eui, app_key, mac_version, description, tags, **kwargs):
+        req = api.CreateDeviceRequest(
+            device=api.Device(
+                application_id=application_id,
+                name=name,
+                dev_eui=dev_eui,
+                description=description,
+                tags={} if tags is None else tags,
+                **kwargs,
+            )
+        )
+        # Validate the keys before creating the device so a bad mac_version leaves nothing behind.
+        keys_req = api.CreateDeviceKeysRequest(device_keys=self._DeviceKeys(dev_eui, app_key, mac_version))
+        return req, keys_req
+
+    def _created(self, req, device):
+        if self.name_cache is not None:
+            item = api.DeviceListItem(
+                dev_eui=req.device.dev_eui,
+                name=req.device.name,
+                description=req.device.description,
+                device_profile_id=req.device.device_profile_id,
+            )
+            self.name_cache.put("device", req.device.application_id, req.device.name, req.device.dev_eui, item)
+        return device
+
+    def create_many(self, application_id, devices, concurrency=8, known_new=False, optimistic=None):
+        """Create many devices in an application with bounded concurrency.
+
+        Each device still goes through the same lookup, Create and CreateKeys steps as
+        ``create``, but up to ``concurrency`` devices are in flight at once, so the round
+        trips of different devices overlap.
+
+        Args:
+            application_id: Application ID UUID string
+            devices: Iterable of dicts holding the keyword arguments of ``create``
+                (name, dev_eui, app_key, mac_version and optional device attributes)
+            concurrency: Max number of devices being created at the same time
+            known_new: Skip the get_by_name lookup when the batch is known not to exist yet
+            optimistic: Create before looking up the name, defaults to the service setting
+
+        Returns:
+            BulkResult with the created (or existing) device or the error for each input
+            device, in input order, plus elapsed time and throughput
+        """
+
+        def create_one(device):
+            device = dict(device)
+            return self._create(
+                application_id,
+                device.pop("name"),
+                device.pop("dev_eui"),
+                device.pop("app_key"),
+                device.pop("mac_version"),
+                device.pop("description", ""),
+                device.pop("tags", None),
+                not known_new,
+                optimistic,
+                **device,
+            )
+
+        result = run_bulk(create_one, devices, concurrency)
+        logger.info(
+            f"Created {result.succeeded}/{len(result.errors)} devices in {result.elapsed:.2f}s "
+            f"({result.throughput:.1f} devices/s)"
+        )
+        return result
 
     def get(self, dev_eui):
         """Get a device by its EUI.
@@ -75,13 +208,19 @@ class DeviceService:
             Device object if found
 
         Raises:
-            Exception: If retrieval fails
+            ChirpstackRpcError: If retrieval fails
         """
         req = api.GetDeviceRequest(dev_eui=dev_eui)
         try:
             return self.stub.Get(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get device: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get device: {str(e)}", e)
+
+    def get_async(self, dev_eui):
+        """Non-blocking ``get``, returning a concurrent.futures.Future of the device."""
+        req = api.GetDeviceRequest(dev_eui=dev_eui)
+        future = futures.call(self.stub.Get, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get device")
 
     def get_by_name(self, application_id, name):
         """Get a device by its name within an application.
@@ -94,21 +233,42 @@ class DeviceService:
             Device object if found, None otherwise
 
         Raises:
-            Exception: If search fails
+            ChirpstackRpcError: If search fails
         """
+        if self.name_cache is not None:
+            cached = self.name_cache.get("device", application_id, name)
+            if cached is not None:
+                return cached
+
         req = api.ListDevicesRequest(
             limit=1,
             search=name,
             application_id=application_id,
         )
         try:
-            resp = self.stub.List(req, metadata=auth_header(self.api_token))
-            for device in resp.result:
-                if device.name == name:
-                    return device
-            return None
+            return self._find(application_id, name, self.stub.List(req, metadata=auth_header(self.api_token)))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get device by name: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get device by name: {str(e)}", e)
+
+    def get_by_name_async(self, application_id, name):
+        """Non-blocking ``get_by_name``, returning a concurrent.futures.Future of the device or None."""
+        if self.name_cache is not None:
+            cached = self.name_cache.get("device", application_id, name)
+            if cached is not None:
+                return futures.completed(cached)
+
+        req = api.ListDevicesRequest(limit=1, search=name, application_id=application_id)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda resp: self._find(application_id, name, resp))
+        return futures.wrap_errors(future, "Failed to get device by name")
+
+    def _find(self, application_id, name, resp):
+        for device in resp.result:
+            if device.name == name:
+                if self.name_cache is not None:
+                    self.name_cache.put("device", application_id, name, device.dev_eui, device)
+                return device
+        return None
 
     def update(self, dev_eui, name, app_key, mac_version, description="", tags=None, **kwargs):
         """Update an existing device.
@@ -123,22 +283,43 @@ class DeviceService:
             **kwargs: Additional device attributes to update
 
         Raises:
-            Exception: If update fails
+            ChirpstackRpcError: If update fails, the keys are then left unchanged
+        """
+        req = self._update_request(self.get(dev_eui), dev_eui, name, description, tags, **kwargs)
+        try:
+            self.stub.Update(req, metadata=auth_header(self.api_token))
+            self._invalidate(dev_eui)
+            self.update_keys(dev_eui, app_key, mac_version)
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update device: {str(e)}", e)
+
+    def update_async(self, dev_eui, name, app_key, mac_version, description="", tags=None, **kwargs):
+        """Non-blocking ``update``, returning a concurrent.futures.Future resolving to None.
+
+        Like ``update``, the calls are chained: UpdateKeys is only sent once Update succeeded.
         """
-        device = self.get(dev_eui).device
-        current_tags = dict(device.tags)
+        keys_req = api.UpdateDeviceKeysRequest(device_keys=self._DeviceKeys(dev_eui, app_key, mac_version))
 
+        def update(current):
+            req = self._update_request(current, dev_eui, name, description, tags, **kwargs)
+            return futures.call(self.stub.Update, req, metadata=auth_header(self.api_token))
+
+        def update_keys(_):
+            self._invalidate(dev_eui)
+            return futures.call(self.stub.UpdateKeys, keys_req, metadata=auth_header(self.api_token))
+
+        future = futures.then(futures.then(self.get_async(dev_eui), update), update_keys)
+        future = futures.then(future, lambda _: None)
+        return futures.wrap_errors(future, "Failed to update device")
+
+    @staticmethod
+    def _update_request(current, dev_eui, name, description, tags, **kwargs):
+        current_tags = dict(current.device.tags)
         if tags is not None:
             current_tags.update(tags)
-
-        req = api.UpdateDeviceRequest(
+        return api.UpdateDeviceRequest(
             device=api.Device(dev_eui=dev_eui, name=name, description=description, tags=current_tags, **kwargs)
         )
-        try:
-            self.stub.Update(req, metadata=auth_header(self.api_token))
-            self.update_keys(dev_eui, app_key, mac_version)
-        except grpc.RpcError as e:
-            raise Exception(f"Failed to update device: {str(e)}")
 
     def delete(self, dev_eui):
         """Delete a device.
@@ -147,13 +328,25 @@ class DeviceService:
             dev_eui: Device EUI (64-bit hex string)
 
         Raises:
-            Exception: If deletion fails
+            ChirpstackRpcError: If deletion fails
         """
         req = api.DeleteDeviceRequest(dev_eui=dev_eui)
         try:
             self.stub.Delete(req, metadata=auth_header(self.api_token))
+            self._invalidate(dev_eui)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to delete device: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to delete device: {str(e)}", e)
+
+    def delete_async(self, dev_eui):
+        """Non-blocking ``delete``, returning a concurrent.futures.Future resolving to None."""
+        req = api.DeleteDeviceRequest(dev_eui=dev_eui)
+        future = futures.call(self.stub.Delete, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(dev_eui))
+        return futures.wrap_errors(future, "Failed to delete device")
+
+    def _invalidate(self, dev_eui):
+        if self.name_cache is not None:
+            self.name_cache.invalidate_id("device", dev_eui)
 
     def list(self, application_id, limit=10, offset=0):
         """List devices in an application.
@@ -167,7 +360,7 @@ class DeviceService:
             List response containing devices
 
         Raises:
-            Exception: If listing fails
+            ChirpstackRpcError: If listing fails
         """
         req = api.ListDevicesRequest(
             application_id=application_id,
@@ -177,7 +370,40 @@ class DeviceService:
         try:
             return self.stub.List(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to list devices: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to list devices: {str(e)}", e)
+
+    def list_async(self, application_id, limit=10, offset=0):
+        """Non-blocking ``list``, returning a concurrent.futures.Future of the list response."""
+        req = api.ListDevicesRequest(application_id=application_id, limit=limit, offset=offset)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to list devices")
+
+    def iter_all(self, application_id, page_size=100, prefetch=True):
+        """Iterate over all devices in an application across pages.
+
+        Pages are requested lazily; with ``prefetch`` the next page is fetched in the
+        background while the current one is consumed.
+
+        Args:
+            application_id: Application ID UUID string
+            page_size: Number of devices requested per page
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Device list items, which also populate the name cache if one is set
+
+        Raises:
+            ChirpstackRpcError: If listing a page fails
+        """
+        devices = iter_items(lambda limit, offset: self.list(application_id, limit, offset), page_size, prefetch)
+        if self.name_cache is None:
+            return devices
+        return self._cached(application_id, devices)
+
+    def _cached(self, application_id, devices):
+        for device in devices:
+            self.name_cache.put("device", application_id, device.name, device.dev_eui, device)
+            yield device
 
     def create_keys(self, dev_eui, app_key, mac_version, **kwargs):
         """Create device keys.
@@ -189,12 +415,17 @@ class DeviceService:
             **kwargs: Additional key attributes
 
         Raises:
-            Exception: If key creation fails
+            grpc.RpcError: If key creation fails
         """
         device_keys = self._DeviceKeys(dev_eui, app_key, mac_version, **kwargs)
         req = api.CreateDeviceKeysRequest(device_keys=device_keys)
         self.stub.CreateKeys(req, metadata=auth_header(self.api_token))
 
+    def create_keys_async(self, dev_eui, app_key, mac_version, **kwargs):
+        """Non-blocking ``create_keys``, returning a concurrent.futures.Future failing with the grpc.RpcError."""
+        req = api.CreateDeviceKeysRequest(device_keys=self._DeviceKeys(dev_eui, app_key, mac_version, **kwargs))
+        return futures.call(self.stub.CreateKeys, req, metadata=auth_header(self.api_token))
+
     def update_keys(self, dev_eui, app_key, mac_version, **kwargs):
         """Update device keys.
 
@@ -205,12 +436,17 @@ class DeviceService:
             **kwargs: Additional key attributes
 
         Raises:
-            Exception: If key update fails
+            grpc.RpcError: If key update fails
         """
         device_keys = self._DeviceKeys(dev_eui, app_key, mac_version, **kwargs)
         req = api.UpdateDeviceKeysRequest(device_keys=device_keys)
         self.stub.UpdateKeys(req, metadata=auth_header(self.api_token))
 
+    def update_keys_async(self, dev_eui, app_key, mac_version, **kwargs):
+        """Non-blocking ``update_keys``, returning a concurrent.futures.Future failing with the grpc.RpcError."""
+        req = api.UpdateDeviceKeysRequest(device_keys=self._DeviceKeys(dev_eui, app_key, mac_version, **kwargs))
+        return futures.call(self.stub.UpdateKeys, req, metadata=auth_header(self.api_token))
+
     def _DeviceKeys(self, dev_eui, app_key, mac_version, **kwargs):
         """Create a DeviceKeys object.
 
@@ -250,7 +486,7 @@ class DeviceService:
             Created queue item
 
         Raises:
-            Exception: If queueing fails
+            ChirpstackRpcError: If queueing fails
         """
         if isinstance(data, str):
             data = data.encode()
@@ -260,7 +496,87 @@ class DeviceService:
         try:
             return self.stub.Enqueue(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to send downlink: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to send downlink: {str(e)}", e)
+
+    def queue_downlink_async(self, dev_eui, data, fport=10, **kwargs):
+        """Non-blocking ``queue_downlink``, returning a concurrent.futures.Future of the queue item."""
+        if isinstance(data, str):
+            data = data.encode()
+        req = api.EnqueueDeviceQueueItemRequest(
+            queue_item=api.DeviceQueueItem(dev_eui=dev_eui, f_port=fport, data=data, **kwargs)
+        )
+        future = futures.call(self.stub.Enqueue, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to send downlink")
+
+    def queue_downlink_many(self, downlinks, concurrency=8, rate=None, burst=None, key=None, limiter=None, flush=False):
+        """Queue downlinks for many devices with bounded concurrency and rate shaping.
+
+        With a rate, every downlink takes a token from the bucket of its key before being
+        enqueued. Downlinks are dispatched round-robin across keys, so a throttled gateway
+        does not hold up the workers while others still have budget.
+
+        Args:
+            downlinks: Iterable of dicts holding the keyword arguments of ``queue_downlink``
+                (dev_eui, data, and optional fport and queue item attributes)
+            concurrency: Max number of devices being handled at the same time
+            rate: Max downlinks per second enqueued for each key, None for no limit
+            burst: Downlinks a key may enqueue at once after being idle, defaults to ``rate``
+            key: Rate limiting key of a downlink: either the name of an entry of its dict
+                (e.g. "application_id" or "gateway_id"), removed before enqueueing, or a
+                callable taking a copy of the dict, which it may also remove entries from.
+                None makes all downlinks share one bucket.
+            limiter: KeyedRateLimiter to use instead of ``rate`` and ``burst``, e.g. to share
+                the limit with other calls
+            flush: Flush the queue of every device once before queueing any downlink, dropping
+                its pending downlinks. Downlinks of a device whose flush fails are not queued.
+
+        Returns:
+            BulkResult with the enqueue response (holding the queue item ID) or the error for
+            each input downlink, in input order, plus elapsed time and throughput. A downlink
+            whose key cannot be extracted gets that error and is not queued.
+        """
+        if limiter is None and rate is not None:
+            limiter = KeyedRateLimiter(rate, burst)
+
+        entries, errors = _key_entries(downlinks, key)
+        elapsed = self._flush_queues(entries, errors, concurrency) if flush else 0.0
+
+        order = [index for index in _round_robin(entries) if errors[index] is None]
+
+        def enqueue(index):
+            downlink, bucket = entries[index]
+            if limiter is not None:
+                limiter.acquire(bucket)
+            return self.queue_downlink(**downlink)
+
+        shuffled = run_bulk(enqueue, order, concurrency)
+        result = BulkResult(results=[None] * len(entries), errors=errors, elapsed=elapsed + shuffled.elapsed)
+        for position, index in enumerate(order):
+            result.results[index] = shuffled.results[position]
+            result.errors[index] = shuffled.errors[position]
+        logger.info(
+            f"Queued {result.succeeded}/{len(result.errors)} downlinks in {result.elapsed:.2f}s "
+            f"({result.throughput:.1f} downlinks/s)"
+        )
+        return result
+
+    def _flush_queues(self, entries, errors, concurrency):
+        """Flush the queue of every device of the (downlink, key) entries once.
+
+        The error of a failed flush is set on the entries of the device that have no error yet.
+
+        Returns:
+            Elapsed time in seconds
+        """
+        dev_euis = list(
+            dict.fromkeys(downlink.get("dev_eui") for (downlink, _), error in zip(entries, errors) if not error)
+        )
+        flushed = run_bulk(self.flush_queue, dev_euis, concurrency)
+        failed = {dev_euis[i]: error for i, error in flushed.failed}
+        for index, (downlink, _) in enumerate(entries):
+            if errors[index] is None:
+                errors[index] = failed.get(downlink.get("dev_eui"))
+        return flushed.elapsed
 
     def get_queue_items(self, dev_eui):
         """Get queued items for a device.
@@ -272,13 +588,19 @@ class DeviceService:
             List of queued items
 
         Raises:
-            Exception: If retrieval fails
+            ChirpstackRpcError: If retrieval fails
         """
         req = api.GetDeviceQueueItemsRequest(dev_eui=dev_eui)
         try:
             return self.stub.GetQueue(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get queue items: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get queue items: {str(e)}", e)
+
+    def get_queue_items_async(self, dev_eui):
+        """Non-blocking ``get_queue_items``, returning a concurrent.futures.Future of the queue items."""
+        req = api.GetDeviceQueueItemsRequest(dev_eui=dev_eui)
+        future = futures.call(self.stub.GetQueue, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get queue items")
 
     def flush_queue(self, dev_eui):
         """Flush the queue for a device.
@@ -290,10 +612,51 @@ class DeviceService:
             Result of flush operation
 
         Raises:
-            Exception: If flush fails
+            ChirpstackRpcError: If flush fails
         """
         req = api.FlushDeviceQueueRequest(dev_eui=dev_eui)
         try:
             return self.stub.FlushQueue(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to flush queue: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to flush queue: {str(e)}", e)
+
+    def flush_queue_async(self, dev_eui):
+        """Non-blocking ``flush_queue``, returning a concurrent.futures.Future of the flush result."""
+        req = api.FlushDeviceQueueRequest(dev_eui=dev_eui)
+        future = futures.call(self.stub.FlushQueue, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to flush queue")
+
+
+def _key_entries(downlinks, key):
+    """Copy the downlinks and extract their rate limiting key as in ``queue_downlink_many``.
+
+    Returns:
+        List of (downlink, key) entries and list of the errors raised extracting each key, or None
+    """
+    entries = []
+    errors = []
+    for downlink in downlinks:
+        downlink = dict(downlink)
+        bucket = error = None
+        try:
+            if callable(key):
+                bucket = key(downlink)
+            elif key is not None:
+                bucket = downlink.pop(key)
+        except Exception as e:
+            error = e
+        entries.append((downlink, bucket))
+        errors.append(error)
+    return entries, errors
+
+
+def _round_robin(entries):
+    """Return the indices of (item, key) entries interleaved across keys, keeping the order within a key."""
+    counts = {}
+    ranked = []
+    for index, (_, key) in enumerate(entries):
+        rank = counts.get(key, 0)
+        counts[key] = rank + 1
+        ranked.append((rank, index))
+    ranked.sort()
+    return [index for _, index in ranked]
@@ -1,51 +1,107 @@
 import grpc
 from chirpstack_api import api
 
-from ..utils.helpers import auth_header, create_channel
+from ..exceptions import ChirpstackRpcError
+from ..utils import futures, helpers
+from ..utils.channel_pool import get_channel
+from ..utils.helpers import auth_header
+from ..utils.pagination import iter_items
 
 
 class DeviceProfileService:
-    def __init__(self, server_address, api_token):
+    def __init__(
+        self, server_address, api_token, channel_pool=None, name_cache=None, optimistic=False, is_conflict=None
+    ):
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = api.DeviceProfileServiceStub(self.channel)
+        self.name_cache = name_cache
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
 
-    def create(self, tenant_id, name, **kwargs):
+    def create(self, tenant_id, name, optimistic=None, **kwargs):
+        req = api.CreateDeviceProfileRequest(device_profile=api.DeviceProfile(name=name, tenant_id=tenant_id, **kwargs))
         try:
-            existing_profile = self.get_by_name(tenant_id, name)
-            if existing_profile:
-                return existing_profile
-
-            req = api.CreateDeviceProfileRequest(
-                device_profile=api.DeviceProfile(name=name, tenant_id=tenant_id, **kwargs)
+            return helpers.create_or_get(
+                lambda: self._created(req, self.stub.Create(req, metadata=auth_header(self.api_token))),
+                lambda: self.get_by_name(tenant_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
             )
-            return self.stub.Create(req, metadata=auth_header(self.api_token))
-
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create device profile: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create device profile: {str(e)}", e)
+
+    def create_async(self, tenant_id, name, optimistic=None, **kwargs):
+        """Non-blocking ``create``, returning a concurrent.futures.Future of the device profile."""
+        req = api.CreateDeviceProfileRequest(device_profile=api.DeviceProfile(name=name, tenant_id=tenant_id, **kwargs))
+        future = helpers.create_or_get_future(
+            lambda: futures.then(
+                futures.call(self.stub.Create, req, metadata=auth_header(self.api_token)),
+                lambda resp: self._created(req, resp),
+            ),
+            lambda: self.get_by_name_async(tenant_id, name),
+            self.optimistic if optimistic is None else optimistic,
+            self.is_conflict,
+        )
+        return futures.wrap_errors(future, "Failed to create device profile")
+
+    def _created(self, req, resp):
+        if self.name_cache is not None:
+            name = req.device_profile.name
+            profile = api.DeviceProfileListItem(id=resp.id, name=name)
+            self.name_cache.put("device_profile", req.device_profile.tenant_id, name, resp.id, profile)
+        return resp
 
     def get(self, device_profile_id):
         req = api.GetDeviceProfileRequest(id=device_profile_id)
         try:
             return self.stub.Get(req, metadata=auth_header(self.api_token)).device_profile
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get device profile: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get device profile: {str(e)}", e)
+
+    def get_async(self, device_profile_id):
+        """Non-blocking ``get``, returning a concurrent.futures.Future of the device profile."""
+        req = api.GetDeviceProfileRequest(id=device_profile_id)
+        future = futures.call(self.stub.Get, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda resp: resp.device_profile)
+        return futures.wrap_errors(future, "Failed to get device profile")
 
     def get_by_name(self, tenant_id, name):
+        if self.name_cache is not None:
+            cached = self.name_cache.get("device_profile", tenant_id, name)
+            if cached is not None:
+                return cached
+
         req = api.ListDeviceProfilesRequest(
             limit=1,
             search=name,
             tenant_id=tenant_id,
         )
         try:
-            resp = self.stub.List(req, metadata=auth_header(self.api_token))
-            for profile in resp.result:
-                if profile.name == name:
-                    return profile
-            return None
+            return self._find(tenant_id, name, self.stub.List(req, metadata=auth_header(self.api_token)))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get device profile by name: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get device profile by name: {str(e)}", e)
+
+    def get_by_name_async(self, tenant_id, name):
+        """Non-blocking ``get_by_name``, returning a concurrent.futures.Future of the device profile or None."""
+        if self.name_cache is not None:
+            cached = self.name_cache.get("device_profile", tenant_id, name)
+            if cached is not None:
+                return futures.completed(cached)
+
+        req = api.ListDeviceProfilesRequest(limit=1, search=name, tenant_id=tenant_id)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda resp: self._find(tenant_id, name, resp))
+        return futures.wrap_errors(future, "Failed to get device profile by name")
+
+    def _find(self, tenant_id, name, resp):
+        for profile in resp.result:
+            if profile.name == name:
+                if self.name_cache is not None:
+                    self.name_cache.put("device_profile", tenant_id, name, profile.id, profile)
+                return profile
+        return None
 
     def update(self, device_profile_id, name, **kwargs):
         req = api.UpdateDeviceProfileRequest(
@@ -53,15 +109,37 @@ class DeviceProfileService:
         )
         try:
             self.stub.Update(req, metadata=auth_header(self.api_token))
+            self._invalidate(device_profile_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to update device profile: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to update device profile: {str(e)}", e)
+
+    def update_async(self, device_profile_id, name, **kwargs):
+        """Non-blocking ``update``, returning a concurrent.futures.Future resolving to None."""
+        req = api.UpdateDeviceProfileRequest(
+            device_profile=api.DeviceProfile(id=device_profile_id, name=name, **kwargs)
+        )
+        future = futures.call(self.stub.Update, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(device_profile_id))
+        return futures.wrap_errors(future, "Failed to update device profile")
 
     def delete(self, device_profile_id):
         req = api.DeleteDeviceProfileRequest(id=device_profile_id)
         try:
             self.stub.Delete(req, metadata=auth_header(self.api_token))
+            self._invalidate(device_profile_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to delete device profile: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to delete device profile: {str(e)}", e)
+
+    def delete_async(self, device_profile_id):
+        """Non-blocking ``delete``, returning a concurrent.futures.Future resolving to None."""
+        req = api.DeleteDeviceProfileRequest(id=device_profile_id)
+        future = futures.call(self.stub.Delete, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(device_profile_id))
+        return futures.wrap_errors(future, "Failed to delete device profile")
+
+    def _invalidate(self, device_profile_id):
+        if self.name_cache is not None:
+            self.name_cache.invalidate_id("device_profile", device_profile_id)
 
     def list(self, tenant_id, limit=10, offset=0):
         req = api.ListDeviceProfilesRequest(
@@ -72,4 +150,22 @@ class DeviceProfileService:
         try:
             return self.stub.List(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to list device profiles: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to list device profiles: {str(e)}", e)
+
+    def list_async(self, tenant_id, limit=10, offset=0):
+        """Non-blocking ``list``, returning a concurrent.futures.Future of the list response."""
+        req = api.ListDeviceProfilesRequest(tenant_id=tenant_id, limit=limit, offset=offset)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to list device profiles")
+
+    def iter_all(self, tenant_id, page_size=100, prefetch=True):
+        """Iterate over all device profiles of a tenant across pages, prefetching the next page in the background."""
+        profiles = iter_items(lambda limit, offset: self.list(tenant_id, limit, offset), page_size, prefetch)
+        if self.name_cache is None:
+            return profiles
+        return self._cached(tenant_id, profiles)
+
+    def _cached(self, tenant_id, profiles):
+        for profile in profiles:
+            self.name_cache.put("device_profile", tenant_id, profile.name, profile.id, profile)
+            yield profile
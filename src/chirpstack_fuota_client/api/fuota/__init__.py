@@ -1,7 +1,42 @@
-from .service import FuotaService
-from .utils import FuotaUtils
+from ...utils.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "FuotaService": ".service",
+        "FuotaUtils": ".utils",
+        "DeploymentStatusEvent": ".watch",
+        "DeploymentWatch": ".watch",
+        "FirmwareImage": ".firmware",
+        "load_firmware": ".firmware",
+        "FragmentationPlan": ".planner",
+        "find_fastest_plan": ".planner",
+        "frame_airtime": ".planner",
+        "plan_fragmentation": ".planner",
+        "SessionSimulation": ".simulation",
+        "simulate_deployment": ".simulation",
+        "simulate_session": ".simulation",
+        "Shard": ".sharding",
+        "ShardedDeployment": ".sharding",
+        "shard_devices": ".sharding",
+    },
+)
 
 __all__ = [
     "FuotaService",
     "FuotaUtils",
+    "DeploymentStatusEvent",
+    "DeploymentWatch",
+    "FirmwareImage",
+    "load_firmware",
+    "FragmentationPlan",
+    "find_fastest_plan",
+    "frame_airtime",
+    "plan_fragmentation",
+    "SessionSimulation",
+    "simulate_deployment",
+    "simulate_session",
+    "Shard",
+    "ShardedDeployment",
+    "shard_devices",
 ]
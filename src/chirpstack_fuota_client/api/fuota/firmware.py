@@ -0,0 +1,133 @@
+import hashlib
+import mmap
+import os
+
+from ...utils.cache import LRUCache
+
+# FragSessionSetupReq carries the fragment size in one byte, and DataFragment
+# numbers fragments (data and redundancy) with a 14-bit counter starting at 1.
+MAX_FRAGMENT_SIZE = 255
+MAX_FRAGMENTS = 2**14 - 1
+
+# Images by ("sha256", digest), and the digest of files by ("path", path, size, mtime_ns)
+# so an unchanged file is neither read nor hashed again.
+_image_cache = LRUCache(maxsize=64)
+
+
+class FirmwareImage:
+    """Firmware payload of a deployment, hashed once and shared by every deployment using it.
+
+    Files are memory-mapped instead of read, so holding many images only costs address
+    space and the pages the OS keeps cached. Use ``load_firmware`` rather than the
+    constructor to get cached instances.
+
+    Args:
+        buffer: bytes, or any object supporting the buffer protocol (e.g. an mmap)
+        path: File the buffer maps, if any
+
+    Attributes:
+        digest: Hex SHA-256 of the image
+        size: Image size in bytes
+    """
+
+    def __init__(self, buffer, path=None):
+        self.path = path
+        self._buffer = buffer
+        self._payload = buffer if isinstance(buffer, bytes) else None
+        self.size = len(memoryview(buffer))
+        self.digest = hashlib.sha256(buffer).hexdigest()
+
+    @classmethod
+    def from_path(cls, path):
+        path = os.fspath(path)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap refuses empty files, there is nothing to share anyway.
+                return cls(b"", path=path)
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path=path)
+
+    def view(self):
+        """Return a read-only memoryview of the image, without copying it."""
+        return memoryview(self._buffer).toreadonly()
+
+    @property
+    def payload(self):
+        """The image as bytes, as required by the protobuf request.
+
+        Images built from bytes return them as is. Mapped files are copied on first access
+        only, and every later deployment or shard gets the same bytes object.
+        """
+        if self._payload is None:
+            self._payload = bytes(self._buffer)
+        return self._payload
+
+    def fragment_count(self, fragment_size):
+        """Number of data fragments of ``fragment_size`` bytes, the last one being padded."""
+        return -(-self.size // fragment_size)
+
+    def validate(self, fragment_size=None, redundancy=0, max_size=None):
+        """Check that the image can be sent with the given fragmentation settings.
+
+        :param fragment_size: int, fragment size in bytes, None to only check the image size
+        :param redundancy: int, number of redundancy fragments
+        :param max_size: int, optional upper bound of the image size in bytes
+        :return: int, the number of data fragments, None if no fragment size was given
+        :raises ValueError: if the image is empty, too large or needs too many fragments
+        """
+        if self.size == 0:
+            raise ValueError("Firmware image is empty")
+        if max_size is not None and self.size > max_size:
+            raise ValueError(f"Firmware image is {self.size} bytes, more than the {max_size} bytes allowed")
+        if fragment_size is None:
+            return None
+        if not 1 <= fragment_size <= MAX_FRAGMENT_SIZE:
+            raise ValueError(f"Fragment size must be between 1 and {MAX_FRAGMENT_SIZE} bytes")
+        fragments = self.fragment_count(fragment_size)
+        if fragments + redundancy > MAX_FRAGMENTS:
+            raise ValueError(
+                f"Firmware image needs {fragments} fragments of {fragment_size} bytes plus {redundancy} "
+                f"redundancy fragments, more than the {MAX_FRAGMENTS} a fragmentation session supports"
+            )
+        return fragments
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"FirmwareImage(size={self.size}, digest={self.digest[:12]}, path={self.path!r})"
+
+
+def load_firmware(source):
+    """Return the cached FirmwareImage of a file path, buffer or FirmwareImage.
+
+    Files are identified by path, size and modification time, so an unchanged file is
+    mapped and hashed only once. Images with the same content, whatever their source,
+    resolve to the same FirmwareImage.
+    """
+    if isinstance(source, FirmwareImage):
+        return source
+
+    if isinstance(source, (str, os.PathLike)):
+        path = os.path.abspath(os.fspath(source))
+        stat = os.stat(path)
+        path_key = ("path", path, stat.st_size, stat.st_mtime_ns)
+        digest = _image_cache.get(path_key)
+        image = _image_cache.get(("sha256", digest)) if digest is not None else None
+        if image is None:
+            image = _cached(FirmwareImage.from_path(path))
+            _image_cache.set(path_key, image.digest)
+        return image
+
+    if isinstance(source, (bytearray, memoryview)):
+        # Mutable buffers are snapshotted, the caller may reuse them.
+        source = bytes(source)
+    return _cached(FirmwareImage(source))
+
+
+def _cached(image):
+    key = ("sha256", image.digest)
+    cached = _image_cache.get(key)
+    if cached is not None:
+        return cached
+    _image_cache.set(key, image)
+    return image
@@ -0,0 +1,167 @@
+import functools
+
+from ...utils.optional import require
+
+# Forward error correction of the LoRaWAN Fragmented Data Block Transport (TS004 v1.0.0
+# appendix): the redundancy fragments the FUOTA server sends after the data fragments,
+# and the reconstruction a device performs from the fragments it received.
+
+
+def _prbs23(x):
+    b0 = x & 1
+    b1 = (x & 32) >> 5
+    return (x >> 1) + ((b0 ^ b1) << 22)
+
+
+def matrix_line(n, m):
+    """Return line ``n`` (1-based) of the parity matrix of ``m`` data fragments.
+
+    This is the reference implementation of the specification, one line at a time;
+    parity_matrix computes many lines at once.
+
+    :param n: int, index of the redundancy fragment, starting at 1
+    :param m: int, number of data fragments
+    :return: list of m ints, 1 for the data fragments XORed into the redundancy fragment
+    """
+    line = [0] * m
+    mm = 1 if m & (m - 1) == 0 else 0
+    x = 1 + 1001 * n
+    for _ in range(m // 2):
+        r = 1 << 16
+        while r >= m or line[r] == 1:
+            x = _prbs23(x)
+            r = x % (m + mm)
+        line[r] = 1
+    return line
+
+
+@functools.lru_cache(maxsize=16)
+def _parity_matrix(m, redundancy):
+    np = require("numpy", "numpy")
+    matrix = np.zeros((redundancy, m), dtype=bool)
+    if redundancy == 0 or m < 2:
+        matrix.flags.writeable = False
+        return matrix
+
+    # Run the PRBS of every line in lockstep: each step advances all lines still missing
+    # coefficients, and accepts the drawn column where it is in range and not yet set.
+    mm = 1 if m & (m - 1) == 0 else 0
+    rows = np.arange(redundancy)
+    x = 1 + 1001 * (rows.astype(np.int64) + 1)
+    remaining = np.full(redundancy, m // 2)
+    active = rows
+    while active.size:
+        x_active = x[active]
+        x_active = (x_active >> 1) + (((x_active & 1) ^ ((x_active >> 5) & 1)) << 22)
+        x[active] = x_active
+        r = x_active % (m + mm)
+        valid = r < m
+        r_valid = np.where(valid, r, 0)
+        accept = valid & ~matrix[active, r_valid]
+        matrix[active[accept], r[accept]] = True
+        remaining[active[accept]] -= 1
+        active = active[remaining[active] > 0]
+
+    matrix.flags.writeable = False
+    return matrix
+
+
+def parity_matrix(m, redundancy):
+    """Return the (redundancy, m) boolean parity matrix, line i being matrix_line(i + 1, m).
+
+    Matrices are cached, the returned array is read-only.
+    """
+    return _parity_matrix(m, redundancy)
+
+
+def _xor_combine(np, matrix, blocks):
+    # GF(2) product of a boolean matrix with byte blocks, through a float32 matmul on bits.
+    # Counts never exceed the number of fragments, so float32 holds them exactly.
+    if matrix.shape[0] == 0 or blocks.shape[0] == 0:
+        return np.zeros((matrix.shape[0], blocks.shape[1]), dtype=np.uint8)
+    bits = np.unpackbits(blocks, axis=1).astype(np.float32)
+    counts = matrix.astype(np.float32) @ bits
+    return np.packbits(counts.astype(np.int64) & 1, axis=1).astype(np.uint8)
+
+
+def encode(payload, fragment_size, redundancy):
+    """Split a payload into data fragments and append the redundancy fragments.
+
+    The payload is zero-padded to a multiple of ``fragment_size``, as the FUOTA server does.
+
+    :param payload: bytes, buffer or FirmwareImage
+    :param fragment_size: int, fragment size in bytes
+    :param redundancy: int, number of redundancy fragments
+    :return: uint8 array of shape (fragments + redundancy, fragment_size)
+    """
+    np = require("numpy", "numpy")
+    if fragment_size < 1:
+        raise ValueError("fragment_size must be at least 1")
+    if hasattr(payload, "view"):
+        payload = payload.view()
+    data = np.frombuffer(payload, dtype=np.uint8)
+    m = -(-data.size // fragment_size)
+    fragments = np.zeros((m + redundancy, fragment_size), dtype=np.uint8)
+    fragments[:m].reshape(-1)[: data.size] = data
+    fragments[m:] = _xor_combine(np, parity_matrix(m, redundancy), fragments[:m])
+    return fragments
+
+
+def decode(fragments, m, size=None):
+    """Reconstruct the payload from the fragments a device received.
+
+    Missing data fragments are solved by Gaussian elimination over GF(2), restricted to
+    the missing columns: received data fragments are first folded into the right-hand
+    side of the redundancy equations.
+
+    :param fragments: dict of fragment index (1-based, as in DataFragment) to fragment bytes
+    :param m: int, number of data fragments
+    :param size: int, payload size to strip the padding to, None to keep it
+    :return: bytes, the reconstructed payload
+    :raises ValueError: if the received fragments are not enough to reconstruct the payload
+    """
+    np = require("numpy", "numpy")
+    if not fragments:
+        raise ValueError("No fragment received")
+    fragment_size = len(next(iter(fragments.values())))
+    data = np.zeros((m, fragment_size), dtype=np.uint8)
+    known = np.zeros(m, dtype=bool)
+    coded_indices = []
+    for index, fragment in fragments.items():
+        if 1 <= index <= m:
+            data[index - 1] = np.frombuffer(fragment, dtype=np.uint8)
+            known[index - 1] = True
+        elif index > m:
+            coded_indices.append(index)
+
+    missing = np.flatnonzero(~known)
+    if missing.size:
+        if len(coded_indices) < missing.size:
+            raise ValueError(
+                f"{missing.size} data fragments missing, only {len(coded_indices)} redundancy fragments received"
+            )
+        lines = np.array(coded_indices) - m
+        matrix = parity_matrix(m, int(lines.max()))[lines - 1]
+        rhs = np.array([np.frombuffer(fragments[i], dtype=np.uint8) for i in coded_indices])
+        rhs ^= _xor_combine(np, matrix[:, known], data[known])
+        data[missing] = _solve_gf2(np, matrix[:, missing].copy(), rhs, missing.size)
+
+    payload = data.tobytes()
+    return payload if size is None else payload[:size]
+
+
+def _solve_gf2(np, a, b, unknowns):
+    # Every column needs a pivot, so the pivot of column ``col`` ends up in row ``col``.
+    for col in range(unknowns):
+        candidates = np.flatnonzero(a[col:, col])
+        if candidates.size == 0:
+            raise ValueError("Not enough independent redundancy fragments to reconstruct the payload")
+        pivot = col + candidates[0]
+        if pivot != col:
+            a[[col, pivot]] = a[[pivot, col]]
+            b[[col, pivot]] = b[[pivot, col]]
+        others = np.flatnonzero(a[:, col])
+        others = others[others != col]
+        a[others] ^= a[col]
+        b[others] ^= b[col]
+    return b[:unknowns]
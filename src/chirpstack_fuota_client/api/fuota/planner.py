@@ -0,0 +1,372 @@
+import functools
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from .firmware import MAX_FRAGMENT_SIZE, MAX_FRAGMENTS
+
+# DataFragment command: CID (1 byte) and the FragIndex/N field (2 bytes) precede the data.
+FRAGMENT_HEADER_SIZE = 3
+# MHDR (1), FHDR without FOpts (7), FPort (1) and MIC (4) around the FRMPayload.
+MAC_OVERHEAD = 13
+LORA_PREAMBLE_SYMBOLS = 8
+LORA_CODING_RATE = 1  # 4/5
+# FSK: preamble (5), sync word (3), length (1) and CRC (2) bytes around the PHY payload.
+FSK_OVERHEAD = 11
+# Class C multicast sessions last 2 ** multicast_timeout seconds, class B ones
+# 2 ** multicast_timeout beacon periods of 128 seconds; the field is 4 bits.
+MAX_MULTICAST_TIMEOUT = 15
+BEACON_PERIOD = 128.0
+
+
+@dataclass(frozen=True)
+class DataRate:
+    """A downlink data rate of a regional channel plan.
+
+    Attributes:
+        spreading_factor: LoRa spreading factor, None for FSK
+        bandwidth: Bandwidth in kHz (LoRa) or bit rate in kbit/s (FSK)
+        max_payload: Max FRMPayload size in bytes (N, without repeater)
+    """
+
+    spreading_factor: Optional[int]
+    bandwidth: int
+    max_payload: int
+
+
+def _lora(sf, bw, n):
+    return DataRate(sf, bw, n)
+
+
+_EU_DRS = {
+    0: _lora(12, 125, 51),
+    1: _lora(11, 125, 51),
+    2: _lora(10, 125, 51),
+    3: _lora(9, 125, 115),
+    4: _lora(8, 125, 242),
+    5: _lora(7, 125, 242),
+    6: _lora(7, 250, 242),
+    7: DataRate(None, 50, 242),
+}
+_US_DOWNLINK_DRS = {
+    8: _lora(12, 500, 53),
+    9: _lora(11, 500, 129),
+    10: _lora(10, 500, 242),
+    11: _lora(9, 500, 242),
+    12: _lora(8, 500, 242),
+    13: _lora(7, 500, 242),
+}
+# Downlink dwell time limitation off.
+_AS_DRS = {
+    0: _lora(12, 125, 51),
+    1: _lora(11, 125, 51),
+    2: _lora(10, 125, 51),
+    3: _lora(9, 125, 115),
+    4: _lora(8, 125, 242),
+    5: _lora(7, 125, 242),
+    6: _lora(7, 250, 242),
+    7: DataRate(None, 50, 242),
+}
+_KR_IN_DRS = {
+    0: _lora(12, 125, 51),
+    1: _lora(11, 125, 51),
+    2: _lora(10, 125, 51),
+    3: _lora(9, 125, 115),
+    4: _lora(8, 125, 242),
+    5: _lora(7, 125, 242),
+}
+
+# Downlink data rates per region (RP002-1.0.3), usable for multicast sessions.
+REGION_DATA_RATES = {
+    "EU868": _EU_DRS,
+    "EU433": _EU_DRS,
+    "CN779": _EU_DRS,
+    "RU864": _EU_DRS,
+    "US915": _US_DOWNLINK_DRS,
+    "AU915": _US_DOWNLINK_DRS,
+    "AS923": _AS_DRS,
+    "AS923_2": _AS_DRS,
+    "AS923_3": _AS_DRS,
+    "AS923_4": _AS_DRS,
+    "KR920": _KR_IN_DRS,
+    "IN865": {**_KR_IN_DRS, 7: DataRate(None, 50, 242)},
+    "CN470": {dr: _lora(12 - dr, 125, n) for dr, n in enumerate((51, 51, 51, 115, 242, 242))},
+}
+
+# Transmit duty cycle of the gateway per region, 1.0 where none applies (dwell time or LBT rules instead).
+REGION_DUTY_CYCLES = {
+    "EU868": 0.01,
+    "EU433": 0.01,
+    "CN779": 0.01,
+    "RU864": 0.01,
+    "AS923": 0.01,
+    "AS923_2": 0.01,
+    "AS923_3": 0.01,
+    "AS923_4": 0.01,
+}
+
+# EU868 sub-bands as (low Hz, high Hz, duty cycle), ETSI EN 300 220.
+EU868_SUB_BANDS = (
+    (863_000_000, 868_000_000, 0.01),
+    (868_000_000, 868_600_000, 0.01),
+    (868_700_000, 869_200_000, 0.001),
+    (869_400_000, 869_650_000, 0.1),
+    (869_700_000, 870_000_000, 0.01),
+)
+
+
+def _region_name(region):
+    # Accept fuota_pb2.Region values as well as their names.
+    if isinstance(region, int):
+        from ...proto.fuota import fuota_pb2
+
+        return fuota_pb2.Region.Name(region)
+    return region
+
+
+def data_rate(region, dr):
+    """Return the DataRate of ``dr`` in ``region``, raising ValueError if it does not exist."""
+    region = _region_name(region)
+    if region not in REGION_DATA_RATES:
+        raise ValueError(f"No data rate table for region {region}")
+    data_rates = REGION_DATA_RATES[region]
+    if dr not in data_rates:
+        raise ValueError(f"Invalid downlink data rate {dr} for region {region}, expected one of {sorted(data_rates)}")
+    return data_rates[dr]
+
+
+def duty_cycle(region, frequency=None):
+    """Return the gateway duty cycle for ``region``, per sub-band in EU868 when ``frequency`` (Hz) is given."""
+    region = _region_name(region)
+    if region == "EU868" and frequency is not None:
+        for low, high, cycle in EU868_SUB_BANDS:
+            if low <= frequency < high:
+                return cycle
+    return REGION_DUTY_CYCLES.get(region, 1.0)
+
+
+def _lora_airtime(sf, bw, phy_payload_size):
+    symbol_time = (2**sf) / (bw * 1000)
+    low_data_rate = symbol_time > 0.016
+    # Downlinks are sent with an explicit header and without payload CRC.
+    numerator = 8 * phy_payload_size - 4 * sf + 28
+    payload_symbols = LORA_PREAMBLE_SYMBOLS + max(
+        math.ceil(numerator / (4 * (sf - 2 * low_data_rate))) * (LORA_CODING_RATE + 4), 0
+    )
+    return (LORA_PREAMBLE_SYMBOLS + 4.25) * symbol_time + payload_symbols * symbol_time
+
+
+@functools.lru_cache(maxsize=None)
+def _airtime_table(rate):
+    # Airtime of every FRMPayload size the data rate allows, computed once per data rate.
+    sizes = range(rate.max_payload + 1)
+    if rate.spreading_factor is None:
+        return tuple((size + MAC_OVERHEAD + FSK_OVERHEAD) * 8 / (rate.bandwidth * 1000) for size in sizes)
+    return tuple(_lora_airtime(rate.spreading_factor, rate.bandwidth, size + MAC_OVERHEAD) for size in sizes)
+
+
+def frame_airtime(region, dr, frm_payload_size):
+    """Return the time on air in seconds of a downlink carrying ``frm_payload_size`` bytes."""
+    rate = data_rate(region, dr)
+    if not 0 <= frm_payload_size <= rate.max_payload:
+        raise ValueError(f"FRMPayload of {frm_payload_size} bytes does not fit DR{dr} (max {rate.max_payload})")
+    return _airtime_table(rate)[frm_payload_size]
+
+
+@dataclass(frozen=True)
+class FragmentationPlan:
+    """Timing of a fragmentation session for a given payload and set of parameters.
+
+    Attributes:
+        region: Region name
+        dr: Multicast data rate
+        fragment_size: Fragment size in bytes
+        redundancy: Number of redundancy fragments
+        fragments: Number of data fragments
+        frame_airtime: Time on air of one fragment in seconds
+        frame_interval: Time between the start of two fragments in seconds
+        transfer_time: Time to send every fragment in seconds
+        total_airtime: Time on air of every fragment in seconds
+        duty_cycle: Duty cycle the gateway is subject to
+        duty_cycle_usage: Share of one hour of duty-cycle budget used by the session
+        multicast_timeout: Smallest multicast_timeout covering the transfer
+    """
+
+    region: str
+    dr: int
+    fragment_size: int
+    redundancy: int
+    fragments: int
+    frame_airtime: float
+    frame_interval: float
+    transfer_time: float
+    total_airtime: float
+    duty_cycle: float
+    duty_cycle_usage: float
+    multicast_timeout: int
+
+    def deployment_config(self, **kwargs):
+        """Return FuotaUtils.create_deployment_config with this plan's fragmentation settings."""
+        from .utils import FuotaUtils
+
+        return FuotaUtils.create_deployment_config(**{
+            "fragmentation_fragment_size": self.fragment_size,
+            "fragmentation_redundancy": self.redundancy,
+            "multicast_timeout": self.multicast_timeout,
+            **kwargs,
+        })
+
+
+def _payload_size(payload):
+    return payload if isinstance(payload, int) else len(payload)
+
+
+def _multicast_timeout(transfer_time, multicast_group_type):
+    unit = BEACON_PERIOD if multicast_group_type == "CLASS_B" else 1.0
+    exponent = max(0, math.ceil(math.log2(max(transfer_time / unit, 1.0))))
+    return exponent if exponent <= MAX_MULTICAST_TIMEOUT else None
+
+
+def _plan(region, dr, rate, size, fragment_size, redundancy, cycle, multicast_group_type, ping_slot_period):
+    fragments = -(-size // fragment_size)
+    airtime = _airtime_table(rate)[fragment_size + FRAGMENT_HEADER_SIZE]
+    interval = airtime / cycle
+    if multicast_group_type == "CLASS_B":
+        # One fragment per ping slot at most.
+        interval = max(interval, float(2**ping_slot_period))
+    frames = fragments + redundancy
+    transfer_time = (frames - 1) * interval + airtime
+    return FragmentationPlan(
+        region=region,
+        dr=dr,
+        fragment_size=fragment_size,
+        redundancy=redundancy,
+        fragments=fragments,
+        frame_airtime=airtime,
+        frame_interval=interval,
+        transfer_time=transfer_time,
+        total_airtime=frames * airtime,
+        duty_cycle=cycle,
+        duty_cycle_usage=frames * airtime / (3600 * cycle),
+        multicast_timeout=_multicast_timeout(transfer_time, multicast_group_type),
+    )
+
+
+def plan_fragmentation(
+    payload,
+    region,
+    dr,
+    fragment_size,
+    redundancy=0,
+    frequency=None,
+    multicast_group_type="CLASS_C",
+    ping_slot_period=1,
+):
+    """Compute the timing of a fragmentation session.
+
+    Args:
+        payload: Payload size in bytes, or the payload itself (bytes, FirmwareImage)
+        region: Region name or fuota_pb2.Region value
+        dr: Multicast data rate
+        fragment_size: Fragment size in bytes
+        redundancy: Number of redundancy fragments
+        frequency: Multicast frequency in Hz, selects the EU868 sub-band duty cycle
+        multicast_group_type: "CLASS_C" or "CLASS_B"
+        ping_slot_period: Class B ping slot periodicity (a ping slot every 2 ** n seconds)
+
+    Returns:
+        FragmentationPlan
+
+    Raises:
+        ValueError: If the fragments do not fit the data rate, there are too many of them or
+            the session outlasts the longest multicast timeout
+    """
+    region = _region_name(region)
+    rate = data_rate(region, dr)
+    size = _payload_size(payload)
+    if size < 1:
+        raise ValueError("Payload is empty")
+    max_fragment_size = min(MAX_FRAGMENT_SIZE, rate.max_payload - FRAGMENT_HEADER_SIZE)
+    if not 1 <= fragment_size <= max_fragment_size:
+        raise ValueError(f"Fragment size must be between 1 and {max_fragment_size} bytes at DR{dr} in {region}")
+    if -(-size // fragment_size) + redundancy > MAX_FRAGMENTS:
+        raise ValueError(f"More than {MAX_FRAGMENTS} fragments needed, increase the fragment size")
+
+    plan = _plan(
+        region,
+        dr,
+        rate,
+        size,
+        fragment_size,
+        redundancy,
+        duty_cycle(region, frequency),
+        multicast_group_type,
+        ping_slot_period,
+    )
+    if plan.multicast_timeout is None:
+        raise ValueError(f"Session takes {plan.transfer_time:.0f}s, longer than the longest multicast timeout")
+    return plan
+
+
+def find_fastest_plan(
+    payload,
+    region,
+    drs=None,
+    redundancy_ratio=0.1,
+    min_redundancy=1,
+    frequency=None,
+    multicast_group_type="CLASS_C",
+    ping_slot_period=1,
+    max_transfer_time=None,
+):
+    """Search data rates and fragment sizes for the session that completes first.
+
+    Redundancy scales with the number of fragments, so that the plans compared tolerate the
+    same share of lost frames.
+
+    Args:
+        payload: Payload size in bytes, or the payload itself (bytes, FirmwareImage)
+        region: Region name or fuota_pb2.Region value
+        drs: Data rates to consider, all downlink data rates of the region by default.
+            Pass the DR the fleet's coverage allows, faster ones reach fewer devices
+        redundancy_ratio: Redundancy fragments per data fragment
+        min_redundancy: Minimum number of redundancy fragments
+        frequency: Multicast frequency in Hz, selects the EU868 sub-band duty cycle
+        multicast_group_type: "CLASS_C" or "CLASS_B"
+        ping_slot_period: Class B ping slot periodicity
+        max_transfer_time: Reject plans taking longer than this many seconds
+
+    Returns:
+        The FragmentationPlan with the lowest transfer time, ties broken by airtime
+
+    Raises:
+        ValueError: If no combination is valid
+    """
+    region = _region_name(region)
+    size = _payload_size(payload)
+    if size < 1:
+        raise ValueError("Payload is empty")
+    cycle = duty_cycle(region, frequency)
+    candidates = sorted(REGION_DATA_RATES[region]) if drs is None else drs
+
+    best = None
+    for dr in candidates:
+        rate = data_rate(region, dr)
+        for fragment_size in range(1, min(MAX_FRAGMENT_SIZE, rate.max_payload - FRAGMENT_HEADER_SIZE) + 1):
+            fragments = -(-size // fragment_size)
+            redundancy = max(min_redundancy, math.ceil(fragments * redundancy_ratio))
+            if fragments + redundancy > MAX_FRAGMENTS:
+                continue
+            plan = _plan(
+                region, dr, rate, size, fragment_size, redundancy, cycle, multicast_group_type, ping_slot_period
+            )
+            if plan.multicast_timeout is None:
+                continue
+            if max_transfer_time is not None and plan.transfer_time > max_transfer_time:
+                continue
+            if best is None or (plan.transfer_time, plan.total_airtime) < (best.transfer_time, best.total_airtime):
+                best = plan
+
+    if best is None:
+        raise ValueError(f"No valid fragmentation plan for a {size} byte payload in {region}")
+    return best
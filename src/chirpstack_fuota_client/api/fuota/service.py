@@ -1,47 +1,112 @@
+import time
+
 import grpc
 
+from ...exceptions import ChirpstackRpcError
 from ...proto.fuota import fuota_pb2, fuota_pb2_grpc
-from ...utils.helpers import auth_header, create_channel
+from ...utils import futures
+from ...utils.bulk import imap_bounded
+from ...utils.channel_pool import get_channel
+from ...utils.helpers import auth_header
+from ...utils.logging import logger
+from .firmware import load_firmware
+from .sharding import SHARD_FIELDS, ShardedDeployment, shard_devices
 from .utils import FuotaUtils
+from .watch import DeploymentWatch
 
 
 class FuotaService:
-    def __init__(self, server_address, api_token):
+    def __init__(self, server_address, api_token, channel_pool=None):
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = fuota_pb2_grpc.FuotaServerServiceStub(self.channel)
 
     def create_deployment(
         self, application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
     ):
         try:
-            deployment_devices = FuotaUtils.create_deployment_devices(devices)
-
-            multicast_group_type = FuotaUtils.get_multicast_group_type(multicast_group_type)
-            if "multicast_region" in kwargs:
-                kwargs["multicast_region"] = FuotaUtils.get_region(kwargs["multicast_region"])
-            if "request_fragmentation_session_status" in kwargs:
-                kwargs["request_fragmentation_session_status"] = FuotaUtils.get_request_fragmentation_session_status(
-                    kwargs["request_fragmentation_session_status"]
-                )
-
-            if "unicast_timeout" in kwargs:
-                kwargs["unicast_timeout"] = FuotaUtils.create_duration(kwargs["unicast_timeout"])
-
-            deployment = fuota_pb2.Deployment(
-                application_id=application_id,
-                devices=deployment_devices,
-                multicast_group_type=multicast_group_type,
-                multicast_dr=multicast_dr,
-                multicast_frequency=multicast_frequency,
-                **kwargs,
+            request = FuotaUtils.create_deployment_request(
+                application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
             )
-            request = fuota_pb2.CreateDeploymentRequest(deployment=deployment)
             response = self.stub.CreateDeployment(request, metadata=auth_header(self.api_token))
             return response
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create FUOTA deployment: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create FUOTA deployment: {str(e)}", e)
+
+    def create_deployment_async(
+        self, application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
+    ):
+        """Non-blocking ``create_deployment``, returning a concurrent.futures.Future of the response.
+
+        The request is built on the calling thread, only the RPC runs in the background.
+        """
+        request = FuotaUtils.create_deployment_request(
+            application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
+        )
+        future = futures.call(self.stub.CreateDeployment, request, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to create FUOTA deployment")
+
+    def create_sharded_deployment(
+        self,
+        application_id,
+        devices,
+        multicast_group_type,
+        multicast_dr,
+        multicast_frequency,
+        max_devices=None,
+        shard_by=None,
+        shard_options=None,
+        concurrency=4,
+        **kwargs,
+    ):
+        """Split a large fleet into shards and create one deployment per shard in parallel.
+
+        Smaller deployments finish their unicast setup phases sooner and a failing shard does
+        not hold back the others. When sharding by "region" or "multicast_group_id", the
+        shard key is also set as the multicast_region / multicast_group_id of its deployment.
+
+        Args:
+            application_id: ID of the application
+            devices: List of device dicts, see FuotaUtils.create_deployment_devices
+            multicast_group_type: Multicast group type (CLASS_B or CLASS_C)
+            multicast_dr: Multicast data rate
+            multicast_frequency: Multicast frequency
+            max_devices: Max number of devices per deployment, None for no limit
+            shard_by: None, a device dict key or a callable returning the shard key of a device
+            shard_options: Optional callable taking a Shard and returning a dict of deployment
+                parameters overriding ``kwargs`` for that shard
+            concurrency: Max number of CreateDeployment requests in flight
+            **kwargs: Other deployment parameters, see FuotaUtils.create_deployment_request
+
+        Returns:
+            ShardedDeployment. Shards that could not be created have their ``error`` set
+            instead of raising, see ShardedDeployment.failed
+        """
+        shards = shard_devices(devices, max_devices=max_devices, shard_by=shard_by)
+        if "payload" in kwargs:
+            # Resolve the image once, every shard then shares the same mapping.
+            kwargs["payload"] = load_firmware(kwargs["payload"])
+
+        def create(shard):
+            options = dict(kwargs)
+            if isinstance(shard_by, str) and shard_by in SHARD_FIELDS:
+                options[SHARD_FIELDS[shard_by]] = shard.key
+            if shard_options is not None:
+                options.update(shard_options(shard))
+            return self.create_deployment(
+                application_id, shard.devices, multicast_group_type, multicast_dr, multicast_frequency, **options
+            )
+
+        for index, response, error in imap_bounded(create, shards, concurrency):
+            if error is not None:
+                shards[index].error = error
+            else:
+                shards[index].deployment_id = response.id
+        failed = sum(shard.error is not None for shard in shards)
+        if failed:
+            logger.warning(f"Failed to create {failed} of {len(shards)} FUOTA deployment shards")
+        return ShardedDeployment(self, shards, concurrency=concurrency)
 
     def get_deployment_status(self, deployment_id):
         try:
@@ -49,7 +114,13 @@ class FuotaService:
             response = self.stub.GetDeploymentStatus(request, metadata=auth_header(self.api_token))
             return response
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get FUOTA deployment status: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get FUOTA deployment status: {str(e)}", e)
+
+    def get_deployment_status_async(self, deployment_id):
+        """Non-blocking ``get_deployment_status``, returning a concurrent.futures.Future of the status."""
+        request = fuota_pb2.GetDeploymentStatusRequest(id=deployment_id)
+        future = futures.call(self.stub.GetDeploymentStatus, request, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get FUOTA deployment status")
 
     def get_deployment_device_logs(self, deployment_id, dev_eui):
         try:
@@ -57,4 +128,73 @@ class FuotaService:
             response = self.stub.GetDeploymentDeviceLogs(request, metadata=auth_header(self.api_token))
             return response
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get FUOTA deployment device logs: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get FUOTA deployment device logs: {str(e)}", e)
+
+    def get_deployment_device_logs_async(self, deployment_id, dev_eui):
+        """Non-blocking ``get_deployment_device_logs``, returning a concurrent.futures.Future of the logs."""
+        request = fuota_pb2.GetDeploymentDeviceLogsRequest(deployment_id=deployment_id, dev_eui=dev_eui)
+        future = futures.call(self.stub.GetDeploymentDeviceLogs, request, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get FUOTA deployment device logs")
+
+    def get_deployment_logs_many(self, deployment_id, dev_euis, concurrency=8, serialize=False, fmt="iso"):
+        """Fetch the deployment logs of many devices in parallel.
+
+        At most ``concurrency`` requests are in flight and ``dev_euis`` is consumed lazily.
+        Results are yielded as soon as they complete, not in input order.
+
+        Args:
+            deployment_id: ID of the deployment
+            dev_euis: Iterable of device EUIs
+            concurrency: Max number of requests in flight
+            serialize: Convert each response with FuotaUtils.serialize_device_logs on the
+                worker thread, so the protobuf responses are not kept around
+            fmt: Timestamp format passed to serialize_device_logs
+
+        Yields:
+            (dev_eui, logs, error) tuples, where logs is the response (or the serialized logs)
+            and error the ChirpstackRpcError of a failed request, exactly one of them being None
+        """
+
+        def fetch(dev_eui):
+            try:
+                logs = self.get_deployment_device_logs(deployment_id, dev_eui)
+            except ChirpstackRpcError as e:
+                return dev_eui, None, e
+            return dev_eui, FuotaUtils.serialize_device_logs(logs, fmt) if serialize else logs, None
+
+        for _, result, error in imap_bounded(fetch, dev_euis, concurrency):
+            if error is not None:
+                raise error
+            yield result
+
+    def watch_deployment(self, deployment_id, intervals=None, max_interval=60.0, timeout=None, sleep=time.sleep):
+        """Poll a deployment until it completes, yielding only what changed.
+
+        The polling interval adapts to the deployment phase and backs off while nothing
+        changes, see DeploymentWatch. The generator stops after yielding the event in
+        which frag_status_completed_at is set.
+
+        Args:
+            deployment_id: ID of the deployment to watch
+            intervals: Dict overriding the base polling interval per phase
+            max_interval: Upper bound of the polling interval in seconds
+            timeout: Give up after this many seconds, None to watch until completion
+            sleep: Sleep function, overridable for tests
+
+        Yields:
+            DeploymentStatusEvent with newly completed phases and changed device statuses
+
+        Raises:
+            TimeoutError: If the deployment did not complete within ``timeout``
+        """
+        watch = DeploymentWatch(intervals=intervals, max_interval=max_interval)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            event = watch.update(self.get_deployment_status(deployment_id))
+            if event is not None:
+                yield event
+            if watch.done:
+                return
+            if deadline is not None and time.monotonic() + watch.interval > deadline:
+                raise TimeoutError(f"FUOTA deployment {deployment_id} did not complete within {timeout}s")
+            sleep(watch.interval)
@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from ...utils.bulk import imap_bounded
+from .utils import DEPLOYMENT_TIMESTAMP_FIELDS, DEVICE_TIMESTAMP_FIELDS
+
+# Device dict keys that can be used as shard_by, and the Deployment field each one sets.
+SHARD_FIELDS = {
+    "region": "multicast_region",
+    "multicast_group_id": "multicast_group_id",
+}
+
+
+@dataclass
+class Shard:
+    """A subset of a fleet deployed as its own FUOTA deployment.
+
+    Attributes:
+        key: Value of the shard_by key shared by the devices, None when not grouping
+        devices: Device dicts of the shard
+        deployment_id: ID of the created deployment, None if not created (yet)
+        error: Exception raised while creating the deployment
+    """
+
+    key: Any
+    devices: List[dict]
+    deployment_id: Optional[str] = None
+    error: Optional[Exception] = None
+
+
+def shard_devices(devices, max_devices=None, shard_by=None):
+    """Split a device list into shards.
+
+    Devices are first grouped by ``shard_by``, then every group is split into chunks of at
+    most ``max_devices``. Shards keep the input order of their devices.
+
+    Args:
+        devices: Iterable of device dicts ("dev_eui", "gen_app_key", plus any grouping key)
+        max_devices: Max number of devices per shard, None for no limit
+        shard_by: None, a device dict key (e.g. "region" or "multicast_group_id") or a
+            callable returning the group key of a device dict
+
+    Returns:
+        List of Shard
+    """
+    if max_devices is not None and max_devices < 1:
+        raise ValueError("max_devices must be at least 1")
+
+    if shard_by is None:
+        key_of = lambda device: None
+    elif callable(shard_by):
+        key_of = shard_by
+    else:
+        key_of = lambda device: device[shard_by]
+
+    groups = {}
+    for device in devices:
+        groups.setdefault(key_of(device), []).append(device)
+
+    shards = []
+    for key, group in groups.items():
+        size = max_devices or len(group)
+        shards.extend(Shard(key, group[i : i + size]) for i in range(0, len(group), size))
+    return shards
+
+
+class ShardedDeployment:
+    """Handle over the deployments created for the shards of one fleet."""
+
+    def __init__(self, service, shards, concurrency=4):
+        self.service = service
+        self.shards = shards
+        self.concurrency = concurrency
+
+    @property
+    def deployment_ids(self):
+        return [shard.deployment_id for shard in self.shards if shard.deployment_id is not None]
+
+    @property
+    def failed(self):
+        """Shards whose deployment could not be created."""
+        return [shard for shard in self.shards if shard.error is not None]
+
+    def statuses(self):
+        """Fetch the status of every created deployment in parallel.
+
+        Returns:
+            Dict of deployment ID to GetDeploymentStatusResponse
+        """
+        deployment_ids = self.deployment_ids
+        statuses = {}
+        for index, status, error in imap_bounded(self.service.get_deployment_status, deployment_ids, self.concurrency):
+            if error is not None:
+                raise error
+            statuses[deployment_ids[index]] = status
+        return statuses
+
+    def status(self):
+        """Aggregate the status of all shards.
+
+        Returns:
+            Dict with the number of shards ("shards", "created", "failed", "completed"),
+            "devices" (total devices of the created shards), "device_stages" (number of devices
+            per completed stage), "phases" (number of deployments per completed phase),
+            "done" (every shard was deployed and completed, so never when a shard failed),
+            "failed_shards" (the Shards whose deployment could not be created) and the raw
+            "statuses" by deployment ID
+        """
+        statuses = self.statuses()
+        device_stages = dict.fromkeys(DEVICE_TIMESTAMP_FIELDS, 0)
+        phases = dict.fromkeys(DEPLOYMENT_TIMESTAMP_FIELDS, 0)
+        devices = 0
+        for status in statuses.values():
+            for phase in DEPLOYMENT_TIMESTAMP_FIELDS:
+                phases[phase] += status.HasField(phase)
+            for device_status in status.device_status:
+                devices += 1
+                for stage in DEVICE_TIMESTAMP_FIELDS:
+                    device_stages[stage] += device_status.HasField(stage)
+
+        completed = phases["frag_status_completed_at"]
+        failed = self.failed
+        return {
+            "shards": len(self.shards),
+            "created": len(statuses),
+            "failed": len(failed),
+            "completed": completed,
+            "done": bool(statuses) and not failed and completed == len(statuses),
+            "failed_shards": failed,
+            "devices": devices,
+            "device_stages": device_stages,
+            "phases": phases,
+            "statuses": statuses,
+        }
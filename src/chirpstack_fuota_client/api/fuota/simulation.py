@@ -0,0 +1,148 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+from ...utils.optional import require
+from .fragmentation import parity_matrix
+
+# Upper bound of trials x redundancy fragments x missing fragments processed at once.
+_CHUNK_CELLS = 1 << 24
+
+
+@dataclass
+class SessionSimulation:
+    """Outcome of a Monte Carlo simulation of a fragmentation session.
+
+    Attributes:
+        fragments: Number of data fragments
+        redundancy: Number of redundancy fragments
+        trials: Number of trials per cohort
+        success_probability: Dict of cohort name to the share of trials the device reconstructed the payload
+        fallback_devices: Dict of cohort name to the expected number of devices needing a unicast fallback
+    """
+
+    fragments: int
+    redundancy: int
+    trials: int
+    success_probability: Dict[str, float] = field(default_factory=dict)
+    fallback_devices: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def expected_fallback_devices(self):
+        return sum(self.fallback_devices.values())
+
+
+def _reconstructs(np, matrix, received):
+    """Return for every trial whether its received fragments determine all data fragments.
+
+    ``received`` is a (trials, m + redundancy) boolean mask. Only the missing data columns
+    and the received redundancy lines of each trial take part in the rank computation; they
+    are moved to the front and padded so all trials are eliminated in lockstep on bit-packed rows.
+    """
+    m = matrix.shape[1]
+    known = received[:, :m]
+    lines = received[:, m:]
+    missing_count = m - known.sum(axis=1)
+    line_count = lines.sum(axis=1)
+
+    success = missing_count == 0
+    pending = np.flatnonzero(~success & (line_count >= missing_count))
+    if pending.size == 0:
+        return success
+
+    # Trials with the most missing columns first, so the trials still eliminating at column
+    # ``col`` are always a prefix and finished ones drop out of the array operations.
+    pending = pending[np.argsort(-missing_count[pending], kind="stable")]
+    missing_count = missing_count[pending]
+    width = int(missing_count[0])
+    height = int(line_count[pending].max())
+    # Stable argsort puts the missing columns / received lines first, in index order.
+    cols = np.argsort(known[pending], axis=1, kind="stable")[:, :width]
+    rows = np.argsort(~lines[pending], axis=1, kind="stable")[:, :height]
+    valid_cols = np.arange(width) < missing_count[:, None]
+    valid_rows = np.arange(height) < line_count[pending, None]
+
+    sub = matrix[rows[:, :, None], cols[:, None, :]]
+    sub &= valid_rows[:, :, None] & valid_cols[:, None, :]
+    packed = np.packbits(sub, axis=2, bitorder="little")
+    pad = (-packed.shape[2]) % 8
+    if pad:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:2] + (pad,), dtype=np.uint8)], axis=2)
+    words = packed.view(np.uint64)
+
+    ok = np.ones(pending.size, dtype=bool)
+    used = ~valid_rows
+    row_index = np.arange(height)
+    for col in range(width):
+        active = int(np.searchsorted(-missing_count, -col, side="left"))
+        word, bit = divmod(col, 64)
+        # Rows only hold bits at or after the current column once earlier ones are eliminated.
+        block = words[:active, :, word:]
+        has_bit = ((block[:, :, 0] >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        candidates = has_bit & ~used[:active]
+        found = candidates.any(axis=1)
+        ok[:active] &= found
+        pivot = np.argmax(candidates, axis=1)
+        eliminate = has_bit & found[:, None] & (row_index != pivot[:, None])
+        pivot_rows = block[np.arange(active), pivot]
+        np.bitwise_xor(block, pivot_rows[:, None, :], out=block, where=eliminate[:, :, None])
+        used[np.flatnonzero(found), pivot[found]] = True
+
+    success[pending] = ok
+    return success
+
+
+def simulate_session(fragments, redundancy, packet_error_rate, trials=1000, seed=None):
+    """Estimate the probability that a device reconstructs the payload of a session.
+
+    Every trial drops each of the ``fragments + redundancy`` frames independently with
+    probability ``packet_error_rate`` and checks whether the received frames determine the
+    payload, using the actual TS004 parity matrix.
+
+    Args:
+        fragments: Number of data fragments
+        redundancy: Number of redundancy fragments
+        packet_error_rate: Probability that a frame is lost
+        trials: Number of trials
+        seed: Seed or numpy Generator, for reproducible results
+
+    Returns:
+        Share of successful trials
+    """
+    np = require("numpy", "numpy")
+    rng = np.random.default_rng(seed)
+    matrix = parity_matrix(fragments, redundancy)
+    chunk = max(1, _CHUNK_CELLS // max(1, redundancy * max(1, int(fragments * packet_error_rate * 2))))
+
+    successes = 0
+    for start in range(0, trials, chunk):
+        count = min(chunk, trials - start)
+        received = rng.random((count, fragments + redundancy)) >= packet_error_rate
+        successes += int(_reconstructs(np, matrix, received).sum())
+    return successes / trials
+
+
+def simulate_deployment(payload_size, config, cohorts, trials=1000, seed=None):
+    """Simulate a fragmentation session for cohorts of devices with different link quality.
+
+    Args:
+        payload_size: Payload size in bytes
+        config: Deployment config, as returned by FuotaUtils.create_deployment_config
+            (fragmentation_fragment_size and fragmentation_redundancy are used)
+        cohorts: Dict of cohort name to (device count, packet error rate)
+        trials: Number of trials per cohort
+        seed: Seed or numpy Generator, for reproducible results
+
+    Returns:
+        SessionSimulation
+    """
+    np = require("numpy", "numpy")
+    rng = np.random.default_rng(seed)
+    fragments = -(-payload_size // config["fragmentation_fragment_size"])
+    redundancy = config["fragmentation_redundancy"]
+
+    result = SessionSimulation(fragments=fragments, redundancy=redundancy, trials=trials)
+    for name, (devices, packet_error_rate) in cohorts.items():
+        probability = simulate_session(fragments, redundancy, packet_error_rate, trials=trials, seed=rng)
+        result.success_probability[name] = probability
+        result.fallback_devices[name] = devices * (1 - probability)
+    return result
@@ -1,8 +1,14 @@
-from Crypto.Cipher import AES
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
 from google.protobuf import duration_pb2
 
 from ...proto.fuota import fuota_pb2
-from datetime import datetime, timezone
+from ...utils.cache import LRUCache
+from ...utils.optional import require
+from . import fragmentation
+from .firmware import load_firmware
+
 
 def convert_timestamp(timestamp, fmt="iso"):
     if fmt == "iso":
@@ -25,7 +31,73 @@ def timestamp_to_epoch(timestamp):
         return int(timestamp.seconds + timestamp.nanos / 1e9)
     return None
 
+def _timestamp_to_ns(timestamp):
+    if timestamp.seconds or timestamp.nanos:
+        return timestamp.seconds * 1_000_000_000 + timestamp.nanos
+    return None
+
+DEPLOYMENT_TIMESTAMP_FIELDS = (
+    "created_at",
+    "updated_at",
+    "mc_group_setup_completed_at",
+    "mc_session_completed_at",
+    "frag_session_setup_completed_at",
+    "enqueue_completed_at",
+    "frag_status_completed_at",
+)
+
+DEVICE_TIMESTAMP_FIELDS = (
+    "created_at",
+    "updated_at",
+    "mc_group_setup_completed_at",
+    "mc_session_completed_at",
+    "frag_session_setup_completed_at",
+    "frag_status_completed_at",
+)
+
+EUI_HEX_LENGTH = 16
+
+PARALLEL_DERIVATION_THRESHOLD = 20000
+
+_ZERO_BLOCK = b"\x00" * 16
+
+
+def _gen_app_key_bytes(gen_app_key):
+    try:
+        key = bytes.fromhex(gen_app_key) if isinstance(gen_app_key, str) else bytes(gen_app_key)
+    except ValueError as ve:
+        raise ValueError(f"Invalid GenAppKey: {str(ve)}")
+    if len(key) != 16:
+        raise ValueError("Invalid GenAppKey: GenAppKey must be 16 bytes (32 hex characters)")
+    return key
+
+
+def _aes():
+    # pycryptodome is only loaded once keys are actually derived.
+    from Crypto.Cipher import AES
+
+    return AES
+
+
+def _derive_mc_root_keys(gen_app_keys):
+    # McRootKey = aes128_encrypt(GenAppKey, 0x00 * 16), see LoRaWAN TS005.
+    AES = _aes()
+    return [AES.new(key, AES.MODE_ECB).encrypt(_ZERO_BLOCK) for key in gen_app_keys]
+
+
+def _derive_mc_root_keys_many(gen_app_keys, processes):
+    if processes and len(gen_app_keys) >= PARALLEL_DERIVATION_THRESHOLD:
+        chunk_size = -(-len(gen_app_keys) // (processes * 4))
+        chunks = [gen_app_keys[i : i + chunk_size] for i in range(0, len(gen_app_keys), chunk_size)]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return [mc_root_key for chunk in executor.map(_derive_mc_root_keys, chunks) for mc_root_key in chunk]
+    return _derive_mc_root_keys(gen_app_keys)
+
+
 class FuotaUtils:
+    # Opt-in, see derive_mc_root_keys. Holds key material until cleared or evicted.
+    mc_root_key_cache = LRUCache(maxsize=200000)
+
     @staticmethod
     def get_multicast_group_type(group_type):
         if group_type.upper() == "CLASS_B":
@@ -83,8 +155,35 @@ class FuotaUtils:
             "fragmentation_descriptor": kwargs.get("fragmentation_descriptor", b"\x00\x00\x00\x00"),
         }
 
+    @staticmethod
+    def encode_fragments(payload, fragment_size, redundancy):
+        """
+        Reproduce the data and redundancy fragments the FUOTA server sends for a payload.
+
+        :param payload: bytes, buffer, file path or FirmwareImage
+        :param fragment_size: int, fragmentation_fragment_size of the deployment
+        :param redundancy: int, fragmentation_redundancy of the deployment
+        :return: numpy uint8 array of shape (fragments + redundancy, fragment_size), row i
+            being the fragment with index i + 1
+        """
+        return fragmentation.encode(load_firmware(payload), fragment_size, redundancy)
+
+    @staticmethod
+    def decode_fragments(fragments, fragment_count, size=None):
+        """
+        Reconstruct a payload from the fragments received by a device.
+
+        :param fragments: dict of 1-based fragment index to fragment bytes
+        :param fragment_count: int, number of data fragments of the session
+        :param size: int, payload size without padding, None to keep the padding
+        :return: bytes, the payload
+        :raises ValueError: if the fragments are not enough to reconstruct the payload
+        """
+        return fragmentation.decode(fragments, fragment_count, size)
+
     @staticmethod
     def get_key(key, b):
+        AES = _aes()
         cipher = AES.new(key, AES.MODE_ECB)
         return cipher.encrypt(b)
 
@@ -103,6 +202,7 @@ class FuotaUtils:
                 raise ValueError("GenAppKey must be 16 bytes (32 hex characters)")
 
             # Create AES cipher
+            AES = _aes()
             cipher = AES.new(gen_app_key_bytes, AES.MODE_ECB)
 
             # Encrypt 16 zero bytes
@@ -115,20 +215,116 @@ class FuotaUtils:
         except Exception as e:
             raise Exception(f"Failed to generate McRootKey: {str(e)}")
 
+    @staticmethod
+    def clear_mc_root_key_cache():
+        """Drop every McRootKey memoized by ``derive_mc_root_keys(..., use_cache=True)``."""
+        FuotaUtils.mc_root_key_cache.clear()
+
+    @staticmethod
+    def derive_mc_root_keys(gen_app_keys, processes=None, use_cache=False):
+        """
+        Generate the McRootKeys of many GenAppKeys at once.
+
+        With ``use_cache``, results are memoized in ``FuotaUtils.mc_root_key_cache``, a process-wide
+        LRU of at most 200000 keys, so re-deploying the same fleet only pays for devices whose key was
+        not seen recently. The cache keeps key material in memory until evicted or until
+        ``FuotaUtils.clear_mc_root_key_cache()`` is called, and costs time on a cold run.
+
+        :param gen_app_keys: iterable of GenAppKeys, as 32-character hex strings or 16-byte bytes
+        :param processes: fan the derivation of at least PARALLEL_DERIVATION_THRESHOLD keys out to a
+            pool of this many processes, None to always derive in-process
+        :param use_cache: look up and store results in the McRootKey cache
+        :return: list of 16-byte McRootKeys, in input order
+        """
+        keys = [_gen_app_key_bytes(key) for key in gen_app_keys]
+        if not use_cache:
+            return _derive_mc_root_keys_many(keys, processes)
+
+        cache = FuotaUtils.mc_root_key_cache
+        results = [cache.get(key) for key in keys]
+        missing = {}
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                missing.setdefault(key, []).append(i)
+        if not missing:
+            return results
+
+        misses = list(missing)
+        for key, mc_root_key in zip(misses, _derive_mc_root_keys_many(misses, processes)):
+            cache.set(key, mc_root_key)
+            for i in missing[key]:
+                results[i] = mc_root_key
+        return results
+
+    @staticmethod
+    def create_deployment_devices_batch(devices, processes=None, use_cache=False):
+        """
+        Build DeploymentDevices for many devices, deriving their McRootKeys in one batch.
+
+        :param devices: iterable of dicts with "dev_eui" and "gen_app_key"
+        :param processes: see ``derive_mc_root_keys``
+        :param use_cache: see ``derive_mc_root_keys``
+        :return: tuple of (list of DeploymentDevice, list of 16-byte McRootKeys), in input order
+        """
+        devices = list(devices)
+        mc_root_keys = FuotaUtils.derive_mc_root_keys(
+            [device["gen_app_key"] for device in devices], processes=processes, use_cache=use_cache
+        )
+        deployment_devices = [
+            fuota_pb2.DeploymentDevice(dev_eui=device["dev_eui"], mc_root_key=mc_root_key.hex())
+            for device, mc_root_key in zip(devices, mc_root_keys)
+        ]
+        return deployment_devices, mc_root_keys
+
     @staticmethod
     def create_deployment_devices(devices):
-        deployment_devices = []
-        for device in devices:
-            dev_eui = device["dev_eui"]
-            gen_app_key = device["gen_app_key"]
-            mc_root_key = FuotaUtils.get_mc_root_key_for_gen_app_key(gen_app_key)
-            deployment_devices.append(fuota_pb2.DeploymentDevice(dev_eui=dev_eui, mc_root_key=mc_root_key))
+        deployment_devices, _ = FuotaUtils.create_deployment_devices_batch(devices)
         return deployment_devices
 
 
+    @staticmethod
+    def create_deployment_request(
+        application_id, devices, multicast_group_type, multicast_dr, multicast_frequency, **kwargs
+    ):
+        """Build a CreateDeploymentRequest from plain device dicts and deployment settings
+
+        ``payload`` may be bytes, a buffer, a file path or a FirmwareImage. It is validated
+        against the fragmentation settings before the request is built.
+        """
+        if "payload" in kwargs:
+            image = load_firmware(kwargs["payload"])
+            image.validate(kwargs.get("fragmentation_fragment_size"), kwargs.get("fragmentation_redundancy", 0))
+            kwargs["payload"] = image.payload
+
+        deployment_devices = FuotaUtils.create_deployment_devices(devices)
+
+        multicast_group_type = FuotaUtils.get_multicast_group_type(multicast_group_type)
+        if "multicast_region" in kwargs:
+            kwargs["multicast_region"] = FuotaUtils.get_region(kwargs["multicast_region"])
+        if "request_fragmentation_session_status" in kwargs:
+            kwargs["request_fragmentation_session_status"] = FuotaUtils.get_request_fragmentation_session_status(
+                kwargs["request_fragmentation_session_status"]
+            )
+
+        if "unicast_timeout" in kwargs:
+            kwargs["unicast_timeout"] = FuotaUtils.create_duration(kwargs["unicast_timeout"])
+
+        deployment = fuota_pb2.Deployment(
+            application_id=application_id,
+            devices=deployment_devices,
+            multicast_group_type=multicast_group_type,
+            multicast_dr=multicast_dr,
+            multicast_frequency=multicast_frequency,
+            **kwargs,
+        )
+        return fuota_pb2.CreateDeploymentRequest(deployment=deployment)
+
     @staticmethod
     def serialize_deployment_status(deployment_status, fmt="iso"):
         """Convert protobuf deployment status to serializable dict"""
+        if fmt == "columnar":
+            return FuotaUtils.serialize_deployment_status_columnar(deployment_status)
+
         status_response = {
             "created_at": convert_timestamp(deployment_status.created_at, fmt),
             "updated_at": convert_timestamp(deployment_status.updated_at, fmt),
@@ -154,6 +350,78 @@ class FuotaUtils:
 
         return status_response
 
+    @staticmethod
+    def serialize_deployment_status_columnar(deployment_status):
+        """Convert protobuf deployment status to NumPy columns.
+
+        Timestamps become int64 nanoseconds since the epoch. Per-device timestamps are
+        numpy masked arrays where unset timestamps are masked; deployment-level timestamps
+        are plain ints, or None when unset. Requires numpy.
+
+        :return: dict with the deployment-level timestamps and a "device_status" dict holding a
+            "dev_eui" string array plus one masked int64 array per device stage
+        """
+        np = require("numpy", "numpy")
+        status_response = {
+            name: _timestamp_to_ns(getattr(deployment_status, name)) for name in DEPLOYMENT_TIMESTAMP_FIELDS
+        }
+
+        devices = deployment_status.device_status
+        count = len(devices)
+        fields = fuota_pb2.DeploymentDeviceStatus.DESCRIPTOR.fields_by_name
+        dev_eui_number = fields["dev_eui"].number
+        slot_count = max(field.number for field in fields.values()) + 1
+
+        # A single pass over the set fields only (ListFields skips unset timestamps), collecting
+        # flat coordinates that are scattered into the columns in one vectorized step.
+        dev_euis = [""] * count
+        rows, slots, seconds, nanos = [], [], [], []
+        for row, device in enumerate(devices):
+            for field, value in device.ListFields():
+                if field.number == dev_eui_number:
+                    dev_euis[row] = value
+                else:
+                    rows.append(row)
+                    slots.append(field.number)
+                    seconds.append(value.seconds)
+                    nanos.append(value.nanos)
+
+        values = np.zeros((slot_count, count), dtype=np.int64)
+        missing = np.ones((slot_count, count), dtype=bool)
+        rows = np.array(rows, dtype=np.intp)
+        slots = np.array(slots, dtype=np.intp)
+        values[slots, rows] = np.array(seconds, dtype=np.int64) * 1_000_000_000 + np.array(nanos, dtype=np.int64)
+        missing[slots, rows] = False
+
+        columns = {"dev_eui": np.array(dev_euis, dtype=f"U{EUI_HEX_LENGTH}")}
+        for name in DEVICE_TIMESTAMP_FIELDS:
+            number = fields[name].number
+            columns[name] = np.ma.masked_array(values[number], mask=missing[number])
+        status_response["device_status"] = columns
+        return status_response
+
+    @staticmethod
+    def stage_completion_stats(columns):
+        """Reduce columnar device status to per-stage completion statistics.
+
+        :param columns: the "device_status" dict of ``serialize_deployment_status_columnar``
+        :return: dict of stage to {"completed", "total", "ratio", "first", "last"}, where first and last
+            are the earliest and latest completion in epoch nanoseconds (None if nothing completed)
+        """
+        total = len(columns["dev_eui"])
+        stats = {}
+        for name in DEVICE_TIMESTAMP_FIELDS:
+            column = columns[name]
+            completed = int(column.count())
+            stats[name] = {
+                "completed": completed,
+                "total": total,
+                "ratio": completed / total if total else 0.0,
+                "first": int(column.min()) if completed else None,
+                "last": int(column.max()) if completed else None,
+            }
+        return stats
+
     @staticmethod
     def serialize_device_logs(device_logs, fmt="iso"):
         """Convert protobuf device logs to serializable dict"""
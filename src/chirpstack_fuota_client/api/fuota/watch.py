@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+# Deployment phases in the order the FUOTA server runs them.
+PHASES = (
+    "mc_group_setup_completed_at",
+    "frag_session_setup_completed_at",
+    "mc_session_completed_at",
+    "enqueue_completed_at",
+    "frag_status_completed_at",
+)
+
+# Base polling interval in seconds once the phase has completed, "created" before any phase did.
+# The setup phases wait on unicast answers from every device and take a while; once the
+# fragments are enqueued the deployment is close to done and is polled more often.
+DEFAULT_INTERVALS = {
+    "created": 10.0,
+    "mc_group_setup_completed_at": 10.0,
+    "frag_session_setup_completed_at": 5.0,
+    "mc_session_completed_at": 5.0,
+    "enqueue_completed_at": 2.0,
+}
+
+
+@dataclass
+class DeploymentStatusEvent:
+    """Changes between two polls of a deployment status.
+
+    Attributes:
+        status: The GetDeploymentStatusResponse the event was computed from
+        completed_phases: (phase, timestamp) pairs of the phases completed since the last event
+        changed_devices: DeploymentDeviceStatus of the devices added or changed since the last event
+        done: True once frag_status_completed_at is set
+    """
+
+    status: Any
+    completed_phases: List[Tuple[str, Any]] = field(default_factory=list)
+    changed_devices: List[Any] = field(default_factory=list)
+    done: bool = False
+
+
+class DeploymentWatch:
+    """Diffs successive deployment statuses and picks the next polling interval.
+
+    The interval starts at the base interval of the latest completed phase and grows by
+    ``backoff`` after every poll that brought no change, up to ``max_interval``.
+
+    Args:
+        intervals: Dict overriding entries of DEFAULT_INTERVALS
+        backoff: Growth factor of the interval while nothing changes
+        max_interval: Upper bound of the interval in seconds
+    """
+
+    def __init__(self, intervals=None, backoff=1.5, max_interval=60.0):
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.phase = "created"
+        self.done = False
+        self.interval = self.intervals["created"]
+        self._completed = set()
+        self._devices = {}
+
+    def update(self, status):
+        """Return a DeploymentStatusEvent for the changes in ``status``, None if nothing changed."""
+        completed_phases = []
+        for phase in PHASES:
+            if phase not in self._completed and status.HasField(phase):
+                self._completed.add(phase)
+                completed_phases.append((phase, getattr(status, phase)))
+                self.phase = phase
+
+        changed_devices = []
+        for device_status in status.device_status:
+            # Keep the serialized form only, holding the message would keep the whole response alive.
+            serialized = device_status.SerializeToString(deterministic=True)
+            if self._devices.get(device_status.dev_eui) != serialized:
+                self._devices[device_status.dev_eui] = serialized
+                changed_devices.append(device_status)
+
+        self.done = "frag_status_completed_at" in self._completed
+        if completed_phases or changed_devices:
+            self.interval = self.intervals.get(self.phase, self.intervals["created"])
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+        if not (completed_phases or changed_devices or self.done):
+            return None
+        return DeploymentStatusEvent(status, completed_phases, changed_devices, self.done)
@@ -1,54 +1,116 @@
 import grpc
 from chirpstack_api import api
 
-from ..utils.helpers import auth_header, create_channel
+from ..exceptions import ChirpstackRpcError
+from ..utils import futures, helpers
+from ..utils.channel_pool import get_channel
+from ..utils.helpers import auth_header
+from ..utils.pagination import iter_items
 
 
 class GatewayService:
-    def __init__(self, server_address, api_token):
+    def __init__(
+        self, server_address, api_token, channel_pool=None, name_cache=None, optimistic=False, is_conflict=None
+    ):
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = api.GatewayServiceStub(self.channel)
+        self.name_cache = name_cache
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
 
-    def create(self, tenant_id, gateway_id, name, description="", location=None, **kwargs):
+    def create(self, tenant_id, gateway_id, name, description="", location=None, optimistic=None, **kwargs):
+        req = self._create_request(tenant_id, gateway_id, name, description, location, **kwargs)
         try:
-            existing_gateway = self.get_by_name(tenant_id, name)
-            if existing_gateway:
-                return existing_gateway
-
-            req = api.CreateGatewayRequest(
-                gateway=api.Gateway(
-                    gateway_id=gateway_id,
-                    name=name,
-                    description=description,
-                    location=location,
-                    tenant_id=tenant_id,
-                    **kwargs,
-                )
+            return helpers.create_or_get(
+                lambda: self._created(req, self.stub.Create(req, metadata=auth_header(self.api_token))),
+                lambda: self.get_by_name(tenant_id, name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
             )
-            return self.stub.Create(req, metadata=auth_header(self.api_token))
-
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create gateway: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create gateway: {str(e)}", e)
+
+    def create_async(self, tenant_id, gateway_id, name, description="", location=None, optimistic=None, **kwargs):
+        """Non-blocking ``create``, returning a concurrent.futures.Future of the gateway."""
+        req = self._create_request(tenant_id, gateway_id, name, description, location, **kwargs)
+        future = helpers.create_or_get_future(
+            lambda: futures.then(
+                futures.call(self.stub.Create, req, metadata=auth_header(self.api_token)),
+                lambda resp: self._created(req, resp),
+            ),
+            lambda: self.get_by_name_async(tenant_id, name),
+            self.optimistic if optimistic is None else optimistic,
+            self.is_conflict,
+        )
+        return futures.wrap_errors(future, "Failed to create gateway")
+
+    def _create_request(self, tenant_id, gateway_id, name, description, location, **kwargs):
+        return api.CreateGatewayRequest(
+            gateway=api.Gateway(
+                gateway_id=gateway_id,
+                name=name,
+                description=description,
+                location=location,
+                tenant_id=tenant_id,
+                **kwargs,
+            )
+        )
+
+    def _created(self, req, resp):
+        if self.name_cache is not None:
+            gw = req.gateway
+            gateway = api.GatewayListItem(
+                tenant_id=gw.tenant_id, gateway_id=gw.gateway_id, name=gw.name, description=gw.description
+            )
+            self.name_cache.put("gateway", gw.tenant_id, gw.name, gw.gateway_id, gateway)
+        return resp
 
     def get(self, gateway_id):
         req = api.GetGatewayRequest(gateway_id=gateway_id)
         try:
             return self.stub.Get(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get gateway: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get gateway: {str(e)}", e)
+
+    def get_async(self, gateway_id):
+        """Non-blocking ``get``, returning a concurrent.futures.Future of the gateway."""
+        req = api.GetGatewayRequest(gateway_id=gateway_id)
+        future = futures.call(self.stub.Get, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get gateway")
 
     def get_by_name(self, tenant_id, name):
+        if self.name_cache is not None:
+            cached = self.name_cache.get("gateway", tenant_id, name)
+            if cached is not None:
+                return cached
+
         req = api.ListGatewaysRequest(limit=1, search=name, tenant_id=tenant_id)
         try:
-            resp = self.stub.List(req, metadata=auth_header(self.api_token))
-            for gateway in resp.result:
-                if gateway.name == name:
-                    return gateway
-            return None
+            return self._find(tenant_id, name, self.stub.List(req, metadata=auth_header(self.api_token)))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get gateway by name: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get gateway by name: {str(e)}", e)
+
+    def get_by_name_async(self, tenant_id, name):
+        """Non-blocking ``get_by_name``, returning a concurrent.futures.Future of the gateway or None."""
+        if self.name_cache is not None:
+            cached = self.name_cache.get("gateway", tenant_id, name)
+            if cached is not None:
+                return futures.completed(cached)
+
+        req = api.ListGatewaysRequest(limit=1, search=name, tenant_id=tenant_id)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda resp: self._find(tenant_id, name, resp))
+        return futures.wrap_errors(future, "Failed to get gateway by name")
+
+    def _find(self, tenant_id, name, resp):
+        for gateway in resp.result:
+            if gateway.name == name:
+                if self.name_cache is not None:
+                    self.name_cache.put("gateway", tenant_id, name, gateway.gateway_id, gateway)
+                return gateway
+        return None
 
     def update(self, gateway_id, name, description="", location=None, **kwargs):
         req = api.UpdateGatewayRequest(
@@ -56,15 +118,37 @@ class GatewayService:
         )
         try:
             self.stub.Update(req, metadata=auth_header(self.api_token))
+            self._invalidate(gateway_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to update gateway: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to update gateway: {str(e)}", e)
+
+    def update_async(self, gateway_id, name, description="", location=None, **kwargs):
+        """Non-blocking ``update``, returning a concurrent.futures.Future resolving to None."""
+        req = api.UpdateGatewayRequest(
+            gateway=api.Gateway(gateway_id=gateway_id, name=name, description=description, location=location, **kwargs)
+        )
+        future = futures.call(self.stub.Update, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(gateway_id))
+        return futures.wrap_errors(future, "Failed to update gateway")
 
     def delete(self, gateway_id):
         req = api.DeleteGatewayRequest(gateway_id=gateway_id)
         try:
             self.stub.Delete(req, metadata=auth_header(self.api_token))
+            self._invalidate(gateway_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to delete gateway: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to delete gateway: {str(e)}", e)
+
+    def delete_async(self, gateway_id):
+        """Non-blocking ``delete``, returning a concurrent.futures.Future resolving to None."""
+        req = api.DeleteGatewayRequest(gateway_id=gateway_id)
+        future = futures.call(self.stub.Delete, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(gateway_id))
+        return futures.wrap_errors(future, "Failed to delete gateway")
+
+    def _invalidate(self, gateway_id):
+        if self.name_cache is not None:
+            self.name_cache.invalidate_id("gateway", gateway_id)
 
     def list(self, tenant_id, limit=10, offset=0):
         req = api.ListGatewaysRequest(
@@ -75,4 +159,22 @@ class GatewayService:
         try:
             return self.stub.List(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to list gateways: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to list gateways: {str(e)}", e)
+
+    def list_async(self, tenant_id, limit=10, offset=0):
+        """Non-blocking ``list``, returning a concurrent.futures.Future of the list response."""
+        req = api.ListGatewaysRequest(tenant_id=tenant_id, limit=limit, offset=offset)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to list gateways")
+
+    def iter_all(self, tenant_id, page_size=100, prefetch=True):
+        """Iterate over all gateways of a tenant across pages, prefetching the next page in the background."""
+        gateways = iter_items(lambda limit, offset: self.list(tenant_id, limit, offset), page_size, prefetch)
+        if self.name_cache is None:
+            return gateways
+        return self._cached(tenant_id, gateways)
+
+    def _cached(self, tenant_id, gateways):
+        for gateway in gateways:
+            self.name_cache.put("gateway", tenant_id, gateway.name, gateway.gateway_id, gateway)
+            yield gateway
@@ -1,6 +1,8 @@
 import grpc
 from chirpstack_api import api
 
+from ...exceptions import ChirpstackRpcError
+from ...utils import futures
 from ...utils.helpers import auth_header
 from .base import BaseIntegration
 
@@ -21,7 +23,18 @@ class HttpIntegration(BaseIntegration):
         try:
             return self.stub.CreateHttpIntegration(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create HTTP integration: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create HTTP integration: {str(e)}", e)
+
+    def create_async(self, application_id, event_endpoint_url, headers=None):
+        req = api.CreateHttpIntegrationRequest(
+            integration=api.HttpIntegration(
+                application_id=application_id,
+                headers={} if headers is None else headers,
+                event_endpoint_url=event_endpoint_url,
+            )
+        )
+        future = futures.call(self.stub.CreateHttpIntegration, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to create HTTP integration")
 
     def get(self, application_id):
         req = api.GetHttpIntegrationRequest(application_id=application_id)
@@ -30,7 +43,18 @@ class HttpIntegration(BaseIntegration):
         except grpc.RpcError as e:
             if e.code() == grpc.StatusCode.NOT_FOUND:
                 return None
-            raise Exception(f"Failed to get HTTP integration: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get HTTP integration: {str(e)}", e)
+
+    def get_async(self, application_id):
+        req = api.GetHttpIntegrationRequest(application_id=application_id)
+        future = futures.call(self.stub.GetHttpIntegration, req, metadata=auth_header(self.api_token))
+
+        def not_found(e):
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return None
+            raise e
+
+        return futures.wrap_errors(futures.recover(future, not_found, grpc.RpcError), "Failed to get HTTP integration")
 
     def update(self, application_id, event_endpoint_url, headers=None):
         req = api.UpdateHttpIntegrationRequest(
@@ -43,11 +67,27 @@ class HttpIntegration(BaseIntegration):
         try:
             return self.stub.UpdateHttpIntegration(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to update HTTP integration: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to update HTTP integration: {str(e)}", e)
+
+    def update_async(self, application_id, event_endpoint_url, headers=None):
+        req = api.UpdateHttpIntegrationRequest(
+            integration=api.HttpIntegration(
+                application_id=application_id,
+                headers={} if headers is None else headers,
+                event_endpoint_url=event_endpoint_url,
+            )
+        )
+        future = futures.call(self.stub.UpdateHttpIntegration, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to update HTTP integration")
 
     def delete(self, application_id):
         req = api.DeleteHttpIntegrationRequest(application_id=application_id)
         try:
             return self.stub.DeleteHttpIntegration(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to delete HTTP integration: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to delete HTTP integration: {str(e)}", e)
+
+    def delete_async(self, application_id):
+        req = api.DeleteHttpIntegrationRequest(application_id=application_id)
+        future = futures.call(self.stub.DeleteHttpIntegration, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to delete HTTP integration")
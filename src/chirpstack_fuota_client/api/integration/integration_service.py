@@ -1,15 +1,18 @@
 import grpc
 from chirpstack_api import api
 
-from ...utils.helpers import auth_header, create_channel
+from ...exceptions import ChirpstackRpcError
+from ...utils import futures
+from ...utils.channel_pool import get_channel
+from ...utils.helpers import auth_header
 from .http_integration import HttpIntegration
 
 
 class IntegrationService:
-    def __init__(self, server_address, api_token):
+    def __init__(self, server_address, api_token, channel_pool=None):
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = api.ApplicationServiceStub(self.channel)
         self.integrations = {"http": HttpIntegration(self.stub, self.api_token)}
 
@@ -25,24 +28,60 @@ class IntegrationService:
 
         return self.integrations[integration_type].create(application_id, **kwargs)
 
+    def create_async(self, integration_type, application_id, **kwargs):
+        """Non-blocking ``create``, returning a concurrent.futures.Future of the created integration."""
+        integration = self._integration(integration_type)
+
+        def create(existing_integration):
+            if existing_integration is not None:
+                raise Exception(
+                    f"{integration_type.capitalize()} integration already exists for application {application_id}"
+                )
+            return integration.create_async(application_id, **kwargs)
+
+        return futures.then(integration.get_async(application_id), create)
+
     def get(self, integration_type, application_id):
         if integration_type not in self.integrations:
             raise ValueError(f"Unsupported integration type: {integration_type}")
         return self.integrations[integration_type].get(application_id)
 
+    def get_async(self, integration_type, application_id):
+        """Non-blocking ``get``, returning a concurrent.futures.Future of the integration or None."""
+        return self._integration(integration_type).get_async(application_id)
+
     def update(self, integration_type, application_id, **kwargs):
         if integration_type not in self.integrations:
             raise ValueError(f"Unsupported integration type: {integration_type}")
         return self.integrations[integration_type].update(application_id, **kwargs)
 
+    def update_async(self, integration_type, application_id, **kwargs):
+        """Non-blocking ``update``, returning a concurrent.futures.Future of the response."""
+        return self._integration(integration_type).update_async(application_id, **kwargs)
+
     def delete(self, integration_type, application_id):
         if integration_type not in self.integrations:
             raise ValueError(f"Unsupported integration type: {integration_type}")
         return self.integrations[integration_type].delete(application_id)
 
+    def delete_async(self, integration_type, application_id):
+        """Non-blocking ``delete``, returning a concurrent.futures.Future of the response."""
+        return self._integration(integration_type).delete_async(application_id)
+
+    def _integration(self, integration_type):
+        if integration_type not in self.integrations:
+            raise ValueError(f"Unsupported integration type: {integration_type}")
+        return self.integrations[integration_type]
+
     def list(self, application_id):
         req = api.ListIntegrationsRequest(application_id=application_id)
         try:
             return self.stub.ListIntegrations(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to list integrations: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to list integrations: {str(e)}", e)
+
+    def list_async(self, application_id):
+        """Non-blocking ``list``, returning a concurrent.futures.Future of the integrations."""
+        req = api.ListIntegrationsRequest(application_id=application_id)
+        future = futures.call(self.stub.ListIntegrations, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to list integrations")
@@ -0,0 +1,395 @@
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from chirpstack_api import api
+
+from ..utils.bulk import imap_bounded, run_bulk
+from ..utils.logging import logger
+from .application import ApplicationService
+from .device import DeviceService
+from .device_profile import DeviceProfileService
+from .gateway import GatewayService
+from .tenant import TenantService
+
+# Kinds of objects the reconciler manages, parents first.
+KINDS = ("tenant", "device_profile", "application", "gateway", "device")
+
+# Message each desired entry is converted to before being compared with the list item of the
+# existing object, so enum names, nested dicts and defaults compare like the server stores them.
+_MESSAGES = {
+    "device_profile": api.DeviceProfile,
+    "application": api.Application,
+    "gateway": api.Gateway,
+    "device": api.Device,
+}
+
+# Keys of a desired device that are not Device fields.
+_DEVICE_KEYS = ("dev_eui", "app_key", "mac_version", "tags", "device_profile")
+
+
+@dataclass
+class Change:
+    """A create, update or delete of one object, as planned by the Reconciler.
+
+    Attributes:
+        kind: One of KINDS
+        action: "create", "update" or "delete"
+        key: Identity of the object: the tenant name, (tenant name, name) for device profiles
+            and applications, the gateway ID or the device EUI
+        parent: Key of the tenant (device profiles, applications and gateways) or of the
+            application (devices) the object belongs to
+        desired: Desired entry of the object, without its children, None for deletes
+        current: List item of the existing object, None for creates
+        fields: Compared fields that differ from the desired entry, for updates
+        error: Exception raised while applying the change
+    """
+
+    kind: str
+    action: str
+    key: Any
+    parent: Any = None
+    desired: Optional[dict] = None
+    current: Any = None
+    fields: List[str] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+
+@dataclass
+class ReconcilePlan:
+    """Changes needed to bring the server to a desired state.
+
+    Attributes:
+        changes: List of Change, in the order they are applied
+        ids: Dict of (kind, key) to the ID of the existing tenants, device profiles and
+            applications, completed with the IDs of the created ones when applied
+        listed: Number of existing objects listed to compute the plan
+        elapsed: Seconds spent applying the plan, 0 until applied
+    """
+
+    changes: List[Change] = field(default_factory=list)
+    ids: Dict[Any, str] = field(default_factory=dict)
+    listed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def failed(self):
+        """Changes that could not be applied."""
+        return [change for change in self.changes if change.error is not None]
+
+    def summary(self):
+        """Number of changes per kind and action, e.g. {"device": {"create": 3, "update": 1}}."""
+        counts = Counter((change.kind, change.action) for change in self.changes)
+        summary = {}
+        for (kind, action), count in sorted(counts.items(), key=lambda item: (KINDS.index(item[0][0]), item[0][1])):
+            summary.setdefault(kind, {})[action] = count
+        return summary
+
+    def raise_for_errors(self):
+        """Raise the error of the first failed change, if any."""
+        for change in self.failed:
+            raise change.error
+
+    def __len__(self):
+        return len(self.changes)
+
+
+def _phase(change):
+    # Parents are created before their children. Devices are deleted before others are created,
+    # so a device moving between applications is gone from the old one when created in the new
+    # one, and before the device profiles and applications they use are deleted.
+    if change.action == "delete":
+        return 2 if change.kind == "device" else 4
+    return {"tenant": 0, "device": 3}.get(change.kind, 1)
+
+
+def _diff(kind, desired, current):
+    """Fields of ``desired`` that are returned in the ``current`` list item and differ from it."""
+    listed = current.DESCRIPTOR.fields_by_name
+    fields = [name for name in desired if name in listed]
+    message = _MESSAGES[kind](**{name: desired[name] for name in fields})
+    return [name for name in fields if getattr(message, name) != getattr(current, name)]
+
+
+def _entries(desired, kind, key, parent, children=()):
+    """Map the key of every entry of ``kind`` to (parent, entry without its children)."""
+    entries = {}
+    for entry in desired:
+        entry = {name: value for name, value in entry.items() if name not in children}
+        entry.setdefault("description", "")
+        entry_key = key(entry)
+        if entry_key in entries:
+            raise ValueError(f"Duplicate {kind} {entry_key!r} in the desired state")
+        entries[entry_key] = (parent, entry)
+    return entries
+
+
+def _wanted(desired):
+    """Flatten the desired state document into a dict of kind to {key: (parent, entry)}."""
+    wanted = {kind: {} for kind in KINDS}
+    for tenant in desired.get("tenants", ()):
+        name = tenant["name"]
+        if name in wanted["tenant"]:
+            raise ValueError(f"Duplicate tenant {name!r} in the desired state")
+        wanted["tenant"][name] = (None, {"name": name, "description": tenant.get("description", "")})
+        for kind, key in (("device_profile", "name"), ("application", "name"), ("gateway", "gateway_id")):
+            if key == "name":
+                key_of = lambda entry, name=name: (name, entry["name"])
+            else:
+                key_of = lambda entry, key=key: entry[key]
+            wanted[kind].update(_entries(tenant.get(f"{kind}s", ()), kind, key_of, name, children=("devices",)))
+        for application in tenant.get("applications", ()):
+            devices = _entries(application.get("devices", ()), "device", lambda entry: entry["dev_eui"], None)
+            for dev_eui, (_, device) in devices.items():
+                if dev_eui in wanted["device"]:
+                    raise ValueError(f"Duplicate device {dev_eui!r} in the desired state")
+                wanted["device"][dev_eui] = ((name, application["name"]), device)
+    return wanted
+
+
+def _plan_parents(plan, wanted, current, prune):
+    """Add the changes of the tenants, device profiles, applications and gateways to ``plan``."""
+    for kind in KINDS[:-1]:
+        for key, (parent, entry) in wanted[kind].items():
+            if key not in current[kind]:
+                plan.changes.append(Change(kind, "create", key, parent, entry))
+                continue
+            if kind == "tenant":
+                continue
+            item = current[kind][key][1]
+            fields = _diff(kind, {name: value for name, value in entry.items() if name != "gateway_id"}, item)
+            if fields:
+                plan.changes.append(Change(kind, "update", key, parent, entry, item, fields))
+        if prune and kind != "tenant":
+            for key, (parent, item) in current[kind].items():
+                if key not in wanted[kind]:
+                    plan.changes.append(Change(kind, "delete", key, parent, current=item))
+
+
+class Reconciler:
+    """Bring tenants and their device profiles, applications, gateways and devices to a desired state.
+
+    The desired state is a document listing every tenant to manage, e.g. loaded from JSON::
+
+        {"tenants": [{
+            "name": "acme",
+            "device_profiles": [{"name": "class-a", "region": "EU868", "mac_version": "LORAWAN_1_0_3",
+                                 "reg_params_revision": "RP002_1_0_3", "supports_otaa": true}],
+            "applications": [{"name": "meters", "devices": [
+                {"name": "meter-1", "dev_eui": "0102030405060708", "device_profile": "class-a",
+                 "app_key": "...", "mac_version": "LORAWAN_1_0_3"}]}],
+            "gateways": [{"gateway_id": "0102030405060708", "name": "roof"}]}]}
+
+    Entries hold the keyword arguments of the ``create`` method of their service; devices name
+    their device profile with "device_profile" (or give "device_profile_id"). An omitted
+    description means an empty one.
+
+    ``plan`` lists the existing objects of the managed tenants page by page and diffs them with
+    the desired state in memory, so an unchanged fleet costs one List call per page and no
+    writes. ``apply`` then runs the changes with bounded concurrency, phase by phase in
+    dependency order: tenants, then device profiles, applications and gateways, then devices,
+    then deletes of pruned objects.
+
+    Only fields returned by the List calls are compared: names, descriptions, the device profile
+    of devices, the location of gateways and the region, MAC version and class support of device
+    profiles. Other fields (tags, keys, variables, ...) are set when an object is created, and
+    again whenever a compared field changes. Tenants are never updated nor deleted, since their
+    list items hold neither description nor settings and pruning them would be too destructive.
+    """
+
+    def __init__(self, server_address, api_token, channel_pool=None, concurrency=8, page_size=500):
+        """Initialize the reconciler.
+
+        Args:
+            server_address: ChirpStack server address
+            api_token: API token for authentication, allowed to list tenants
+            channel_pool: Optional ChannelPool, defaults to the process-wide pool
+            concurrency: Max number of List calls or changes in flight at once
+            page_size: Number of objects fetched per List call
+        """
+        self.tenants = TenantService(server_address, api_token, channel_pool)
+        self.device_profiles = DeviceProfileService(server_address, api_token, channel_pool)
+        self.applications = ApplicationService(server_address, api_token, channel_pool)
+        self.gateways = GatewayService(server_address, api_token, channel_pool)
+        self.devices = DeviceService(server_address, api_token, channel_pool)
+        self.concurrency = concurrency
+        self.page_size = page_size
+
+    def plan(self, desired, prune=False):
+        """Compute the changes bringing the server to ``desired`` without applying them.
+
+        Args:
+            desired: Desired state document, see the class docstring
+            prune: Also delete the device profiles, applications, gateways and devices of the
+                managed tenants that are not in ``desired``
+
+        Returns:
+            ReconcilePlan
+
+        Raises:
+            ValueError: If ``desired`` holds the same object twice
+            ChirpstackRpcError: If listing the existing objects fails
+        """
+        wanted = _wanted(desired)
+        plan = ReconcilePlan()
+        current = self._list(wanted, prune, plan)
+        _plan_parents(plan, wanted, current, prune)
+        self._plan_devices(plan, wanted, current, prune)
+
+        plan.changes.sort(key=_phase)
+        logger.info(f"Planned {len(plan)} changes after listing {plan.listed} objects: {plan.summary()}")
+        return plan
+
+    def _plan_devices(self, plan, wanted, current, prune):
+        """Add the changes of the devices to ``plan``, after the ones of their parents."""
+        deleted = {change.key for change in plan.changes if change.kind == "application" and change.action == "delete"}
+        for dev_eui, (parent, entry) in wanted["device"].items():
+            existing = current["device"].get(dev_eui)
+            if existing is not None and existing[0] != parent:
+                # Moving to another application: delete and create again.
+                plan.changes.append(Change("device", "delete", dev_eui, existing[0], current=existing[1]))
+                existing = None
+            if existing is None:
+                plan.changes.append(Change("device", "create", dev_eui, parent, entry))
+                continue
+            device = {name: value for name, value in entry.items() if name not in _DEVICE_KEYS}
+            # An empty ID while the device profile is yet to be created.
+            device["device_profile_id"] = self._device_profile_id(plan, parent, entry) or ""
+            fields = _diff("device", device, existing[1])
+            if fields:
+                plan.changes.append(Change("device", "update", dev_eui, parent, entry, existing[1], fields))
+        if prune:
+            for dev_eui, (parent, item) in current["device"].items():
+                # Deleting an application deletes its devices.
+                if dev_eui not in wanted["device"] and parent not in deleted:
+                    plan.changes.append(Change("device", "delete", dev_eui, parent, current=item))
+
+    def _list(self, wanted, prune, plan):
+        """List the existing objects of the managed tenants, keyed like ``wanted``."""
+        current = {kind: {} for kind in KINDS}
+        for tenant in self.tenants.iter_all(self.page_size):
+            plan.listed += 1
+            if tenant.name in wanted["tenant"]:
+                current["tenant"][tenant.name] = (None, tenant)
+                plan.ids["tenant", tenant.name] = tenant.id
+
+        services = {
+            "device_profile": self.device_profiles,
+            "application": self.applications,
+            "gateway": self.gateways,
+        }
+        scopes = [(kind, name, tenant.id) for name, (_, tenant) in current["tenant"].items() for kind in services]
+        for scope, items in self._list_all(lambda scope: services[scope[0]].iter_all(scope[2], self.page_size), scopes):
+            kind, name, _ = scope
+            for obj in items:
+                key = obj.gateway_id if kind == "gateway" else (name, obj.name)
+                current[kind][key] = (name, obj)
+                if kind != "gateway":
+                    plan.ids[kind, key] = obj.id
+
+        # Only the devices of the desired applications can need a change, unless pruning.
+        applications = [
+            (key, plan.ids["application", key])
+            for key in current["application"]
+            if prune or key in wanted["application"]
+        ]
+        list_devices = lambda application: self.devices.iter_all(application[1], self.page_size)
+        for (key, _), devices in self._list_all(list_devices, applications):
+            for device in devices:
+                current["device"][device.dev_eui] = (key, device)
+
+        plan.listed += sum(len(current[kind]) for kind in KINDS[1:])
+        return current
+
+    def _list_all(self, iter_fn, scopes):
+        """List every scope in parallel, each one page by page, yielding (scope, items)."""
+        for index, items, error in imap_bounded(lambda scope: list(iter_fn(scope)), scopes, self.concurrency):
+            if error is not None:
+                raise error
+            yield scopes[index], items
+
+    def apply(self, plan):
+        """Apply the changes of a plan, phase by phase in dependency order.
+
+        A failed change does not stop the others, but the changes depending on it (e.g. the
+        devices of an application that could not be created) fail as well.
+
+        Args:
+            plan: ReconcilePlan returned by ``plan``
+
+        Returns:
+            The same ReconcilePlan, with the error of every failed change set
+        """
+        start = time.monotonic()
+        phases = {}
+        for change in plan.changes:
+            phases.setdefault(_phase(change), []).append(change)
+
+        for phase in sorted(phases):
+            changes = phases[phase]
+            result = run_bulk(lambda change: self._apply(plan, change), changes, self.concurrency)
+            for change, error in zip(changes, result.errors):
+                change.error = error
+
+        plan.elapsed = time.monotonic() - start
+        logger.info(
+            f"Applied {len(plan) - len(plan.failed)}/{len(plan)} changes in {plan.elapsed:.2f}s: {plan.summary()}"
+        )
+        return plan
+
+    def reconcile(self, desired, prune=False):
+        """Plan and apply the changes bringing the server to ``desired``, see ``plan`` and ``apply``."""
+        return self.apply(self.plan(desired, prune))
+
+    def _id(self, plan, kind, key):
+        obj_id = plan.ids.get((kind, key))
+        if obj_id is None:
+            raise LookupError(f"{kind.replace('_', ' ').capitalize()} {key!r} does not exist")
+        return obj_id
+
+    def _device_profile_id(self, plan, application, device):
+        if "device_profile_id" in device:
+            return device["device_profile_id"]
+        return plan.ids.get(("device_profile", (application[0], device["device_profile"])))
+
+    def _apply(self, plan, change):
+        kind, action, key, entry = change.kind, change.action, change.key, dict(change.desired or {})
+        if kind == "tenant":
+            plan.ids[kind, key] = self.tenants.create(entry["name"], entry["description"], optimistic=True).id
+        elif kind == "device":
+            self._apply_device(plan, change, entry)
+        elif action == "delete":
+            service = getattr(self, f"{kind}s")
+            service.delete(key if kind == "gateway" else plan.ids[kind, key])
+        elif kind == "gateway":
+            tenant_id = self._id(plan, "tenant", change.parent)
+            if action == "create":
+                self.gateways.create(tenant_id, entry.pop("gateway_id"), entry.pop("name"), optimistic=True, **entry)
+            else:
+                self.gateways.update(entry.pop("gateway_id"), entry.pop("name"), tenant_id=tenant_id, **entry)
+        else:
+            service = getattr(self, f"{kind}s")
+            tenant_id = self._id(plan, "tenant", change.parent)
+            if action == "create":
+                plan.ids[kind, key] = service.create(tenant_id, entry.pop("name"), optimistic=True, **entry).id
+            else:
+                service.update(plan.ids[kind, key], entry.pop("name"), tenant_id=tenant_id, **entry)
+
+    def _apply_device(self, plan, change, entry):
+        if change.action == "delete":
+            self.devices.delete(change.key)
+            return
+
+        application_id = self._id(plan, "application", change.parent)
+        profile_id = self._device_profile_id(plan, change.parent, entry)
+        if profile_id is None:
+            raise LookupError(f"Device profile {(change.parent[0], entry['device_profile'])!r} does not exist")
+        entry.pop("device_profile", None)
+        entry["device_profile_id"] = profile_id
+        args = [entry.pop(name) for name in ("name", "dev_eui", "app_key", "mac_version")]
+        if change.action == "create":
+            self.devices.create(application_id, *args, optimistic=True, **entry)
+        else:
+            name, dev_eui, app_key, mac_version = args
+            self.devices.update(dev_eui, name, app_key, mac_version, application_id=application_id, **entry)
@@ -0,0 +1,475 @@
+import json
+import os
+import threading
+from array import array
+from datetime import datetime, timezone
+
+from ..utils.bulk import imap_bounded
+from ..utils.logging import logger
+from ..utils.optional import require
+from ..utils.pagination import iter_pages
+from .application import ApplicationService
+from .device import DeviceService
+from .gateway import GatewayService
+
+FORMAT = "chirpstack-fuota-snapshot"
+VERSION = 1
+MANIFEST = "manifest.json"
+
+# Stored in int64 timestamp columns for unset timestamps, read back as NaT.
+_NAT = -(2**63)
+
+# Column types: array typecode the column is built with and numpy dtype it is saved as.
+# "dictionary" columns hold int32 codes into a separate array of distinct strings.
+_TYPES = {
+    "dictionary": ("i", "int32"),
+    "eui": ("Q", "uint64"),
+    "timestamp": ("q", "datetime64[ns]"),
+    "float32": ("f", "float32"),
+    "float64": ("d", "float64"),
+    "int8": ("b", "int8"),
+}
+
+
+def _timestamp(name):
+    def get(item):
+        if not item.HasField(name):
+            return _NAT
+        value = getattr(item, name)
+        return value.seconds * 1_000_000_000 + value.nanos
+
+    return get
+
+
+def _device_status(name):
+    def get(item):
+        return getattr(item.device_status, name) if item.HasField("device_status") else float("nan")
+
+    return get
+
+
+def _location(name):
+    def get(item):
+        return getattr(item.location, name) if item.HasField("location") else float("nan")
+
+    return get
+
+
+# Columns of every table as (name, type, getter of the value from a list item). A None getter
+# takes the value from the keyword arguments of _TableBuilder.extend.
+TABLES = {
+    "applications": (
+        ("id", "dictionary", lambda item: item.id),
+        ("name", "dictionary", lambda item: item.name),
+        ("description", "dictionary", lambda item: item.description),
+        ("created_at", "timestamp", _timestamp("created_at")),
+        ("updated_at", "timestamp", _timestamp("updated_at")),
+    ),
+    "devices": (
+        ("dev_eui", "eui", lambda item: int(item.dev_eui, 16)),
+        ("application_id", "dictionary", None),
+        ("name", "dictionary", lambda item: item.name),
+        ("description", "dictionary", lambda item: item.description),
+        ("device_profile_id", "dictionary", lambda item: item.device_profile_id),
+        ("device_profile_name", "dictionary", lambda item: item.device_profile_name),
+        ("created_at", "timestamp", _timestamp("created_at")),
+        ("updated_at", "timestamp", _timestamp("updated_at")),
+        ("last_seen_at", "timestamp", _timestamp("last_seen_at")),
+        ("margin", "float32", _device_status("margin")),
+        ("battery_level", "float32", _device_status("battery_level")),
+    ),
+    "gateways": (
+        ("gateway_id", "eui", lambda item: int(item.gateway_id, 16)),
+        ("name", "dictionary", lambda item: item.name),
+        ("description", "dictionary", lambda item: item.description),
+        ("latitude", "float64", _location("latitude")),
+        ("longitude", "float64", _location("longitude")),
+        ("altitude", "float64", _location("altitude")),
+        ("state", "int8", lambda item: item.state),
+        ("created_at", "timestamp", _timestamp("created_at")),
+        ("updated_at", "timestamp", _timestamp("updated_at")),
+        ("last_seen_at", "timestamp", _timestamp("last_seen_at")),
+    ),
+}
+
+# Column identifying the rows of every table.
+KEYS = {"applications": "id", "devices": "dev_eui", "gateways": "gateway_id"}
+
+
+class _Dictionary:
+    """Dictionary encoder assigning int32 codes to strings in order of first appearance."""
+
+    def __init__(self, strings=()):
+        self.strings = list(strings)
+        self.codes = {string: code for code, string in enumerate(self.strings)}
+
+    def encode(self, string):
+        code = self.codes.get(string)
+        if code is None:
+            code = self.codes[string] = len(self.strings)
+            self.strings.append(string)
+        return code
+
+
+class _TableBuilder:
+    """Column buffers of a table, filled page by page so list items are dropped after each page."""
+
+    def __init__(self, table, dictionaries=None):
+        self.table = table
+        self.columns = {name: array(_TYPES[kind][0]) for name, kind, _ in TABLES[table]}
+        self.dictionaries = {
+            name: _Dictionary((dictionaries or {}).get(name, ()))
+            for name, kind, _ in TABLES[table]
+            if kind == "dictionary"
+        }
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def extend(self, items, **values):
+        with self.lock:
+            for name, kind, get in TABLES[self.table]:
+                column = (values[name] for _ in items) if get is None else map(get, items)
+                if kind == "dictionary":
+                    column = map(self.dictionaries[name].encode, column)
+                self.columns[name].extend(column)
+            self.rows += len(items)
+
+    def arrays(self, np):
+        """Column name to numpy array, plus dictionary column name to its array of strings.
+
+        Rows are sorted by key, since pages of different applications are listed in parallel
+        and would otherwise come in a different order on every export.
+        """
+        columns = {}
+        for name, kind, _ in TABLES[self.table]:
+            buffer = self.columns[name]
+            columns[name] = np.frombuffer(buffer, dtype=buffer.typecode).astype(_TYPES[kind][1], copy=False)
+        dictionaries = {name: np.array(d.strings, dtype=str) for name, d in self.dictionaries.items()}
+        key = KEYS[self.table]
+        order = np.argsort(dictionaries[key][columns[key]] if key in dictionaries else columns[key], kind="stable")
+        return {name: column[order] for name, column in columns.items()}, dictionaries
+
+
+class SnapshotTable:
+    """Columns of one table of a Snapshot, memory-mapped from their ``.npy`` files on first access."""
+
+    def __init__(self, path, name, meta):
+        self.path = path
+        self.name = name
+        self.meta = meta
+        self._np = require("numpy", "numpy")
+        self._arrays = {}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def columns(self):
+        return list(self.meta["columns"])
+
+    def _load(self, file):
+        array = self._arrays.get(file)
+        if array is None:
+            array = self._arrays[file] = self._np.load(os.path.join(self.path, file), mmap_mode="r")
+        return array
+
+    def __getitem__(self, column):
+        """Raw column: int32 codes for dictionary columns, uint64 for EUIs, datetime64[ns] for timestamps."""
+        return self._load(self.meta["columns"][column]["file"])
+
+    def dictionary(self, column):
+        """Distinct strings of a dictionary column, indexed by its codes."""
+        return self._load(self.meta["columns"][column]["dictionary"])
+
+    def decode(self, column):
+        """Column values as strings for dictionary and EUI columns, as stored for the others."""
+        kind = self.meta["columns"][column]["type"]
+        if kind == "dictionary":
+            return self.dictionary(column)[self[column]]
+        if kind == "eui":
+            return self._np.char.mod("%016x", self[column])
+        return self[column]
+
+    def equals(self, column, value):
+        """Boolean mask of the rows whose ``column`` equals ``value``, without decoding the column.
+
+        Dictionary columns compare codes against the code of ``value``, EUI columns accept the
+        hex EUI string.
+        """
+        kind = self.meta["columns"][column]["type"]
+        if kind == "dictionary":
+            codes = self._np.flatnonzero(self.dictionary(column) == value)
+            if not len(codes):
+                return self._np.zeros(len(self), dtype=bool)
+            return self[column] == codes[0]
+        if kind == "eui":
+            value = int(value, 16)
+        return self[column] == value
+
+
+class Snapshot:
+    """Columnar snapshot of the applications, devices and gateways of a tenant, read from disk.
+
+    A snapshot is a directory holding a ``manifest.json`` and one ``.npy`` file per column
+    (plus one per dictionary), so columns are memory-mapped instead of read: opening a snapshot
+    of a large fleet is instant and only the pages of the columns used are loaded. Use
+    SnapshotExporter to write one.
+
+    A Snapshot reads the files named by the manifest it was opened with. A refresh writes the
+    columns that changed to new files and then replaces the manifest, so an open Snapshot
+    keeps reading consistent data, until the refresh after next removes its files. Open the
+    snapshot again to read refreshed data.
+
+    Attributes:
+        path: Snapshot directory
+        manifest: Parsed manifest.json
+        tables: Dict of table name ("applications", "devices", "gateways") to SnapshotTable
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT or self.manifest.get("version") != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} snapshot")
+        self.tables = {name: SnapshotTable(path, name, meta) for name, meta in self.manifest["tables"].items()}
+
+    @property
+    def tenant_id(self):
+        return self.manifest["tenant_id"]
+
+    @property
+    def changes(self):
+        """Rows added, updated (by updated_at) and removed per table by the last export or refresh."""
+        return self.manifest["changes"]
+
+    def __getitem__(self, table):
+        return self.tables[table]
+
+
+def _write(path, file, array, np):
+    # Write next to the target and rename, so readers never see a partial file.
+    target = os.path.join(path, file)
+    with open(target + ".tmp", "wb") as f:
+        np.save(f, array)
+    os.replace(target + ".tmp", target)
+
+
+def _same(path, file, array, np):
+    target = os.path.join(path, file)
+    if not os.path.exists(target):
+        return False
+    current = np.load(target, mmap_mode="r")
+    if current.dtype != array.dtype or current.shape != array.shape:
+        return False
+    # Compared byte for byte, since NaT never equals NaT.
+    return np.array_equal(np.asarray(current).reshape(-1).view(np.uint8), array.reshape(-1).view(np.uint8))
+
+
+def _changes(previous, table, columns, dictionaries, np):
+    """Count the rows added, updated and removed since ``previous`` by key and updated_at."""
+    key = KEYS[table]
+    keys = dictionaries[key][columns[key]] if key in dictionaries else columns[key]
+    if previous is None or table not in previous.tables:
+        return {"added": len(keys), "updated": 0, "removed": 0}
+    old = previous[table]
+    old_keys = old.decode(key) if old.meta["columns"][key]["type"] == "dictionary" else old[key]
+    common, old_index, new_index = np.intersect1d(old_keys, keys, assume_unique=True, return_indices=True)
+    old_updated = np.asarray(old["updated_at"]).view("int64")[old_index]
+    new_updated = columns["updated_at"].view("int64")[new_index]
+    return {
+        "added": len(keys) - len(common),
+        "updated": int(np.count_nonzero(old_updated != new_updated)),
+        "removed": len(old_keys) - len(common),
+    }
+
+
+class SnapshotExporter:
+    """Export the applications, devices and gateways of a tenant to a columnar Snapshot.
+
+    Every List page is written straight into compact column buffers (dictionary-encoded
+    strings, uint64 EUIs, datetime64 timestamps) and dropped, so exporting a fleet never holds
+    more than a page of protobuf messages per application being listed. Requires numpy.
+    """
+
+    def __init__(self, server_address, api_token, channel_pool=None, page_size=500, concurrency=4):
+        """Initialize the exporter.
+
+        Args:
+            server_address: ChirpStack server address
+            api_token: API token for authentication
+            channel_pool: Optional ChannelPool, defaults to the process-wide pool
+            page_size: Number of objects fetched per List call
+            concurrency: Max number of applications whose devices are listed at once
+        """
+        self.applications = ApplicationService(server_address, api_token, channel_pool)
+        self.devices = DeviceService(server_address, api_token, channel_pool)
+        self.gateways = GatewayService(server_address, api_token, channel_pool)
+        self.page_size = page_size
+        self.concurrency = concurrency
+
+    def export(self, tenant_id, path):
+        """Write a new snapshot of a tenant to the ``path`` directory, replacing any previous one.
+
+        Args:
+            tenant_id: Tenant ID UUID string
+            path: Snapshot directory, created if missing
+
+        Returns:
+            Snapshot
+        """
+        try:
+            existing = Snapshot(path)
+        except (OSError, ValueError):
+            existing = None
+        return self._export(tenant_id, path, None, existing)
+
+    def refresh(self, path):
+        """Bring an existing snapshot up to date.
+
+        ChirpStack cannot list only the objects updated since a given time, so the listings
+        are paged through again, but only the column files whose content changed are
+        rewritten. Dictionaries only grow, so the codes of a snapshot stay valid across
+        refreshes. The rows added, updated (by updated_at) and removed are recorded in
+        ``Snapshot.changes``.
+
+        Args:
+            path: Directory of a snapshot written by ``export``
+
+        Returns:
+            Snapshot
+        """
+        previous = Snapshot(path)
+        return self._export(previous.tenant_id, path, previous, previous)
+
+    def _export(self, tenant_id, path, previous, existing):
+        """Export a tenant to ``path``.
+
+        Args:
+            previous: Snapshot refreshed, whose dictionaries are extended and which changes are
+                counted from, None for a new export
+            existing: Snapshot currently in ``path``, whose files are kept when unchanged
+        """
+        np = require("numpy", "numpy")
+        builders = {table: _TableBuilder(table, _dictionaries(previous, table)) for table in TABLES}
+        self._list(tenant_id, builders)
+
+        os.makedirs(path, exist_ok=True)
+        now = datetime.now(timezone.utc).isoformat()
+        manifest = {
+            "format": FORMAT,
+            "version": VERSION,
+            "tenant_id": tenant_id,
+            "generation": 0 if existing is None else existing.manifest.get("generation", 0) + 1,
+            "exported_at": now if previous is None else previous.manifest["exported_at"],
+            "refreshed_at": now,
+            "tables": {},
+            "changes": {},
+        }
+        written = 0
+        for table, builder in builders.items():
+            columns, dictionaries = builder.arrays(np)
+            manifest["changes"][table] = _changes(previous, table, columns, dictionaries, np)
+            manifest["tables"][table], count = _write_table(
+                path, table, builder.rows, columns, dictionaries, manifest["generation"], existing, np
+            )
+            written += count
+
+        # Readers switch to the new files at once when the manifest is replaced.
+        _write_manifest(path, manifest)
+        _remove_unused(path, manifest, existing)
+        logger.info(
+            f"Exported snapshot of tenant {tenant_id} to {path}: "
+            + ", ".join(f"{meta['rows']} {table}" for table, meta in manifest["tables"].items())
+            + f" ({written} files written)"
+        )
+        return Snapshot(path)
+
+    def _list(self, tenant_id, builders):
+        """List the applications, gateways and devices of a tenant into the table builders."""
+        application_ids = []
+        for page in iter_pages(lambda limit, offset: self.applications.list(tenant_id, limit, offset), self.page_size):
+            application_ids.extend(application.id for application in page.result)
+            builders["applications"].extend(page.result)
+        for page in iter_pages(lambda limit, offset: self.gateways.list(tenant_id, limit, offset), self.page_size):
+            builders["gateways"].extend(page.result)
+
+        def list_devices(application_id):
+            list_page = lambda limit, offset: self.devices.list(application_id, limit, offset)
+            for page in iter_pages(list_page, self.page_size):
+                builders["devices"].extend(page.result, application_id=application_id)
+
+        for _, _, error in imap_bounded(list_devices, application_ids, self.concurrency):
+            if error is not None:
+                raise error
+
+
+def _dictionaries(previous, table):
+    """Strings of the dictionary columns of ``table`` in the previous snapshot, if any."""
+    if previous is None or table not in previous.tables:
+        return {}
+    old = previous[table]
+    return {
+        name: old.dictionary(name).tolist()
+        for name, kind, _ in TABLES[table]
+        if kind == "dictionary" and name in old.meta["columns"]
+    }
+
+
+def _write_table(path, table, rows, columns, dictionaries, generation, existing, np):
+    """Write the column and dictionary files of a table that differ from the existing snapshot.
+
+    Changed files are written under new names suffixed with the generation, never over a file
+    an open Snapshot may map.
+
+    Returns:
+        Table metadata for the manifest and number of files written
+    """
+    old = existing.tables.get(table) if existing is not None else None
+    meta = {"rows": rows, "key": KEYS[table], "columns": {}}
+    written = 0
+    for name, kind, _ in TABLES[table]:
+        arrays = {"file": columns[name]}
+        if kind == "dictionary":
+            arrays["dictionary"] = dictionaries[name]
+        old_files = old.meta["columns"].get(name, {}) if old is not None else {}
+        files = {}
+        for role, values in arrays.items():
+            file = old_files.get(role)
+            if file is None or not _same(path, file, values, np):
+                suffix = ".dictionary" if role == "dictionary" else ""
+                file = f"{table}.{name}{suffix}.{generation}.npy"
+                _write(path, file, values, np)
+                written += 1
+            files[role] = file
+        meta["columns"][name] = {"type": kind, "dtype": _TYPES[kind][1], **files}
+    return meta, written
+
+
+def _files(manifest):
+    return {
+        file
+        for meta in manifest["tables"].values()
+        for column in meta["columns"].values()
+        for role, file in column.items()
+        if role in ("file", "dictionary")
+    }
+
+
+def _remove_unused(path, manifest, existing):
+    """Remove the column files of generations before the existing snapshot.
+
+    The files of the existing snapshot are kept, so Snapshots opened before this export can
+    still map the columns they have not loaded yet.
+    """
+    used = _files(manifest) | (_files(existing.manifest) if existing is not None else set())
+    for file in os.listdir(path):
+        if file.endswith(".npy") and file.split(".", 1)[0] in TABLES and file not in used:
+            os.remove(os.path.join(path, file))
+
+
+def _write_manifest(path, manifest):
+    target = os.path.join(path, MANIFEST)
+    with open(target + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(target + ".tmp", target)
@@ -1,73 +1,156 @@
 import grpc
 from chirpstack_api import api
 
-from ..utils.helpers import auth_header, create_channel
+from ..exceptions import ChirpstackRpcError
+from ..utils import futures, helpers
+from ..utils.channel_pool import get_channel
+from ..utils.helpers import auth_header
+from ..utils.pagination import iter_items
 
 
 class TenantService:
-    def __init__(self, server_address, api_token):
+    def __init__(
+        self, server_address, api_token, channel_pool=None, name_cache=None, optimistic=False, is_conflict=None
+    ):
         self.server_address = server_address
         self.api_token = api_token
-        self.channel = create_channel(self.server_address)
+        self.channel = get_channel(self.server_address, channel_pool)
         self.stub = api.TenantServiceStub(self.channel)
+        self.name_cache = name_cache
+        self.optimistic = optimistic
+        self.is_conflict = is_conflict or helpers.is_conflict
 
-    def create(self, name, description=""):
+    def create(self, name, description="", optimistic=None):
+        req = self._create_request(name, description)
         try:
-            existing_tenant = self.get_by_name(name)
-            if existing_tenant:
-                return existing_tenant
-
-            req = api.CreateTenantRequest(
-                tenant=api.Tenant(
-                    name=name,
-                    description=description,
-                    can_have_gateways=True,
-                )
+            return helpers.create_or_get(
+                lambda: self._created(req, self.stub.Create(req, metadata=auth_header(self.api_token))),
+                lambda: self.get_by_name(name),
+                self.optimistic if optimistic is None else optimistic,
+                self.is_conflict,
             )
-            return self.stub.Create(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to create tenant: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to create tenant: {str(e)}", e)
+
+    def create_async(self, name, description="", optimistic=None):
+        """Non-blocking ``create``, returning a concurrent.futures.Future of the tenant."""
+        req = self._create_request(name, description)
+        future = helpers.create_or_get_future(
+            lambda: futures.then(
+                futures.call(self.stub.Create, req, metadata=auth_header(self.api_token)),
+                lambda resp: self._created(req, resp),
+            ),
+            lambda: self.get_by_name_async(name),
+            self.optimistic if optimistic is None else optimistic,
+            self.is_conflict,
+        )
+        return futures.wrap_errors(future, "Failed to create tenant")
+
+    def _create_request(self, name, description):
+        return api.CreateTenantRequest(
+            tenant=api.Tenant(
+                name=name,
+                description=description,
+                can_have_gateways=True,
+            )
+        )
+
+    def _created(self, req, resp):
+        if self.name_cache is not None:
+            tenant = api.TenantListItem(id=resp.id, name=req.tenant.name, can_have_gateways=True)
+            self.name_cache.put("tenant", None, req.tenant.name, resp.id, tenant)
+        return resp
 
     def get(self, tenant_id):
         req = api.GetTenantRequest(id=tenant_id)
         try:
-            return self.stub.Get(req, metadata=auth_header(self.api_token)(self.api_token))
+            return self.stub.Get(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get tenant: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get tenant: {str(e)}", e)
+
+    def get_async(self, tenant_id):
+        """Non-blocking ``get``, returning a concurrent.futures.Future of the tenant."""
+        req = api.GetTenantRequest(id=tenant_id)
+        future = futures.call(self.stub.Get, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to get tenant")
 
     def get_by_name(self, name):
+        if self.name_cache is not None:
+            cached = self.name_cache.get("tenant", None, name)
+            if cached is not None:
+                return cached
+
         req = api.ListTenantsRequest(
             limit=1,
             search=name,
         )
         try:
-            resp = self.stub.List(req, metadata=auth_header(self.api_token))
-            for tenant in resp.result:
-                if tenant.name == name:
-                    return tenant
-            return None
+            return self._find(name, self.stub.List(req, metadata=auth_header(self.api_token)))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to get tenant by name: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to get tenant by name: {str(e)}", e)
+
+    def get_by_name_async(self, name):
+        """Non-blocking ``get_by_name``, returning a concurrent.futures.Future of the tenant or None."""
+        if self.name_cache is not None:
+            cached = self.name_cache.get("tenant", None, name)
+            if cached is not None:
+                return futures.completed(cached)
+
+        req = api.ListTenantsRequest(limit=1, search=name)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda resp: self._find(name, resp))
+        return futures.wrap_errors(future, "Failed to get tenant by name")
+
+    def _find(self, name, resp):
+        for tenant in resp.result:
+            if tenant.name == name:
+                if self.name_cache is not None:
+                    self.name_cache.put("tenant", None, name, tenant.id, tenant)
+                return tenant
+        return None
 
     def update(self, tenant_id, name, description=""):
-        req = api.UpdateTenantRequest(
+        req = self._update_request(tenant_id, name, description)
+        try:
+            self.stub.Update(req, metadata=auth_header(self.api_token))
+            self._invalidate(tenant_id)
+        except grpc.RpcError as e:
+            raise ChirpstackRpcError(f"Failed to update tenant: {str(e)}", e)
+
+    def update_async(self, tenant_id, name, description=""):
+        """Non-blocking ``update``, returning a concurrent.futures.Future resolving to None."""
+        req = self._update_request(tenant_id, name, description)
+        future = futures.call(self.stub.Update, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(tenant_id))
+        return futures.wrap_errors(future, "Failed to update tenant")
+
+    def _update_request(self, tenant_id, name, description):
+        return api.UpdateTenantRequest(
             tenant=api.Tenant(
                 id=tenant_id,
                 name=name,
                 description=description,
             )
         )
-        try:
-            self.stub.Update(req, metadata=auth_header(self.api_token))
-        except grpc.RpcError as e:
-            raise Exception(f"Failed to update tenant: {str(e)}")
 
     def delete(self, tenant_id):
         req = api.DeleteTenantRequest(id=tenant_id)
         try:
             self.stub.Delete(req, metadata=auth_header(self.api_token))
+            self._invalidate(tenant_id)
         except grpc.RpcError as e:
-            raise Exception(f"Failed to delete tenant: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to delete tenant: {str(e)}", e)
+
+    def delete_async(self, tenant_id):
+        """Non-blocking ``delete``, returning a concurrent.futures.Future resolving to None."""
+        req = api.DeleteTenantRequest(id=tenant_id)
+        future = futures.call(self.stub.Delete, req, metadata=auth_header(self.api_token))
+        future = futures.then(future, lambda _: self._invalidate(tenant_id))
+        return futures.wrap_errors(future, "Failed to delete tenant")
+
+    def _invalidate(self, tenant_id):
+        if self.name_cache is not None:
+            self.name_cache.invalidate_id("tenant", tenant_id)
 
     def list(self, limit=10, offset=0):
         req = api.ListTenantsRequest(
@@ -77,4 +160,22 @@ class TenantService:
         try:
             return self.stub.List(req, metadata=auth_header(self.api_token))
         except grpc.RpcError as e:
-            raise Exception(f"Failed to list tenants: {str(e)}")
+            raise ChirpstackRpcError(f"Failed to list tenants: {str(e)}", e)
+
+    def list_async(self, limit=10, offset=0):
+        """Non-blocking ``list``, returning a concurrent.futures.Future of the list response."""
+        req = api.ListTenantsRequest(limit=limit, offset=offset)
+        future = futures.call(self.stub.List, req, metadata=auth_header(self.api_token))
+        return futures.wrap_errors(future, "Failed to list tenants")
+
+    def iter_all(self, page_size=100, prefetch=True):
+        """Iterate over all tenants across pages, prefetching the next page in the background."""
+        tenants = iter_items(lambda limit, offset: self.list(limit, offset), page_size, prefetch)
+        if self.name_cache is None:
+            return tenants
+        return self._cached(tenants)
+
+    def _cached(self, tenants):
+        for tenant in tenants:
+            self.name_cache.put("tenant", None, tenant.name, tenant.id, tenant)
+            yield tenant
@@ -0,0 +1,23 @@
+class ChirpstackRpcError(Exception):
+    """Raised by the services when a ChirpStack or FUOTA server RPC fails.
+
+    The gRPC status of the failed call stays available, so callers can tell a missing
+    object (NOT_FOUND) from an overloaded server (UNAVAILABLE, RESOURCE_EXHAUSTED).
+
+    Attributes:
+        code: grpc.StatusCode of the failed call, None if unknown
+        details: Status details sent by the server, None if unknown
+        rpc_error: The original grpc.RpcError
+    """
+
+    def __init__(self, message, rpc_error=None):
+        super().__init__(message)
+        self.rpc_error = rpc_error
+        self.code = _call_or_none(rpc_error, "code")
+        self.details = _call_or_none(rpc_error, "details")
+
+
+def _call_or_none(rpc_error, name):
+    # A bare grpc.RpcError carries no status, only errors raised by calls do.
+    method = getattr(rpc_error, name, None)
+    return method() if callable(method) else None
@@ -1,73 +1,599 @@
-from dataclasses import dataclass
-from typing import Dict, Optional
-
-
-@dataclass
-class Tenant:
-    id: str
-    name: str
-    description: Optional[str] = None
-    can_have_gateways: bool = True
-    max_devices: int = 0
-    max_gateways: int = 0
-
-
-@dataclass
-class Application:
-    id: str
-    name: str
-    description: Optional[str] = None
-    tenant_id: str
-
-
-@dataclass
-class DeviceProfile:
-    id: str
-    name: str
-    tenant_id: str
-    supports_class_b: bool = False
-    supports_class_c: bool = False
-    mac_version: str = "1.0.3"
-    reg_params_revision: str = "B"
-    adr_algorithm_id: str = "default"
-    payload_codec_runtime: str = "NONE"
-    flush_queue_on_activate: bool = True
-
-
-@dataclass
-class Device:
-    dev_eui: str
-    name: str
-    application_id: str
-    device_profile_id: str
-    description: Optional[str] = None
-    is_disabled: bool = False
-
-
-@dataclass
-class Gateway:
-    gateway_id: str
-    name: str
-    tenant_id: str
-    description: Optional[str] = None
-    location: Optional[Dict[str, float]] = None
-    metadata: Optional[Dict[str, str]] = None
-
-
-@dataclass
-class DeviceKeys:
-    dev_eui: str
-    nwk_key: str
-    app_key: str
-
-
-@dataclass
-class MulticastGroup:
-    id: str
-    name: str
-    application_id: str
-    mc_addr: str
-    mc_nwk_s_key: str
-    mc_app_s_key: str
-    f_cnt: int
-    group_type: str
+"""Plain Python record types for ChirpStack and FUOTA objects.
+
+Models hold the commonly used fields of an object in ``__slots__``, with its timestamps packed
+in a single bytes object. A listed device takes about 330 bytes as a model, against about
+520 bytes as a message parsed or copied on its own and 900 bytes as a dict. Items left inside
+their List response take less, about 165 bytes each, but keeping any of them keeps the whole
+response alive, which models do not.
+
+Models are built from messages by converters generated on first use for every message type,
+which copy the fields straight into the slots, turn timestamps into int nanoseconds since the
+epoch (None when unset) and enums into their names.
+
+Rarely used fields (tags, variables, device status, the many settings of a device
+profile, ...) are not converted: when any of them is set, the model keeps the serialized
+message and decodes them all on first access.
+
+    devices = models.Device.from_protos(device_service.list(application_id, limit=1000).result)
+    models.from_proto(device_service.get(dev_eui))  # Device, converter picked by message type
+"""
+
+import struct
+import sys
+
+_REQUIRED = object()
+
+# Packed in the timestamps of a model for the unset ones.
+_UNSET = -(2**63)
+
+# Model class of every message full name listed in the ``_messages`` of a model.
+_MODELS = {}
+
+_TIMESTAMP = "google.protobuf.Timestamp"
+
+
+def _ns(timestamp):
+    return timestamp.seconds * 1_000_000_000 + timestamp.nanos
+
+
+def _enum_names(field):
+    return {value.number: value.name for value in field.enum_type.values}
+
+
+def _is_map(field):
+    return field.message_type is not None and field.message_type.GetOptions().map_entry
+
+
+def _is_repeated(field):
+    return field.label == field.LABEL_REPEATED
+
+
+def _value(field, holder):
+    """Convert the ``field`` of the ``holder`` message to its model value, for lazy fields."""
+    value = getattr(holder, field.name)
+    if _is_map(field):
+        return dict(value) if value else None
+    if field.message_type is not None:
+        model = _MODELS.get(field.message_type.full_name)
+        if _is_repeated(field):
+            return tuple(model.from_protos(value)) if model is not None else tuple(value)
+        if not holder.HasField(field.name):
+            return None
+        if field.message_type.full_name == _TIMESTAMP:
+            return _ns(value)
+        return model.from_proto(value) if model is not None else value
+    if field.enum_type is not None:
+        names = _enum_names(field)
+        return tuple(names.get(v, v) for v in value) if _is_repeated(field) else names.get(value, value)
+    return tuple(value) if _is_repeated(field) else value
+
+
+def _field_lines(name, default, location, shared, namespace):
+    """Lines of the generated converter setting the slot ``name``, adding the globals they use to ``namespace``."""
+    if location is None:
+        namespace[f"d_{name}"] = None if default is _REQUIRED else default
+        return [f"    obj.{name} = d_{name}"]
+    holder, field = location
+    value = f"{holder}.{name}"
+    if field.message_type is not None and field.message_type.full_name == _TIMESTAMP:
+        return [f"    obj.{name} = ns({value}) if {holder}.HasField({name!r}) else None"]
+    if field.message_type is not None or _is_repeated(field):
+        namespace[f"f_{name}"] = field
+        namespace["value"] = _value
+        return [f"    obj.{name} = value(f_{name}, {holder})"]
+    if field.enum_type is not None:
+        namespace[f"e_{name}"] = _enum_names(field)
+        return [f"    v = {value}", f"    obj.{name} = e_{name}.get(v, v)"]
+    if shared:
+        return [f"    obj.{name} = intern({value})"]
+    return [f"    obj.{name} = {value}"]
+
+
+class _Converter:
+    """Converter of one message type to one model, see ``Model.from_proto``."""
+
+    def __init__(self, model, message_type):
+        self.message_type = message_type
+        self.descriptor = message_type.DESCRIPTOR
+        canonical = model._messages[0]
+        # Get responses wrap the object in a field of the canonical type, next to its timestamps.
+        self.inner = None
+        if self.descriptor.full_name != canonical:
+            for field in self.descriptor.fields:
+                if field.message_type is not None and field.message_type.full_name == canonical:
+                    self.inner = field.name
+                    break
+
+        namespace = {"new": object.__new__, "cls": model, "ns": _ns, "intern": sys.intern}
+        lines = ["def convert(msg):"]
+        if self.inner is not None:
+            lines.append(f"    inner = msg.{self.inner}")
+        lines.append("    obj = new(cls)")
+        for name, default in model._fields:
+            lines.extend(_field_lines(name, default, self._resolve(name), name in model._shared, namespace))
+        if model._timestamps:
+            lines.extend(self._timestamp_lines(model, namespace))
+
+        if model._lazy:
+            lines.extend(self._lazy_lines(model, namespace))
+        lines.append("    return obj")
+        exec("\n".join(lines), namespace)  # noqa: S102
+        self.convert = namespace["convert"]
+
+    def _lazy_lines(self, model, namespace):
+        """Lines of the generated converter keeping the serialized message when a lazy field is set."""
+        self.lazy = []
+        present = []
+        for name, _ in model._lazy:
+            location = self._resolve(name)
+            if location is None:
+                continue
+            holder, field = location
+            self.lazy.append((name, holder, field))
+            if field.message_type is not None and not _is_repeated(field):
+                present.append(f"{holder}.HasField({name!r})")
+            else:
+                present.append(f"{holder}.{name}")
+        if not present:
+            return ["    obj._raw = None"]
+        # The serialized message is prefixed with the index of its converter in the model,
+        # looked up after appending since converters may be created by several threads at once.
+        model._decoders.append(self)
+        namespace["prefix"] = bytes((model._decoders.index(self),))
+        return [
+            f"    if {' or '.join(present)}:",
+            "        obj._raw = prefix + msg.SerializeToString()",
+            "        return obj",
+            "    obj._raw = None",
+        ]
+
+    def _timestamp_lines(self, model, namespace):
+        """Lines of the generated converter packing the timestamps of the model into ``_stamps``."""
+        namespace.update(UNSET=_UNSET, unset=(_UNSET,) * len(model._timestamps), pack=model._packer.pack)
+        values = []
+        for name in model._timestamps:
+            location = self._resolve(name)
+            if location is None:
+                values.append("UNSET")
+            else:
+                values.append(f"ns({location[0]}.{name}) if {location[0]}.HasField({name!r}) else UNSET")
+        lines = ["    stamps = (", *(f"        {value}," for value in values), "    )"]
+        return [*lines, "    obj._stamps = None if stamps == unset else pack(*stamps)"]
+
+    def _resolve(self, name):
+        """Return ("inner" or "msg", field descriptor) of the field ``name``, None if missing."""
+        if self.inner is not None:
+            inner_fields = self.descriptor.fields_by_name[self.inner].message_type.fields_by_name
+            if name in inner_fields:
+                return "inner", inner_fields[name]
+        if name in self.descriptor.fields_by_name:
+            return "msg", self.descriptor.fields_by_name[name]
+        return None
+
+    def decode(self, raw):
+        """Decode the lazy fields of a serialized message to a dict of model values."""
+        msg = self.message_type.FromString(raw)
+        holders = {"msg": msg, "inner": getattr(msg, self.inner) if self.inner is not None else None}
+        return {name: _value(field, holders[holder]) for name, holder, field in self.lazy}
+
+
+class _Lazy:
+    """Class-level accessor of a lazy field, decoding the kept message on first access."""
+
+    __slots__ = ("name", "default")
+
+    def __init__(self, name, default):
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        decoded = obj._decoded()
+        return self.default if decoded is None else decoded.get(self.name, self.default)
+
+    def __set__(self, obj, value):
+        decoded = obj._decoded()
+        if decoded is None:
+            decoded = obj._raw = {}
+        decoded[self.name] = value
+
+
+class _Timestamp:
+    """Class-level accessor of a timestamp, unpacked from the int64 nanoseconds kept in ``_stamps``."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        stamps = obj._stamps
+        if stamps is None:
+            return None
+        value = obj._packer.unpack(stamps)[self.index]
+        return None if value == _UNSET else value
+
+    def __set__(self, obj, value):
+        values = [getattr(obj, name) for name in obj._timestamps]
+        values[self.index] = value
+        obj._stamps = _pack_timestamps(obj._packer, values)
+
+
+def _pack_timestamps(packer, values):
+    """Pack timestamps (int nanoseconds or None) to bytes, None when all are unset."""
+    if all(value is None for value in values):
+        return None
+    return packer.pack(*(_UNSET if value is None else value for value in values))
+
+
+class _ModelMeta(type):
+    """Give every model its slots, field accessors, ``__init__`` and converter cache."""
+
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get("_fields", ())
+        timestamps = namespace.get("_timestamps", ())
+        lazy = namespace.get("_lazy", ())
+        if fields or timestamps:
+            # Timestamps share one bytes slot, lazy fields the kept message: none is added if unused.
+            slots = [field for field, _ in fields]
+            if timestamps:
+                slots.append("_stamps")
+                namespace["_packer"] = struct.Struct(f"<{len(timestamps)}q")
+                for index, field in enumerate(timestamps):
+                    namespace[field] = _Timestamp(index)
+            if lazy:
+                slots.append("_raw")
+                for field, default in lazy:
+                    namespace[field] = _Lazy(field, default)
+            namespace["__slots__"] = tuple(slots)
+        cls = super().__new__(mcs, name, bases, namespace)
+        if fields or timestamps:
+            cls.__init__ = _make_init(cls, fields, timestamps, lazy)
+            cls._converters = {}
+            cls._decoders = []
+            for full_name in namespace.get("_messages", ()):
+                _MODELS[full_name] = cls
+        return cls
+
+
+def _make_init(cls, fields, timestamps, lazy):
+    namespace = {}
+    params, body = [], []
+    seen_default = False
+    for name, default in fields:
+        if default is _REQUIRED:
+            if seen_default:
+                raise TypeError(f"{cls.__name__}: required field {name!r} follows a field with a default")
+            params.append(name)
+        else:
+            seen_default = True
+            namespace[f"d_{name}"] = default
+            params.append(f"{name}=d_{name}")
+        body.append(f"    self.{name} = {name}")
+    if timestamps:
+        namespace.update(pack=_pack_timestamps, packer=cls._packer)
+        params.extend(f"{name}=None" for name in timestamps)
+        body.append(f"    self._stamps = pack(packer, ({''.join(f'{name}, ' for name in timestamps)}))")
+    for name, default in lazy:
+        namespace[f"d_{name}"] = default
+        params.append(f"{name}=d_{name}")
+    if lazy:
+        lazy_values = ", ".join(f"{name!r}: {name}" for name, _ in lazy)
+        body.append(f"    self._raw = {{{lazy_values}}}")
+    exec(f"def __init__(self, {', '.join(params)}):\n" + "\n".join(body), namespace)  # noqa: S102
+    init = namespace["__init__"]
+    init.__qualname__ = f"{cls.__name__}.__init__"
+    return init
+
+
+class Model(metaclass=_ModelMeta):
+    """Base of the slotted models.
+
+    Subclasses list their fields as (name, default) pairs in ``_fields``, required ones first,
+    the names of their timestamp fields in ``_timestamps``, their lazily decoded fields in
+    ``_lazy`` and the full names of the messages they are built from in ``_messages``, the
+    object message itself first. String fields listed in ``_shared`` usually hold the same few
+    values across records (parent IDs, profile names) and are interned, so records share a
+    single string object per value. Timestamps are packed together as int64 nanoseconds in a
+    single bytes object, None when all are unset.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _timestamps = ()
+    _lazy = ()
+    _messages = ()
+    _shared = ()
+
+    @classmethod
+    def _converter(cls, message_type):
+        converter = cls._converters.get(message_type)
+        if converter is None:
+            if message_type.DESCRIPTOR.full_name not in cls._messages:
+                raise TypeError(f"Cannot convert {message_type.DESCRIPTOR.full_name} to {cls.__name__}")
+            converter = cls._converters[message_type] = _Converter(cls, message_type)
+        return converter
+
+    @classmethod
+    def from_proto(cls, message):
+        """Build a model from one of the messages listed in ``_messages``."""
+        return cls._converter(type(message)).convert(message)
+
+    @classmethod
+    def from_protos(cls, messages):
+        """Build a list of models from messages, e.g. the ``result`` of a List response."""
+        converted = []
+        message_type = convert = None
+        for message in messages:
+            if type(message) is not message_type:
+                message_type = type(message)
+                convert = cls._converter(message_type).convert
+            converted.append(convert(message))
+        return converted
+
+    def _decoded(self):
+        raw = self._raw
+        if type(raw) is bytes:
+            raw = self._raw = self._decoders[raw[0]].decode(raw[1:])
+        return raw
+
+    @classmethod
+    def _names(cls):
+        return [name for name, _ in cls._fields] + list(cls._timestamps) + [name for name, _ in cls._lazy]
+
+    def to_dict(self):
+        """All fields, lazy ones included, with nested models converted to dicts as well."""
+
+        def plain(value):
+            if isinstance(value, Model):
+                return value.to_dict()
+            if isinstance(value, tuple):
+                return [plain(item) for item in value]
+            return value
+
+        return {name: plain(getattr(self, name)) for name in self._names()}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        names = [name for name, _ in self._fields] + list(self._timestamps)
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in names)
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self._names()}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+def from_proto(message):
+    """Build the model of a message, picked by its type, e.g. a Device from an api.DeviceListItem."""
+    model = _MODELS.get(message.DESCRIPTOR.full_name)
+    if model is None:
+        raise TypeError(f"No model for {message.DESCRIPTOR.full_name}")
+    return model.from_proto(message)
+
+
+class Location(Model):
+    _messages = ("common.Location",)
+    _fields = (
+        ("latitude", 0.0),
+        ("longitude", 0.0),
+        ("altitude", 0.0),
+        ("source", "UNKNOWN"),
+        ("accuracy", 0.0),
+    )
+
+
+class DeviceStatus(Model):
+    _messages = ("api.DeviceStatus",)
+    _fields = (
+        ("margin", 0),
+        ("external_power_source", False),
+        ("battery_level", 0.0),
+    )
+
+
+class Tenant(Model):
+    _messages = ("api.Tenant", "api.TenantListItem", "api.GetTenantResponse")
+    _fields = (
+        ("id", _REQUIRED),
+        ("name", _REQUIRED),
+        ("description", ""),
+        ("can_have_gateways", False),
+        ("max_gateway_count", 0),
+        ("max_device_count", 0),
+        ("private_gateways_up", False),
+        ("private_gateways_down", False),
+    )
+    _timestamps = ("created_at", "updated_at")
+    _lazy = (("tags", None),)
+
+
+class Application(Model):
+    _messages = ("api.Application", "api.ApplicationListItem", "api.GetApplicationResponse")
+    _fields = (
+        ("id", _REQUIRED),
+        ("name", _REQUIRED),
+        ("tenant_id", ""),
+        ("description", ""),
+    )
+    _timestamps = ("created_at", "updated_at")
+    _lazy = (("tags", None), ("measurement_keys", ()))
+    _shared = ("tenant_id",)
+
+
+class DeviceProfile(Model):
+    _messages = ("api.DeviceProfile", "api.DeviceProfileListItem", "api.GetDeviceProfileResponse")
+    _fields = (
+        ("id", _REQUIRED),
+        ("name", _REQUIRED),
+        ("tenant_id", ""),
+        ("description", ""),
+        ("region", "EU868"),
+        ("mac_version", "LORAWAN_1_0_0"),
+        ("reg_params_revision", "A"),
+        ("adr_algorithm_id", ""),
+        ("supports_otaa", False),
+        ("supports_class_b", False),
+        ("supports_class_c", False),
+    )
+    _timestamps = ("created_at", "updated_at")
+    _shared = ("tenant_id", "adr_algorithm_id")
+    _lazy = (
+        ("payload_codec_runtime", "NONE"),
+        ("payload_codec_script", ""),
+        ("flush_queue_on_activate", False),
+        ("uplink_interval", 0),
+        ("device_status_req_interval", 0),
+        ("class_b_timeout", 0),
+        ("class_b_ping_slot_nb_k", 0),
+        ("class_b_ping_slot_dr", 0),
+        ("class_b_ping_slot_freq", 0),
+        ("class_c_timeout", 0),
+        ("abp_rx1_delay", 0),
+        ("abp_rx1_dr_offset", 0),
+        ("abp_rx2_dr", 0),
+        ("abp_rx2_freq", 0),
+        ("tags", None),
+        ("measurements", None),
+        ("auto_detect_measurements", False),
+        ("region_config_id", ""),
+        ("is_relay", False),
+        ("is_relay_ed", False),
+        ("relay_ed_relay_only", False),
+        ("relay_enabled", False),
+        ("relay_cad_periodicity", "SEC_1"),
+        ("relay_default_channel_index", 0),
+        ("relay_second_channel_freq", 0),
+        ("relay_second_channel_dr", 0),
+        ("relay_second_channel_ack_offset", "KHZ_0"),
+        ("relay_ed_activation_mode", "DISABLE_RELAY_MODE"),
+        ("relay_ed_smart_enable_level", 0),
+        ("relay_ed_back_off", 0),
+        ("relay_ed_uplink_limit_bucket_size", 0),
+        ("relay_ed_uplink_limit_reload_rate", 0),
+        ("relay_join_req_limit_reload_rate", 0),
+        ("relay_notify_limit_reload_rate", 0),
+        ("relay_global_uplink_limit_reload_rate", 0),
+        ("relay_overall_limit_reload_rate", 0),
+        ("relay_join_req_limit_bucket_size", 0),
+        ("relay_notify_limit_bucket_size", 0),
+        ("relay_global_uplink_limit_bucket_size", 0),
+        ("relay_overall_limit_bucket_size", 0),
+        ("allow_roaming", False),
+        ("rx1_delay", 0),
+    )
+
+
+class Device(Model):
+    _messages = ("api.Device", "api.DeviceListItem", "api.GetDeviceResponse")
+    _fields = (
+        ("dev_eui", _REQUIRED),
+        ("name", _REQUIRED),
+        ("application_id", ""),
+        ("device_profile_id", ""),
+        ("device_profile_name", ""),
+        ("description", ""),
+        ("is_disabled", False),
+        ("join_eui", ""),
+    )
+    _timestamps = ("created_at", "updated_at", "last_seen_at")
+    _shared = ("application_id", "device_profile_id", "device_profile_name", "description", "join_eui")
+    _lazy = (
+        ("skip_fcnt_check", False),
+        ("tags", None),
+        ("variables", None),
+        ("device_status", None),
+        ("class_enabled", "CLASS_A"),
+    )
+
+
+class Gateway(Model):
+    _messages = ("api.Gateway", "api.GatewayListItem", "api.GetGatewayResponse")
+    _fields = (
+        ("gateway_id", _REQUIRED),
+        ("name", _REQUIRED),
+        ("tenant_id", ""),
+        ("description", ""),
+        ("state", "NEVER_SEEN"),
+    )
+    _timestamps = ("created_at", "updated_at", "last_seen_at")
+    _shared = ("tenant_id", "description")
+    _lazy = (
+        ("location", None),
+        ("tags", None),
+        ("metadata", None),
+        ("properties", None),
+        ("stats_interval", 0),
+    )
+
+
+class DeviceKeys(Model):
+    _messages = ("api.DeviceKeys", "api.GetDeviceKeysResponse")
+    _fields = (
+        ("dev_eui", _REQUIRED),
+        ("nwk_key", ""),
+        ("app_key", ""),
+    )
+    _timestamps = ("created_at", "updated_at")
+
+
+class MulticastGroup(Model):
+    _messages = ("api.MulticastGroup", "api.MulticastGroupListItem", "api.GetMulticastGroupResponse")
+    _fields = (
+        ("id", _REQUIRED),
+        ("name", _REQUIRED),
+        ("application_id", ""),
+        ("region", "EU868"),
+        ("group_type", "CLASS_C"),
+        ("mc_addr", ""),
+        ("f_cnt", 0),
+        ("dr", 0),
+        ("frequency", 0),
+    )
+    _timestamps = ("created_at", "updated_at")
+    _shared = ("application_id",)
+    _lazy = (
+        ("mc_nwk_s_key", ""),
+        ("mc_app_s_key", ""),
+        ("class_b_ping_slot_period", 0),
+        ("class_b_ping_slot_nb_k", 0),
+        ("class_c_scheduling_type", "DELAY"),
+    )
+
+
+class DeploymentDeviceStatus(Model):
+    _messages = ("fuota.DeploymentDeviceStatus",)
+    _fields = (("dev_eui", _REQUIRED),)
+    _timestamps = (
+        "created_at",
+        "updated_at",
+        "mc_group_setup_completed_at",
+        "mc_session_completed_at",
+        "frag_session_setup_completed_at",
+        "frag_status_completed_at",
+    )
+
+
+class DeploymentStatus(Model):
+    _messages = ("fuota.GetDeploymentStatusResponse",)
+    _timestamps = (
+        "created_at",
+        "updated_at",
+        "mc_group_setup_completed_at",
+        "mc_session_completed_at",
+        "frag_session_setup_completed_at",
+        "enqueue_completed_at",
+        "frag_status_completed_at",
+    )
+    _lazy = (("device_status", ()),)
@@ -0,0 +1,6 @@
+from .server import FakeChirpstackServer, FakeState
+
+__all__ = [
+    "FakeChirpstackServer",
+    "FakeState",
+]
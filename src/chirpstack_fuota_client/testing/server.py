@@ -0,0 +1,646 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent import futures
+
+import grpc
+from chirpstack_api import api
+from google.protobuf import empty_pb2, timestamp_pb2
+
+from ..proto.fuota import fuota_pb2, fuota_pb2_grpc
+from ..utils.interceptors import method_name
+
+# Device stages in the order they complete, with the deployment phase completing alongside each,
+# and the (f_port, request, answer) logged for the device when it does.
+DEVICE_STAGES = (
+    ("mc_group_setup_completed_at", 200, "McGroupSetupReq", "McGroupSetupAns"),
+    ("frag_session_setup_completed_at", 201, "FragSessionSetupReq", "FragSessionSetupAns"),
+    ("mc_session_completed_at", 200, "McClassCSessionReq", "McClassCSessionAns"),
+    ("frag_status_completed_at", 201, "FragSessionStatusReq", "FragSessionStatusAns"),
+)
+DEPLOYMENT_PHASES = (
+    "mc_group_setup_completed_at",
+    "frag_session_setup_completed_at",
+    "mc_session_completed_at",
+    "enqueue_completed_at",
+    "frag_status_completed_at",
+)
+
+
+def _timestamp(seconds):
+    timestamp = timestamp_pb2.Timestamp()
+    timestamp.FromNanoseconds(int(seconds * 1_000_000_000))
+    return timestamp
+
+
+class _Record:
+    __slots__ = ("obj", "created_at", "updated_at")
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.created_at = self.updated_at = time.time()
+
+    def touch(self, obj):
+        self.obj = obj
+        self.updated_at = time.time()
+
+
+class _Deployment:
+    __slots__ = ("deployment", "created_at", "started_at", "failures")
+
+    def __init__(self, deployment, started_at, failures):
+        self.deployment = deployment
+        self.created_at = time.time()
+        self.started_at = started_at
+        # dev_eui -> index of the device stage the device never completes
+        self.failures = failures
+
+
+class FakeState:
+    """In-memory objects of a FakeChirpstackServer, keyed like ChirpStack keys them.
+
+    Attributes are plain dicts of ID to stored record and may be inspected or seeded
+    directly, holding ``lock`` when the server is running.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tenants = {}
+        self.applications = {}
+        self.device_profiles = {}
+        self.gateways = {}
+        self.devices = {}
+        self.device_keys = {}
+        self.queues = {}
+        self.http_integrations = {}
+        self.deployments = {}
+
+
+def _page(records, request, name, matches=lambda record: True):
+    search = request.search.lower()
+    selected = [
+        record for record in records.values() if matches(record) and search in getattr(record.obj, name).lower()
+    ]
+    selected.sort(key=lambda record: getattr(record.obj, name))
+    limit = request.limit or len(selected)
+    return len(selected), selected[request.offset : request.offset + limit]
+
+
+class _Servicer:
+    def __init__(self, server):
+        self.server = server
+        self.state = server.state
+
+    def _get(self, records, key, context, kind):
+        record = records.get(key)
+        if record is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"{kind} {key} does not exist")
+        return record
+
+    def _create(self, records, key, obj, context):
+        if key in records:
+            context.abort(grpc.StatusCode.ALREADY_EXISTS, "Object already exists")
+        records[key] = _Record(obj)
+
+    def _update(self, records, key, obj, context, kind):
+        self._get(records, key, context, kind).touch(obj)
+        return empty_pb2.Empty()
+
+    def _delete(self, records, key, context, kind):
+        self._get(records, key, context, kind)
+        del records[key]
+        return empty_pb2.Empty()
+
+
+class _TenantServicer(_Servicer, api.TenantServiceServicer):
+    def Create(self, request, context):
+        with self.state.lock:
+            tenant = api.Tenant()
+            tenant.CopyFrom(request.tenant)
+            tenant.id = str(uuid.uuid4())
+            self._create(self.state.tenants, tenant.id, tenant, context)
+        return api.CreateTenantResponse(id=tenant.id)
+
+    def Get(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.tenants, request.id, context, "Tenant")
+            return api.GetTenantResponse(
+                tenant=record.obj, created_at=_timestamp(record.created_at), updated_at=_timestamp(record.updated_at)
+            )
+
+    def Update(self, request, context):
+        with self.state.lock:
+            return self._update(self.state.tenants, request.tenant.id, request.tenant, context, "Tenant")
+
+    def Delete(self, request, context):
+        with self.state.lock:
+            return self._delete(self.state.tenants, request.id, context, "Tenant")
+
+    def List(self, request, context):
+        with self.state.lock:
+            total, records = _page(self.state.tenants, request, "name")
+            return api.ListTenantsResponse(
+                total_count=total,
+                result=[
+                    api.TenantListItem(
+                        id=r.obj.id,
+                        name=r.obj.name,
+                        can_have_gateways=r.obj.can_have_gateways,
+                        max_gateway_count=r.obj.max_gateway_count,
+                        max_device_count=r.obj.max_device_count,
+                        created_at=_timestamp(r.created_at),
+                        updated_at=_timestamp(r.updated_at),
+                    )
+                    for r in records
+                ],
+            )
+
+
+class _ApplicationServicer(_Servicer, api.ApplicationServiceServicer):
+    def Create(self, request, context):
+        with self.state.lock:
+            application = api.Application()
+            application.CopyFrom(request.application)
+            application.id = str(uuid.uuid4())
+            self._create(self.state.applications, application.id, application, context)
+        return api.CreateApplicationResponse(id=application.id)
+
+    def Get(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.applications, request.id, context, "Application")
+            return api.GetApplicationResponse(
+                application=record.obj,
+                created_at=_timestamp(record.created_at),
+                updated_at=_timestamp(record.updated_at),
+            )
+
+    def Update(self, request, context):
+        with self.state.lock:
+            return self._update(
+                self.state.applications, request.application.id, request.application, context, "Application"
+            )
+
+    def Delete(self, request, context):
+        with self.state.lock:
+            self._delete(self.state.applications, request.id, context, "Application")
+            # Like ChirpStack, deleting an application deletes its devices.
+            for dev_eui in [key for key, r in self.state.devices.items() if r.obj.application_id == request.id]:
+                del self.state.devices[dev_eui]
+                self.state.device_keys.pop(dev_eui, None)
+                self.state.queues.pop(dev_eui, None)
+            self.state.http_integrations.pop(request.id, None)
+        return empty_pb2.Empty()
+
+    def List(self, request, context):
+        with self.state.lock:
+            total, records = _page(
+                self.state.applications, request, "name", lambda r: r.obj.tenant_id == request.tenant_id
+            )
+            return api.ListApplicationsResponse(
+                total_count=total,
+                result=[
+                    api.ApplicationListItem(
+                        id=r.obj.id,
+                        name=r.obj.name,
+                        description=r.obj.description,
+                        created_at=_timestamp(r.created_at),
+                        updated_at=_timestamp(r.updated_at),
+                    )
+                    for r in records
+                ],
+            )
+
+    def ListIntegrations(self, request, context):
+        with self.state.lock:
+            kinds = [api.IntegrationKind.HTTP] if request.application_id in self.state.http_integrations else []
+        return api.ListIntegrationsResponse(
+            total_count=len(kinds), result=[api.IntegrationListItem(kind=kind) for kind in kinds]
+        )
+
+    def CreateHttpIntegration(self, request, context):
+        with self.state.lock:
+            integration = request.integration
+            self._get(self.state.applications, integration.application_id, context, "Application")
+            self._create(self.state.http_integrations, integration.application_id, integration, context)
+        return empty_pb2.Empty()
+
+    def GetHttpIntegration(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.http_integrations, request.application_id, context, "Integration")
+            return api.GetHttpIntegrationResponse(integration=record.obj)
+
+    def UpdateHttpIntegration(self, request, context):
+        with self.state.lock:
+            integration = request.integration
+            return self._update(
+                self.state.http_integrations, integration.application_id, integration, context, "Integration"
+            )
+
+    def DeleteHttpIntegration(self, request, context):
+        with self.state.lock:
+            return self._delete(self.state.http_integrations, request.application_id, context, "Integration")
+
+
+class _DeviceProfileServicer(_Servicer, api.DeviceProfileServiceServicer):
+    def Create(self, request, context):
+        with self.state.lock:
+            device_profile = api.DeviceProfile()
+            device_profile.CopyFrom(request.device_profile)
+            device_profile.id = str(uuid.uuid4())
+            self._create(self.state.device_profiles, device_profile.id, device_profile, context)
+        return api.CreateDeviceProfileResponse(id=device_profile.id)
+
+    def Get(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.device_profiles, request.id, context, "Device profile")
+            return api.GetDeviceProfileResponse(
+                device_profile=record.obj,
+                created_at=_timestamp(record.created_at),
+                updated_at=_timestamp(record.updated_at),
+            )
+
+    def Update(self, request, context):
+        with self.state.lock:
+            return self._update(
+                self.state.device_profiles, request.device_profile.id, request.device_profile, context, "Device profile"
+            )
+
+    def Delete(self, request, context):
+        with self.state.lock:
+            return self._delete(self.state.device_profiles, request.id, context, "Device profile")
+
+    def List(self, request, context):
+        with self.state.lock:
+            total, records = _page(
+                self.state.device_profiles, request, "name", lambda r: r.obj.tenant_id == request.tenant_id
+            )
+            return api.ListDeviceProfilesResponse(
+                total_count=total,
+                result=[
+                    api.DeviceProfileListItem(
+                        id=r.obj.id,
+                        name=r.obj.name,
+                        region=r.obj.region,
+                        mac_version=r.obj.mac_version,
+                        reg_params_revision=r.obj.reg_params_revision,
+                        supports_otaa=r.obj.supports_otaa,
+                        supports_class_b=r.obj.supports_class_b,
+                        supports_class_c=r.obj.supports_class_c,
+                        created_at=_timestamp(r.created_at),
+                        updated_at=_timestamp(r.updated_at),
+                    )
+                    for r in records
+                ],
+            )
+
+
+class _GatewayServicer(_Servicer, api.GatewayServiceServicer):
+    def Create(self, request, context):
+        with self.state.lock:
+            self._create(self.state.gateways, request.gateway.gateway_id, request.gateway, context)
+        return empty_pb2.Empty()
+
+    def Get(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.gateways, request.gateway_id, context, "Gateway")
+            return api.GetGatewayResponse(
+                gateway=record.obj, created_at=_timestamp(record.created_at), updated_at=_timestamp(record.updated_at)
+            )
+
+    def Update(self, request, context):
+        with self.state.lock:
+            return self._update(self.state.gateways, request.gateway.gateway_id, request.gateway, context, "Gateway")
+
+    def Delete(self, request, context):
+        with self.state.lock:
+            return self._delete(self.state.gateways, request.gateway_id, context, "Gateway")
+
+    def List(self, request, context):
+        with self.state.lock:
+            total, records = _page(
+                self.state.gateways,
+                request,
+                "name",
+                lambda r: not request.tenant_id or r.obj.tenant_id == request.tenant_id,
+            )
+            return api.ListGatewaysResponse(
+                total_count=total,
+                result=[
+                    api.GatewayListItem(
+                        tenant_id=r.obj.tenant_id,
+                        gateway_id=r.obj.gateway_id,
+                        name=r.obj.name,
+                        description=r.obj.description,
+                        location=r.obj.location,
+                        created_at=_timestamp(r.created_at),
+                        updated_at=_timestamp(r.updated_at),
+                    )
+                    for r in records
+                ],
+            )
+
+
+class _DeviceServicer(_Servicer, api.DeviceServiceServicer):
+    def Create(self, request, context):
+        with self.state.lock:
+            self._get(self.state.applications, request.device.application_id, context, "Application")
+            self._create(self.state.devices, request.device.dev_eui, request.device, context)
+        return empty_pb2.Empty()
+
+    def Get(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.devices, request.dev_eui, context, "Device")
+            return api.GetDeviceResponse(
+                device=record.obj, created_at=_timestamp(record.created_at), updated_at=_timestamp(record.updated_at)
+            )
+
+    def Update(self, request, context):
+        with self.state.lock:
+            return self._update(self.state.devices, request.device.dev_eui, request.device, context, "Device")
+
+    def Delete(self, request, context):
+        with self.state.lock:
+            self._delete(self.state.devices, request.dev_eui, context, "Device")
+            self.state.device_keys.pop(request.dev_eui, None)
+            self.state.queues.pop(request.dev_eui, None)
+        return empty_pb2.Empty()
+
+    def List(self, request, context):
+        with self.state.lock:
+            total, records = _page(
+                self.state.devices, request, "name", lambda r: r.obj.application_id == request.application_id
+            )
+            device_profiles = self.state.device_profiles
+            return api.ListDevicesResponse(
+                total_count=total,
+                result=[
+                    api.DeviceListItem(
+                        dev_eui=r.obj.dev_eui,
+                        name=r.obj.name,
+                        description=r.obj.description,
+                        device_profile_id=r.obj.device_profile_id,
+                        device_profile_name=(
+                            device_profiles[r.obj.device_profile_id].obj.name
+                            if r.obj.device_profile_id in device_profiles
+                            else ""
+                        ),
+                        created_at=_timestamp(r.created_at),
+                        updated_at=_timestamp(r.updated_at),
+                    )
+                    for r in records
+                ],
+            )
+
+    def CreateKeys(self, request, context):
+        with self.state.lock:
+            self._get(self.state.devices, request.device_keys.dev_eui, context, "Device")
+            self._create(self.state.device_keys, request.device_keys.dev_eui, request.device_keys, context)
+        return empty_pb2.Empty()
+
+    def GetKeys(self, request, context):
+        with self.state.lock:
+            record = self._get(self.state.device_keys, request.dev_eui, context, "Device keys")
+            return api.GetDeviceKeysResponse(
+                device_keys=record.obj,
+                created_at=_timestamp(record.created_at),
+                updated_at=_timestamp(record.updated_at),
+            )
+
+    def UpdateKeys(self, request, context):
+        with self.state.lock:
+            keys = request.device_keys
+            return self._update(self.state.device_keys, keys.dev_eui, keys, context, "Device keys")
+
+    def Enqueue(self, request, context):
+        with self.state.lock:
+            self._get(self.state.devices, request.queue_item.dev_eui, context, "Device")
+            item = api.DeviceQueueItem()
+            item.CopyFrom(request.queue_item)
+            item.id = str(uuid.uuid4())
+            self.state.queues.setdefault(item.dev_eui, []).append(item)
+        return api.EnqueueDeviceQueueItemResponse(id=item.id)
+
+    def GetQueue(self, request, context):
+        with self.state.lock:
+            self._get(self.state.devices, request.dev_eui, context, "Device")
+            items = self.state.queues.get(request.dev_eui, [])
+            return api.GetDeviceQueueItemsResponse(total_count=len(items), result=items)
+
+    def FlushQueue(self, request, context):
+        with self.state.lock:
+            self._get(self.state.devices, request.dev_eui, context, "Device")
+            self.state.queues.pop(request.dev_eui, None)
+        return empty_pb2.Empty()
+
+
+class _FuotaServicer(_Servicer, fuota_pb2_grpc.FuotaServerServiceServicer):
+    def CreateDeployment(self, request, context):
+        deployment = request.deployment
+        if not deployment.devices:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Deployment has no devices")
+        failures = {}
+        for device in deployment.devices:
+            if self.server.random.random() < self.server.device_error_rate:
+                failures[device.dev_eui] = self.server.random.randrange(len(DEVICE_STAGES))
+        deployment_id = str(uuid.uuid4())
+        with self.state.lock:
+            self.state.deployments[deployment_id] = _Deployment(deployment, self.server.clock(), failures)
+        return fuota_pb2.CreateDeploymentResponse(id=deployment_id)
+
+    def _deployment(self, deployment_id, context):
+        with self.state.lock:
+            record = self.state.deployments.get(deployment_id)
+        if record is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Deployment {deployment_id} does not exist")
+        return record
+
+    def _progress(self, record):
+        # Number of deployment phases completed, and the wall time each one completed at.
+        duration = self.server.phase_duration
+        elapsed = self.server.clock() - record.started_at
+        done = len(DEPLOYMENT_PHASES) if duration <= 0 else min(len(DEPLOYMENT_PHASES), int(elapsed // duration))
+        return done, [record.created_at + (index + 1) * max(duration, 0) for index in range(done)]
+
+    def GetDeploymentStatus(self, request, context):
+        record = self._deployment(request.id, context)
+        done, completed_at = self._progress(record)
+        response = fuota_pb2.GetDeploymentStatusResponse(
+            created_at=_timestamp(record.created_at),
+            updated_at=_timestamp(completed_at[-1] if done else record.created_at),
+        )
+        for phase, at in zip(DEPLOYMENT_PHASES, completed_at):
+            getattr(response, phase).CopyFrom(_timestamp(at))
+
+        # Device stages complete with the deployment phase of the same name.
+        phase_times = dict(zip(DEPLOYMENT_PHASES, completed_at))
+        for device in record.deployment.devices:
+            status = response.device_status.add(dev_eui=device.dev_eui, created_at=_timestamp(record.created_at))
+            status.updated_at.CopyFrom(status.created_at)
+            failed_at = record.failures.get(device.dev_eui, len(DEVICE_STAGES))
+            for stage, *_ in DEVICE_STAGES[:failed_at]:
+                if stage in phase_times:
+                    getattr(status, stage).CopyFrom(_timestamp(phase_times[stage]))
+                    status.updated_at.CopyFrom(_timestamp(phase_times[stage]))
+        return response
+
+    def GetDeploymentDeviceLogs(self, request, context):
+        record = self._deployment(request.deployment_id, context)
+        if not any(device.dev_eui == request.dev_eui for device in record.deployment.devices):
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Device {request.dev_eui} is not part of the deployment")
+        done, completed_at = self._progress(record)
+        phase_times = dict(zip(DEPLOYMENT_PHASES, completed_at))
+        failed_at = record.failures.get(request.dev_eui, len(DEVICE_STAGES))
+
+        response = fuota_pb2.GetDeploymentDeviceLogsResponse()
+        for index, (stage, f_port, req, ans) in enumerate(DEVICE_STAGES):
+            if stage not in phase_times:
+                break
+            response.logs.add(created_at=_timestamp(phase_times[stage]), f_port=f_port, command=req)
+            if index < failed_at:
+                response.logs.add(created_at=_timestamp(phase_times[stage]), f_port=f_port, command=ans)
+        return response
+
+
+class _FaultInterceptor(grpc.ServerInterceptor):
+    def __init__(self, server):
+        self.server = server
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+        method = handler_call_details.method
+        metadata = dict(handler_call_details.invocation_metadata or ())
+        behavior = handler.unary_unary
+
+        def unary_unary(request, context):
+            self.server._before_call(method, metadata, context)
+            return behavior(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(
+            unary_unary,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+class FakeChirpstackServer:
+    """In-process stand-in for ChirpStack and the FUOTA server, for tests and load tests.
+
+    Serves the Tenant, Application, DeviceProfile, Gateway and Device services the client
+    uses, and FuotaServerService, from in-memory state on a single local port. Requests go
+    through real channels and serialization, with optional latency and error injection.
+
+    Deployments progress on their own: one deployment phase completes every
+    ``phase_duration`` seconds after creation, together with the matching device stage.
+
+    Args:
+        latency: Seconds every call is delayed by, or a callable taking the method path and
+            returning the delay
+        error_rate: Probability that a call fails with ``error_code`` before being handled
+        error_code: Status code of the injected errors
+        phase_duration: Seconds between deployment phases, 0 to complete deployments at once
+        device_error_rate: Probability that a device of a deployment gets stuck at a random stage
+        api_token: Token required in the authorization metadata, None to accept any
+        max_workers: Size of the server thread pool
+        seed: Seed of the random generator used for injected errors
+        clock: Monotonic time source driving deployment progression, overridable for tests
+
+    Example::
+
+        with FakeChirpstackServer(latency=0.005) as server:
+            devices = DeviceService(server.address, "token")
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        error_rate=0.0,
+        error_code=grpc.StatusCode.UNAVAILABLE,
+        phase_duration=1.0,
+        device_error_rate=0.0,
+        api_token=None,
+        max_workers=32,
+        seed=None,
+        clock=time.monotonic,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.phase_duration = phase_duration
+        self.device_error_rate = device_error_rate
+        self.api_token = api_token
+        self.max_workers = max_workers
+        self.random = random.Random(seed)  # noqa: S311 - simulated errors, not cryptography
+        self.clock = clock
+        self.state = FakeState()
+        self.calls = Counter()
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self.port = None
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.port}"
+
+    def start(self):
+        server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=self.max_workers), interceptors=[_FaultInterceptor(self)]
+        )
+        api.add_TenantServiceServicer_to_server(_TenantServicer(self), server)
+        api.add_ApplicationServiceServicer_to_server(_ApplicationServicer(self), server)
+        api.add_DeviceProfileServiceServicer_to_server(_DeviceProfileServicer(self), server)
+        api.add_GatewayServiceServicer_to_server(_GatewayServicer(self), server)
+        api.add_DeviceServiceServicer_to_server(_DeviceServicer(self), server)
+        fuota_pb2_grpc.add_FuotaServerServiceServicer_to_server(_FuotaServicer(self), server)
+        self.port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        self._server = server
+        return self
+
+    def stop(self, grace=None):
+        if self._server is not None:
+            self._server.stop(grace).wait()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def fail_next(self, method, code=grpc.StatusCode.UNAVAILABLE, count=1):
+        """Make the next ``count`` calls of ``method`` fail with ``code``.
+
+        ``method`` is a full method path ("/api.DeviceService/Get") or an RPC name ("Get"),
+        the latter matching that RPC on every service.
+        """
+        with self._lock:
+            self._failures.setdefault(method, []).extend([code] * count)
+
+    def _pop_failure(self, method):
+        with self._lock:
+            for key in (method, method_name(method)):
+                codes = self._failures.get(key)
+                if codes:
+                    return codes.pop(0)
+        return None
+
+    def _before_call(self, method, metadata, context):
+        with self._lock:
+            self.calls[method] += 1
+        if self.api_token is not None and metadata.get("authorization") != f"Bearer {self.api_token}":
+            context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid API token")
+
+        latency = self.latency(method) if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        code = self._pop_failure(method)
+        if code is None and self.error_rate and self.random.random() < self.error_rate:
+            code = self.error_code
+        if code is not None:
+            context.abort(code, "Injected error")
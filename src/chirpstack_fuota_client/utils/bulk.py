@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk operation.
+
+    ``results`` and ``errors`` hold one entry per input item, in input order. For every item
+    exactly one of the two is set, the other is None.
+    """
+
+    results: List[Any] = field(default_factory=list)
+    errors: List[Optional[Exception]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self):
+        return sum(1 for error in self.errors if error is None)
+
+    @property
+    def failed(self):
+        """List of (index, exception) pairs for the items that failed."""
+        return [(i, error) for i, error in enumerate(self.errors) if error is not None]
+
+    @property
+    def throughput(self):
+        """Processed items per second."""
+        return len(self.errors) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def raise_for_errors(self):
+        """Raise the first captured error, if any."""
+        for error in self.errors:
+            if error is not None:
+                raise error
+
+
+def imap_bounded(fn, items, concurrency=8):
+    """Apply ``fn`` to every item on a thread pool and yield results as they complete.
+
+    At most ``concurrency`` calls are in flight, and items are pulled from ``items`` lazily, so
+    arbitrarily long iterables can be processed without materializing them.
+
+    Yields:
+        (index, result, error) tuples, where error is the exception raised by ``fn`` or None
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    items = iter(enumerate(items))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+
+        def submit_next():
+            entry = next(items, None)
+            if entry is None:
+                return False
+            index, item = entry
+            pending[executor.submit(fn, item)] = index
+            return True
+
+        for _ in range(concurrency):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                error = future.exception()
+                yield index, None if error else future.result(), error
+                submit_next()
+
+
+def run_bulk(fn, items, concurrency=8):
+    """Apply ``fn`` to every item with bounded concurrency and collect a BulkResult."""
+    items = list(items)
+    bulk = BulkResult(results=[None] * len(items), errors=[None] * len(items))
+    start = time.monotonic()
+    for index, result, error in imap_bounded(fn, items, concurrency):
+        bulk.results[index] = result
+        bulk.errors[index] = error
+    bulk.elapsed = time.monotonic() - start
+    return bulk
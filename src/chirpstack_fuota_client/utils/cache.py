@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe mapping with least-recently-used eviction and an optional TTL.
+
+    Args:
+        maxsize: Max number of entries kept, None for unbounded
+        ttl: Seconds an entry stays valid after being set, None to never expire
+        on_evict: Optional callable invoked with (key, value) when an entry is dropped
+            because of the size limit or expiry
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(self, maxsize=10000, ttl=None, on_evict=None, clock=time.monotonic):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                self._evicted(key, value)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while self.maxsize is not None and len(self._data) > self.maxsize:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                self._evicted(old_key, old_value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evicted(self, key, value):
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class NameCache:
+    """In-process index from (kind, scope, name) to ChirpStack objects.
+
+    Services given a NameCache answer ``get_by_name`` from it and keep it coherent through
+    their own create, update, delete and ``iter_all`` calls, so repeated idempotent creates
+    and name lookups do not need a List round trip. Changes made by other clients are only
+    picked up once an entry expires, so pick ``ttl`` accordingly.
+
+    ``kind`` is the object type (e.g. "device"), ``scope`` the parent id the name is unique
+    in (application id for devices, tenant id for applications, None for tenants).
+    """
+
+    def __init__(self, maxsize=100000, ttl=300):
+        self._ids = {}
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl, on_evict=self._forget_id)
+
+    def _forget_id(self, key, value):
+        obj_id, _ = value
+        if self._ids.get((key[0], obj_id)) == key:
+            del self._ids[(key[0], obj_id)]
+
+    def get(self, kind, scope, name):
+        """Return the cached object or None."""
+        entry = self._cache.get((kind, scope, name))
+        return None if entry is None else entry[1]
+
+    def put(self, kind, scope, name, obj_id, obj):
+        """Cache ``obj`` under its name and remember its id for invalidation."""
+        key = (kind, scope, name)
+        with self._cache._lock:
+            self.invalidate_id(kind, obj_id)
+            # The name may be cached for another object, whose id must no longer map to it.
+            entry = self._cache._data.get(key)
+            if entry is not None:
+                self._forget_id(key, entry[0])
+            self._cache.set(key, (obj_id, obj))
+            self._ids[(kind, obj_id)] = key
+
+    def invalidate_id(self, kind, obj_id):
+        """Drop the entry of the object with the given id, if cached."""
+        with self._cache._lock:
+            key = self._ids.pop((kind, obj_id), None)
+            if key is not None:
+                self._cache.pop(key)
+
+    def clear(self):
+        with self._cache._lock:
+            self._cache.clear()
+            self._ids.clear()
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import threading
+import weakref
+
+from .helpers import create_aio_channel, create_channel
+from .logging import logger
+
+
+class _PoolEntry:
+    """The channels opened for a single (address, credentials) key."""
+
+    def __init__(self, channels):
+        self.channels = channels
+        self._next = itertools.cycle(range(len(channels)))
+        self._lock = threading.Lock()
+
+    def next_channel(self):
+        if len(self.channels) == 1:
+            return self.channels[0]
+        with self._lock:
+            return self.channels[next(self._next)]
+
+
+class ChannelPool:
+    """Registry of gRPC channels shared between service instances.
+
+    Channels are keyed by server address and channel credentials, so every service pointed at
+    the same ChirpStack or FUOTA server reuses one connection instead of opening its own.
+    With ``stripes`` greater than one, each key is backed by that many independent connections
+    and services are assigned to them round-robin.
+
+    Keepalive is off by default. Pooled channels are idle most of the time, and servers built
+    on grpc-go (such as the FUOTA server) by default reject pings more frequent than every
+    5 minutes, or any ping on an idle connection, by closing it with GOAWAY ``too_many_pings``.
+    Only enable it against servers whose keepalive enforcement policy allows it.
+    """
+
+    def __init__(
+        self,
+        keepalive_time_ms=None,
+        keepalive_timeout_ms=10000,
+        keepalive_permit_without_calls=False,
+        stripes=1,
+        options=None,
+        interceptors=None,
+        metrics=None,
+    ):
+        """Initialize the channel pool.
+
+        Args:
+            keepalive_time_ms: Interval between keepalive pings, None (the default) to disable
+                keepalive. At least 300000 against grpc-go servers with default settings
+            keepalive_timeout_ms: Time to wait for a keepalive ack before closing the connection
+            keepalive_permit_without_calls: Send keepalive pings while no RPC is in flight, which
+                grpc-go servers reject by default
+            stripes: Number of connections opened per key
+            options: Additional gRPC channel arguments applied to every channel
+            interceptors: Client interceptors installed on every channel, None for the
+                default deadline and retry chain of ``create_channel``
+            metrics: Optional RpcMetrics recording every call made through pooled channels
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+
+        self.keepalive_time_ms = keepalive_time_ms
+        self.keepalive_timeout_ms = keepalive_timeout_ms
+        self.keepalive_permit_without_calls = keepalive_permit_without_calls
+        self.stripes = stripes
+        self.options = list(options or [])
+        self.interceptors = interceptors
+        self.metrics = metrics
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def channel_options(self):
+        """Return the gRPC channel arguments used for pooled channels."""
+        options = []
+        if self.keepalive_time_ms is not None:
+            options += [
+                ("grpc.keepalive_time_ms", self.keepalive_time_ms),
+                ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+                ("grpc.keepalive_permit_without_calls", int(self.keepalive_permit_without_calls)),
+            ]
+        if self.stripes > 1:
+            # Without a local subchannel pool gRPC would collapse the stripes onto one connection.
+            options.append(("grpc.use_local_subchannel_pool", 1))
+        return options + self.options
+
+    def get(self, server_address, credentials=None):
+        """Return a shared channel for the given server, opening it on first use.
+
+        Args:
+            server_address: Server address, prefixed with https:// for TLS
+            credentials: Optional channel credentials
+
+        Returns:
+            A gRPC channel owned by the pool
+        """
+        key = (server_address, credentials)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                logger.debug(f"Opening {self.stripes} pooled channel(s) for: {server_address}")
+                entry = _PoolEntry([self._open_channel(server_address, credentials) for _ in range(self.stripes)])
+                self._entries[key] = entry
+        return entry.next_channel()
+
+    def _open_channel(self, server_address, credentials):
+        return create_channel(
+            server_address,
+            credentials=credentials,
+            options=self.channel_options(),
+            interceptors=self.interceptors,
+            metrics=self.metrics,
+        )
+
+    def _pop_entries(self, server_address):
+        with self._lock:
+            keys = [key for key in self._entries if server_address is None or key[0] == server_address]
+            return [self._entries.pop(key) for key in keys]
+
+    def close(self, server_address=None):
+        """Close pooled channels.
+
+        Args:
+            server_address: Only close channels for this address, all channels if None
+        """
+        for entry in self._pop_entries(server_address):
+            for channel in entry.channels:
+                channel.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncChannelPool(ChannelPool):
+    """Channel pool handing out ``grpc.aio`` channels for the async services.
+
+    ``grpc.aio`` channels must be opened from a running event loop and stay bound to it, so an
+    AsyncChannelPool should only be shared by coroutines running on a single loop.
+    """
+
+    def _open_channel(self, server_address, credentials):
+        return create_aio_channel(
+            server_address,
+            credentials=credentials,
+            options=self.channel_options(),
+            interceptors=self.interceptors,
+            metrics=self.metrics,
+        )
+
+    async def close(self, server_address=None):
+        """Close pooled channels.
+
+        Args:
+            server_address: Only close channels for this address, all channels if None
+        """
+        for entry in self._pop_entries(server_address):
+            await asyncio.gather(*(channel.close() for channel in entry.channels))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncChannelPool")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Return the process-wide channel pool used by services that are not given one."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ChannelPool()
+        return _default_pool
+
+
+def set_default_pool(pool):
+    """Replace the process-wide channel pool, closing the previous one."""
+    global _default_pool
+    with _default_pool_lock:
+        previous, _default_pool = _default_pool, pool
+    if previous is not None and previous is not pool:
+        previous.close()
+
+
+def get_channel(server_address, channel_pool=None):
+    """Return a pooled channel from ``channel_pool``, or from the default pool if None."""
+    pool = get_default_pool() if channel_pool is None else channel_pool
+    return pool.get(server_address)
+
+
+# Default async pools by event loop: grpc.aio channels stay bound to the loop that opened them.
+_default_async_pools = weakref.WeakKeyDictionary()
+
+
+def get_aio_channel(server_address, channel_pool=None):
+    """Return a pooled ``grpc.aio`` channel from ``channel_pool``, or from the default async pool if None.
+
+    The default async pool is per event loop, so services created without a pool must be
+    created from a coroutine, on the loop they are used from.
+    """
+    pool = channel_pool
+    if pool is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError("Async services without a channel_pool must be created from a running event loop")
+        with _default_pool_lock:
+            pool = _default_async_pools.get(loop)
+            if pool is None:
+                pool = _default_async_pools[loop] = AsyncChannelPool()
+    return pool.get(server_address)
@@ -0,0 +1,148 @@
+import concurrent.futures
+import threading
+
+import grpc
+
+from ..exceptions import ChirpstackRpcError
+
+
+def _new_future():
+    future = concurrent.futures.Future()
+    # The outcome always comes from an RPC already in flight, so the future starts running
+    # and cannot be cancelled from the caller's side.
+    future.set_running_or_notify_cancel()
+    return future
+
+
+def _resolve(future, fn, *args):
+    """Settle ``future`` with the outcome of ``fn(*args)``, following a returned future."""
+    try:
+        value = fn(*args)
+    except Exception as e:
+        future.set_exception(e)
+        return
+    if isinstance(value, concurrent.futures.Future):
+        value.add_done_callback(lambda done: _resolve(future, done.result))
+    else:
+        future.set_result(value)
+
+
+def completed(value):
+    """Return a future already resolved to ``value``, e.g. to answer from a cache."""
+    future = concurrent.futures.Future()
+    future.set_result(value)
+    return future
+
+
+def call(method, request, **kwargs):
+    """Start a unary call without blocking and return a ``concurrent.futures.Future`` of its response.
+
+    The future fails with the ``grpc.RpcError`` of the call. Unlike the ``grpc.Future`` returned
+    by ``method.future``, it composes with ``then``, ``gather`` and ``concurrent.futures.wait``.
+
+    Args:
+        method: Unary-unary multi-callable of a stub, e.g. ``stub.Get``
+        request: Request message
+        **kwargs: Call options passed to ``method.future`` (metadata, timeout, ...)
+    """
+    future = _new_future()
+    try:
+        rpc = method.future(request, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+        return future
+    rpc.add_done_callback(lambda done: _resolve(future, done.result))
+    return future
+
+
+def then(future, fn):
+    """Chain ``fn`` after ``future`` succeeds, returning the future of its result.
+
+    ``fn`` receives the result of ``future`` and may return a value or another future, which is
+    followed. A failure of ``future`` or ``fn`` fails the returned future. ``fn`` runs on the
+    thread completing ``future`` (a gRPC thread for RPC futures), so it must not block; start
+    further calls with ``call`` instead of calling blocking methods.
+    """
+    result = _new_future()
+    future.add_done_callback(lambda done: _resolve(result, lambda: fn(done.result())))
+    return result
+
+
+def recover(future, fn, exception_types=Exception):
+    """Chain ``fn`` after ``future`` fails with one of ``exception_types``.
+
+    ``fn`` receives the exception and may return a fallback value or future, or raise. The
+    result of a successful ``future`` and other exceptions pass through unchanged.
+    """
+    result = _new_future()
+
+    def on_done(done):
+        try:
+            value = done.result()
+        except exception_types as e:
+            _resolve(result, fn, e)
+        except Exception as e:
+            result.set_exception(e)
+        else:
+            result.set_result(value)
+
+    future.add_done_callback(on_done)
+    return result
+
+
+def wrap_errors(future, message):
+    """Turn a ``grpc.RpcError`` failure of ``future`` into a ChirpstackRpcError, as the blocking methods do."""
+
+    def reraise(e):
+        raise ChirpstackRpcError(f"{message}: {str(e)}", e)
+
+    return recover(future, reraise, grpc.RpcError)
+
+
+def gather(futures, return_exceptions=False):
+    """Return a future of the results of ``futures``, in input order.
+
+    Args:
+        futures: Iterable of futures
+        return_exceptions: Store the exception of a failed future in its slot instead of failing
+            the returned future as soon as any future fails
+    """
+    futures = list(futures)
+    result = _new_future()
+    if not futures:
+        result.set_result([])
+        return result
+
+    values = [None] * len(futures)
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(index, done):
+        try:
+            values[index] = done.result()
+        except Exception as e:
+            if not return_exceptions:
+                with lock:
+                    if not result.done():
+                        result.set_exception(e)
+                return
+            values[index] = e
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0 and not result.done():
+                result.set_result(values)
+
+    for index, future in enumerate(futures):
+        future.add_done_callback(lambda done, index=index: on_done(index, done))
+    return result
+
+
+def as_completed(futures, timeout=None):
+    """Iterate over ``futures`` as they complete, blocking the caller between them.
+
+    Same as ``concurrent.futures.as_completed``, exported here to keep the combinators together.
+
+    Raises:
+        TimeoutError: If not all futures completed within ``timeout`` seconds
+    """
+    return concurrent.futures.as_completed(futures, timeout)
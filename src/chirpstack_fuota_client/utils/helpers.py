@@ -1,6 +1,10 @@
 import grpc
+from grpc import aio
 
+from ..utils import futures
+from ..utils.interceptors import default_aio_interceptors, default_interceptors
 from ..utils.logging import logger
+from ..utils.metrics import AsyncMetricsInterceptor, MetricsInterceptor
 
 
 def auth_header(api_token):
@@ -8,13 +12,134 @@ def auth_header(api_token):
     return [("authorization", f"Bearer {api_token}")]
 
 
-def create_channel(server_address):
-    """Create gRPC channel with TLS support for https URLs."""
+def is_conflict(rpc_error):
+    """Default conflict detection of optimistic creates: the server answered ALREADY_EXISTS."""
+    code = getattr(rpc_error, "code", None)
+    return callable(code) and code() == grpc.StatusCode.ALREADY_EXISTS
+
+
+def create_or_get(create, lookup, optimistic=False, conflict=is_conflict):
+    """Create an object unless one with the same name exists, returning the existing one.
+
+    By default the name is looked up first, which costs a List round trip on every
+    creation. Optimistic mode calls ``create`` straight away and only looks the name up
+    when the server reports a conflict, so creating a new object takes a single round trip.
+
+    Args:
+        create: Callable issuing the Create RPC(s) and returning the response
+        lookup: Callable returning the existing object with the same name, or None
+        optimistic: Create first and only look up the existing object on conflict
+        conflict: Callable telling whether a grpc.RpcError raised by ``create`` is a conflict
+
+    Raises:
+        grpc.RpcError: If ``create`` fails for another reason than a conflict, or on a
+            conflict with an object of another name (e.g. a dev_eui already in use)
+    """
+    if not optimistic:
+        return lookup() or create()
+    try:
+        return create()
+    except grpc.RpcError as e:
+        if not conflict(e):
+            raise
+        existing = lookup()
+        if not existing:
+            raise
+        return existing
+
+
+async def acreate_or_get(create, lookup, optimistic=False, conflict=is_conflict):
+    """Coroutine version of ``create_or_get``, ``create`` and ``lookup`` returning awaitables."""
+    if not optimistic:
+        return await lookup() or await create()
+    try:
+        return await create()
+    except grpc.RpcError as e:
+        if not conflict(e):
+            raise
+        existing = await lookup()
+        if not existing:
+            raise
+        return existing
+
+
+def create_channel(server_address, credentials=None, options=None, interceptors=None, metrics=None):
+    """Create gRPC channel with TLS support for https URLs.
+
+    Args:
+        server_address: Server address, prefixed with https:// for TLS
+        credentials: Optional channel credentials, forces a secure channel
+        options: Optional list of gRPC channel arguments
+        interceptors: Client interceptors to install, the first one being the outermost.
+            None installs the default deadline and retry chain, an empty list installs nothing.
+        metrics: Optional RpcMetrics recording every call made through the channel
+    """
     if server_address.startswith("https://"):
         server_address = server_address.replace("https://", "")
+        credentials = credentials or grpc.ssl_channel_credentials()
+
+    if credentials is not None:
         logger.debug(f"Creating secure channel for: {server_address}")
-        credentials = grpc.ssl_channel_credentials()
-        return grpc.secure_channel(server_address, credentials)
+        channel = grpc.secure_channel(server_address, credentials, options=options)
     else:
         logger.debug(f"Creating insecure channel for: {server_address}")
-        return grpc.insecure_channel(server_address)
+        channel = grpc.insecure_channel(server_address, options=options)
+
+    if interceptors is None:
+        interceptors = default_interceptors()
+    if metrics is not None:
+        interceptors = [MetricsInterceptor(metrics), *interceptors]
+    if interceptors:
+        channel = grpc.intercept_channel(channel, *interceptors)
+    return channel
+
+
+def create_aio_channel(server_address, credentials=None, options=None, interceptors=None, metrics=None):
+    """Create ``grpc.aio`` channel with TLS support for https URLs.
+
+    Args:
+        server_address: Server address, prefixed with https:// for TLS
+        credentials: Optional channel credentials, forces a secure channel
+        options: Optional list of gRPC channel arguments
+        interceptors: ``grpc.aio`` client interceptors to install, the first one being the outermost.
+            None installs the default deadline and retry chain, an empty list installs nothing.
+        metrics: Optional RpcMetrics recording every call made through the channel
+    """
+    if server_address.startswith("https://"):
+        server_address = server_address.replace("https://", "")
+        credentials = credentials or grpc.ssl_channel_credentials()
+
+    if interceptors is None:
+        interceptors = default_aio_interceptors()
+    if metrics is not None:
+        interceptors = [AsyncMetricsInterceptor(metrics), *interceptors]
+
+    if credentials is not None:
+        logger.debug(f"Creating secure aio channel for: {server_address}")
+        return aio.secure_channel(server_address, credentials, options=options, interceptors=interceptors or None)
+    else:
+        logger.debug(f"Creating insecure aio channel for: {server_address}")
+        return aio.insecure_channel(server_address, options=options, interceptors=interceptors or None)
+
+
+def create_or_get_future(create, lookup, optimistic=False, conflict=is_conflict):
+    """Non-blocking version of ``create_or_get``, ``create`` and ``lookup`` returning futures.
+
+    Returns:
+        concurrent.futures.Future of the created or existing object
+    """
+    if not optimistic:
+        return futures.then(lookup(), lambda existing: existing or create())
+
+    def on_error(e):
+        if not conflict(e):
+            raise e
+
+        def existing_or_raise(existing):
+            if not existing:
+                raise e
+            return existing
+
+        return futures.then(lookup(), existing_or_raise)
+
+    return futures.recover(create(), on_error, grpc.RpcError)
@@ -0,0 +1,428 @@
+import asyncio
+import collections
+import random
+import threading
+import time
+
+import grpc
+from grpc import aio
+
+from .logging import logger
+
+DEFAULT_TIMEOUT = 30.0
+
+# Per-method default deadlines in seconds, keyed by RPC name (the last segment of the method path).
+DEFAULT_METHOD_TIMEOUTS = {
+    "List": 60.0,
+    "CreateDeployment": 120.0,
+    "GetDeploymentStatus": 60.0,
+}
+
+# Read-only RPCs that are safe to retry without side effects.
+SAFE_METHODS = frozenset({
+    "Get",
+    "List",
+    "GetKeys",
+    "GetQueue",
+    "GetHttpIntegration",
+    "ListIntegrations",
+    "GetDeploymentStatus",
+    "GetDeploymentDeviceLogs",
+})
+
+RETRYABLE_CODES = frozenset({grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED})
+
+
+def method_name(method):
+    """Return the RPC name of a full method path, e.g. "Get" for "/api.DeviceService/Get"."""
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit("/", 1)[-1]
+
+
+class _ClientCallDetails(
+    collections.namedtuple(
+        "_ClientCallDetails", ("method", "timeout", "metadata", "credentials", "wait_for_ready", "compression")
+    ),
+    grpc.ClientCallDetails,
+):
+    pass
+
+
+def _with_timeout(client_call_details, timeout):
+    return _ClientCallDetails(
+        client_call_details.method,
+        timeout,
+        client_call_details.metadata,
+        client_call_details.credentials,
+        getattr(client_call_details, "wait_for_ready", None),
+        getattr(client_call_details, "compression", None),
+    )
+
+
+class RetryPolicy:
+    """Which calls are retried and how long to back off between attempts.
+
+    Backoff is exponential with full jitter: before attempt ``n`` (counting from 1 for the
+    first retry) the interceptor sleeps a random time in
+    ``[0, min(max_backoff, initial_backoff * multiplier ** (n - 1))]``.
+
+    Args:
+        max_attempts: Max number of attempts including the first one
+        initial_backoff: Backoff ceiling in seconds before the first retry
+        max_backoff: Upper bound of the backoff ceiling in seconds
+        multiplier: Growth factor of the backoff ceiling per retry
+        retryable_codes: Status codes that trigger a retry
+        retryable_methods: RPC names that may be retried, None to retry every method
+    """
+
+    def __init__(
+        self,
+        max_attempts=4,
+        initial_backoff=0.1,
+        max_backoff=5.0,
+        multiplier=2.0,
+        retryable_codes=RETRYABLE_CODES,
+        retryable_methods=SAFE_METHODS,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.retryable_codes = frozenset(retryable_codes)
+        self.retryable_methods = None if retryable_methods is None else frozenset(retryable_methods)
+
+    def is_retryable_method(self, method):
+        return self.max_attempts > 1 and (
+            self.retryable_methods is None or method_name(method) in self.retryable_methods
+        )
+
+    def backoff(self, retry):
+        ceiling = min(self.max_backoff, self.initial_backoff * self.multiplier ** (retry - 1))
+        return random.uniform(0, ceiling)  # noqa: S311
+
+
+class RetryBudget:
+    """Token bucket capping retries to a fraction of the traffic.
+
+    Every failed attempt with a retryable code costs one token and every successful call
+    refunds ``token_ratio`` tokens. Retries are only allowed while more than half of
+    ``max_tokens`` is left, so a server that keeps failing is not hit by a retry storm.
+    """
+
+    def __init__(self, max_tokens=100, token_ratio=0.1):
+        self.max_tokens = float(max_tokens)
+        self.token_ratio = token_ratio
+        self.tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def on_success(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def on_failure(self):
+        with self._lock:
+            self.tokens = max(0.0, self.tokens - 1)
+
+    def allow_retry(self):
+        with self._lock:
+            return self.tokens > self.max_tokens / 2
+
+
+class DeadlineInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """Apply a default deadline to calls made without an explicit timeout.
+
+    Args:
+        default_timeout: Deadline in seconds for methods not listed in ``method_timeouts``,
+            None to leave them without deadline
+        method_timeouts: Dict of RPC name to deadline in seconds
+    """
+
+    def __init__(self, default_timeout=DEFAULT_TIMEOUT, method_timeouts=None):
+        self.default_timeout = default_timeout
+        self.method_timeouts = dict(DEFAULT_METHOD_TIMEOUTS if method_timeouts is None else method_timeouts)
+
+    def timeout_for(self, method):
+        return self.method_timeouts.get(method_name(method), self.default_timeout)
+
+    def _details(self, client_call_details):
+        if client_call_details.timeout is not None:
+            return client_call_details
+        timeout = self.timeout_for(client_call_details.method)
+        if timeout is None:
+            return client_call_details
+        return _with_timeout(client_call_details, timeout)
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return continuation(self._details(client_call_details), request)
+
+
+class RetryInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """Retry failed calls of safe methods with jittered exponential backoff.
+
+    When the call has a deadline, it is shared by all attempts: each retry only gets the time
+    left, and no retry is started if the backoff would outlast the deadline.
+
+    Calls made through a gRPC channel are followed from the done callbacks of their attempts,
+    the next attempt being started from a timer once the backoff elapsed. Blocking calls then
+    wait on the returned future, while ``.future()`` calls return right away, whether or not
+    their first attempt already completed.
+
+    Args:
+        policy: RetryPolicy, defaults to retrying SAFE_METHODS on UNAVAILABLE and RESOURCE_EXHAUSTED
+        budget: Optional RetryBudget shared by every call through this interceptor
+        sleep: Sleep function between attempts of continuations returning plain grpc.Call
+            outcomes rather than futures, overridable for tests
+    """
+
+    def __init__(self, policy=None, budget=None, sleep=time.sleep):
+        self.policy = RetryPolicy() if policy is None else policy
+        self.budget = budget
+        self.sleep = sleep
+
+    def _should_retry(self, code, attempt, deadline):
+        """Return the backoff before the next attempt, or None to give up."""
+        if code == grpc.StatusCode.OK:
+            if self.budget is not None:
+                self.budget.on_success()
+            return None
+        if code not in self.policy.retryable_codes:
+            return None
+        if self.budget is not None:
+            self.budget.on_failure()
+        if attempt >= self.policy.max_attempts:
+            return None
+        if self.budget is not None and not self.budget.allow_retry():
+            logger.debug("Retry budget exhausted, not retrying")
+            return None
+        delay = self.policy.backoff(attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        if not self.policy.is_retryable_method(client_call_details.method):
+            return continuation(client_call_details, request)
+
+        timeout = client_call_details.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        attempt = 1
+        while True:
+            outcome = continuation(client_call_details, request)
+            if isinstance(outcome, grpc.Future):
+                # Blocking and ``.future()`` calls alike: the interceptor contract only requires
+                # returning a Call that is also a Future, which blocking calls wait on.
+                return _RetryingCall(self, continuation, client_call_details, request, deadline, attempt, outcome)
+            delay = self._should_retry(outcome.code(), attempt, deadline)
+            if delay is None:
+                return outcome
+            logger.debug(
+                f"Retrying {client_call_details.method} after {outcome.code()} "
+                f"(attempt {attempt + 1}, backoff {delay:.3f}s)"
+            )
+            self.sleep(delay)
+            attempt += 1
+            if deadline is not None:
+                client_call_details = _with_timeout(client_call_details, max(0.0, deadline - time.monotonic()))
+
+
+class _RetryingCall(grpc.Call, grpc.Future):
+    """Future of a call made through RetryInterceptor with ``.future()``.
+
+    Every attempt reports to ``_on_attempt_done`` from its done callback, which either
+    completes this future with the attempt outcome or starts the next attempt from a timer
+    once the backoff elapsed, so no thread blocks while the call is retried.
+    """
+
+    def __init__(self, interceptor, continuation, client_call_details, request, deadline, attempt, call):
+        self._interceptor = interceptor
+        self._continuation = continuation
+        self._details = client_call_details
+        self._request = request
+        self._deadline = deadline
+        self._attempt = attempt
+        self._call = call
+        self._timer = None
+        self._finished = False
+        self._cancelled = False
+        self._callbacks = []
+        self._condition = threading.Condition()
+        call.add_done_callback(self._on_attempt_done)
+
+    def _on_attempt_done(self, call):
+        with self._condition:
+            if self._finished:
+                return
+            if self._cancelled:
+                delay = None
+            else:
+                delay = self._interceptor._should_retry(call.code(), self._attempt, self._deadline)
+            if delay is not None:
+                logger.debug(
+                    f"Retrying {self._details.method} after {call.code()} "
+                    f"(attempt {self._attempt + 1}, backoff {delay:.3f}s)"
+                )
+                self._attempt += 1
+                self._timer = threading.Timer(delay, self._retry)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self._finish()
+
+    def _retry(self):
+        details = self._details
+        if self._deadline is not None:
+            details = _with_timeout(details, max(0.0, self._deadline - time.monotonic()))
+        with self._condition:
+            if self._finished or self._cancelled:
+                return
+            try:
+                call = self._continuation(details, self._request)
+            except Exception:
+                # Complete with the outcome of the last attempt.
+                logger.exception(f"Failed to retry {self._details.method}")
+                call = None
+            else:
+                self._call = call
+        if call is None:
+            self._finish()
+        else:
+            call.add_done_callback(self._on_attempt_done)
+
+    def _finish(self):
+        with self._condition:
+            if self._finished:
+                return
+            self._finished = True
+            self._condition.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Exception in the callback of a retrying call")
+
+    def _wait(self, timeout):
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._finished, timeout):
+                raise grpc.FutureTimeoutError()
+
+    def _outcome(self, timeout):
+        self._wait(timeout)
+        if self._cancelled:
+            raise grpc.FutureCancelledError()
+        return self._call
+
+    def cancel(self):
+        with self._condition:
+            if self._finished:
+                return False
+            self._cancelled = True
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+        # A call still in flight completes as cancelled and finishes this future from its callback.
+        if not self._call.cancel():
+            self._finish()
+        return True
+
+    def cancelled(self):
+        return self._cancelled
+
+    def running(self):
+        return not self._finished
+
+    def done(self):
+        return self._finished
+
+    def result(self, timeout=None):
+        return self._outcome(timeout).result()
+
+    def exception(self, timeout=None):
+        return self._outcome(timeout).exception()
+
+    def traceback(self, timeout=None):
+        return self._outcome(timeout).traceback()
+
+    def add_done_callback(self, fn):
+        self._add_callback(lambda: fn(self))
+
+    def add_callback(self, callback):
+        self._add_callback(callback)
+        return True
+
+    def _add_callback(self, callback):
+        with self._condition:
+            if not self._finished:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def is_active(self):
+        return not self._finished
+
+    def time_remaining(self):
+        return None if self._deadline is None else max(0.0, self._deadline - time.monotonic())
+
+    def initial_metadata(self):
+        self._wait(None)
+        return self._call.initial_metadata()
+
+    def trailing_metadata(self):
+        self._wait(None)
+        return self._call.trailing_metadata()
+
+    def code(self):
+        self._wait(None)
+        return grpc.StatusCode.CANCELLED if self._cancelled else self._call.code()
+
+    def details(self):
+        self._wait(None)
+        return "Locally cancelled" if self._cancelled else self._call.details()
+
+
+class AsyncDeadlineInterceptor(DeadlineInterceptor, aio.UnaryUnaryClientInterceptor):
+    """``grpc.aio`` counterpart of DeadlineInterceptor."""
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await continuation(self._details(client_call_details), request)
+
+
+class AsyncRetryInterceptor(RetryInterceptor, aio.UnaryUnaryClientInterceptor):
+    """``grpc.aio`` counterpart of RetryInterceptor, backing off with ``asyncio.sleep``."""
+
+    def __init__(self, policy=None, budget=None, sleep=asyncio.sleep):
+        super().__init__(policy=policy, budget=budget, sleep=sleep)
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        if not self.policy.is_retryable_method(client_call_details.method):
+            return await continuation(client_call_details, request)
+
+        timeout = client_call_details.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        attempt = 1
+        while True:
+            call = await continuation(client_call_details, request)
+            code = await call.code()
+            delay = self._should_retry(code, attempt, deadline)
+            if delay is None:
+                return call
+            logger.debug(
+                f"Retrying {client_call_details.method} after {code} (attempt {attempt + 1}, backoff {delay:.3f}s)"
+            )
+            await self.sleep(delay)
+            attempt += 1
+            if deadline is not None:
+                client_call_details = client_call_details._replace(timeout=max(0.0, deadline - time.monotonic()))
+
+
+def default_interceptors():
+    """Interceptor chain installed by ``create_channel`` when none is given."""
+    return [DeadlineInterceptor(), RetryInterceptor(budget=RetryBudget())]
+
+
+def default_aio_interceptors():
+    """Interceptor chain installed by ``create_aio_channel`` when none is given."""
+    return [AsyncDeadlineInterceptor(), AsyncRetryInterceptor(budget=RetryBudget())]
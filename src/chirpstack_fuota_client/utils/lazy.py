@@ -0,0 +1,29 @@
+import importlib
+
+
+def lazy_exports(package, exports):
+    """Build the module ``__getattr__`` and ``__dir__`` of a package exporting names lazily.
+
+    Submodules are only imported when one of their names is first accessed, then the
+    name is stored in the package namespace so later lookups skip ``__getattr__``.
+
+    Args:
+        package: ``__name__`` of the package
+        exports: Dict of exported name to the relative module defining it. A name mapped
+            to its own module path (e.g. ``"models": ".models"``) exports the submodule itself
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(module_name, package)
+        value = module if module_name.rsplit(".", 1)[-1] == name else getattr(module, name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -3,6 +3,8 @@ import sys
 
 LOG_FORMAT = "CHIRPSTACK-FUOTA-CLIENT - %(levelname)s: \t%(message)s"
 
+_configured_logger = None
+
 
 def setup_logging(level=logging.CRITICAL, **kwargs):
     """Configure logging for the chirpstack client.
@@ -10,6 +12,7 @@ def setup_logging(level=logging.CRITICAL, **kwargs):
     Args:
         level: Logging level (default: DEBUG)
     """
+    global _configured_logger
     custom_logger = logging.getLogger("chirpstack_fuota_client")
     custom_logger.setLevel(level)
     
@@ -32,7 +35,20 @@ def setup_logging(level=logging.CRITICAL, **kwargs):
 
     custom_logger.info("Logging initialized with level %s", logging.getLevelName(level))
 
+    _configured_logger = custom_logger
     return custom_logger
 
-# Create default logger instance
-logger = setup_logging()
+
+class _DeferredLogger:
+    """Package logger configured with the default setup_logging() on first use.
+
+    Configuring at import time cost every import, even when nothing is ever logged.
+    An explicit setup_logging() call before the first use takes precedence.
+    """
+
+    def __getattr__(self, name):
+        return getattr(_configured_logger or setup_logging(), name)
+
+
+# Default logger instance
+logger = _DeferredLogger()
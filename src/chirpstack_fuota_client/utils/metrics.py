@@ -0,0 +1,208 @@
+import asyncio
+import bisect
+import threading
+import time
+
+import grpc
+from grpc import aio
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _MethodStats:
+    __slots__ = ("calls", "errors", "in_flight", "request_bytes", "response_bytes", "bucket_counts", "latency_sum")
+
+    def __init__(self, bucket_count):
+        self.calls = 0
+        self.errors = {}
+        self.in_flight = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+
+
+class RpcMetrics:
+    """Per-method call statistics collected by the metrics interceptors.
+
+    For every gRPC method it keeps the number of completed calls, errors by status code,
+    calls in flight, request/response payload bytes and a latency histogram. Pass an
+    instance as ``metrics`` to ``create_channel`` or a ChannelPool to collect them; channels
+    created without one carry no instrumentation at all.
+
+    Args:
+        buckets: Upper bounds in seconds of the latency histogram buckets
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _method_stats(self, method):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = _MethodStats(len(self.buckets))
+        return stats
+
+    def start(self, method, request):
+        """Record the start of a call and return the token to pass to ``finish``."""
+        if isinstance(method, bytes):
+            method = method.decode()
+        size = request.ByteSize() if hasattr(request, "ByteSize") else 0
+        with self._lock:
+            stats = self._method_stats(method)
+            stats.in_flight += 1
+            stats.request_bytes += size
+        return method, time.perf_counter()
+
+    def finish(self, token, code, response=None):
+        """Record the end of a call started with ``start``."""
+        method, started_at = token
+        latency = time.perf_counter() - started_at
+        size = response.ByteSize() if response is not None and hasattr(response, "ByteSize") else 0
+        with self._lock:
+            # The call may have started before a reset() that dropped its statistics.
+            stats = self._method_stats(method)
+            if stats.in_flight:
+                stats.in_flight -= 1
+            stats.calls += 1
+            stats.response_bytes += size
+            stats.latency_sum += latency
+            stats.bucket_counts[bisect.bisect_left(self.buckets, latency)] += 1
+            if code != grpc.StatusCode.OK:
+                name = code.name if code is not None else "UNKNOWN"
+                stats.errors[name] = stats.errors.get(name, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """Return the current statistics as a plain dict keyed by method path."""
+        with self._lock:
+            return {
+                method: {
+                    "calls": stats.calls,
+                    "errors": dict(stats.errors),
+                    "in_flight": stats.in_flight,
+                    "request_bytes": stats.request_bytes,
+                    "response_bytes": stats.response_bytes,
+                    "latency_sum": stats.latency_sum,
+                    "latency_buckets": dict(zip((*self.buckets, float("inf")), stats.bucket_counts)),
+                }
+                for method, stats in self._stats.items()
+            }
+
+    def to_prometheus(self, prefix="chirpstack_client_rpc"):
+        """Render the statistics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(samples)
+
+        def labels(method, **extra):
+            pairs = [("method", method), *extra.items()]
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+        family(
+            "calls_total",
+            "counter",
+            "Completed RPCs.",
+            [f"{prefix}_calls_total{labels(m)} {s['calls']}" for m, s in snapshot.items()],
+        )
+        family(
+            "errors_total",
+            "counter",
+            "Failed RPCs by status code.",
+            [
+                f"{prefix}_errors_total{labels(m, code=code)} {count}"
+                for m, s in snapshot.items()
+                for code, count in sorted(s["errors"].items())
+            ],
+        )
+        family(
+            "in_flight",
+            "gauge",
+            "RPCs currently in flight.",
+            [f"{prefix}_in_flight{labels(m)} {s['in_flight']}" for m, s in snapshot.items()],
+        )
+        family(
+            "request_bytes_total",
+            "counter",
+            "Serialized request payload bytes.",
+            [f"{prefix}_request_bytes_total{labels(m)} {s['request_bytes']}" for m, s in snapshot.items()],
+        )
+        family(
+            "response_bytes_total",
+            "counter",
+            "Serialized response payload bytes.",
+            [f"{prefix}_response_bytes_total{labels(m)} {s['response_bytes']}" for m, s in snapshot.items()],
+        )
+
+        histogram = []
+        for m, s in snapshot.items():
+            cumulative = 0
+            for bound, count in s["latency_buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                histogram.append(f"{prefix}_latency_seconds_bucket{labels(m, le=le)} {cumulative}")
+            histogram.append(f"{prefix}_latency_seconds_sum{labels(m)} {s['latency_sum']}")
+            histogram.append(f"{prefix}_latency_seconds_count{labels(m)} {s['calls']}")
+        family("latency_seconds", "histogram", "RPC latency in seconds.", histogram)
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """Record every unary call made through a channel in an RpcMetrics instance."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        token = self.metrics.start(client_call_details.method, request)
+        try:
+            outcome = continuation(client_call_details, request)
+        except Exception:
+            self.metrics.finish(token, grpc.StatusCode.UNKNOWN)
+            raise
+
+        def done(call):
+            code = call.code()
+            self.metrics.finish(token, code, call.result() if code == grpc.StatusCode.OK else None)
+
+        # Completed outcomes run the callback right away, futures once they resolve.
+        outcome.add_done_callback(done)
+        return outcome
+
+
+class AsyncMetricsInterceptor(aio.UnaryUnaryClientInterceptor):
+    """``grpc.aio`` counterpart of MetricsInterceptor."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        token = self.metrics.start(client_call_details.method, request)
+        call = None
+        try:
+            call = await continuation(client_call_details, request)
+            response = await call
+        except aio.AioRpcError as e:
+            self.metrics.finish(token, e.code())
+            if call is None:
+                raise
+            # The returned call raises the same error when the caller awaits it.
+            return call
+        except asyncio.CancelledError:
+            self.metrics.finish(token, grpc.StatusCode.CANCELLED)
+            raise
+        except Exception:
+            self.metrics.finish(token, grpc.StatusCode.UNKNOWN)
+            raise
+        self.metrics.finish(token, grpc.StatusCode.OK, response)
+        return call
@@ -0,0 +1,16 @@
+import importlib
+
+
+def require(module, extra):
+    """Import an optional dependency, raising an ImportError with an install hint if it is missing.
+
+    Args:
+        module: Name of the module to import
+        extra: Name of the package extra providing it
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"{module} is required for this feature, install it with: pip install 'chirpstack_fuota_client[{extra}]'"
+        ) from e
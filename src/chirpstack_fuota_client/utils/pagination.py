@@ -0,0 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _is_last_page(page, offset, page_size):
+    return len(page.result) < page_size or offset >= page.total_count
+
+
+def iter_pages(fetch_page, page_size=100, prefetch=True):
+    """Yield list responses page by page.
+
+    While the caller consumes a page, the next one is already being fetched on a
+    background thread when ``prefetch`` is enabled.
+
+    Args:
+        fetch_page: Callable taking (limit, offset) and returning a List*Response
+        page_size: Number of items requested per page
+        prefetch: Fetch page N+1 in the background while page N is consumed
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = fetch_page(page_size, 0)
+        offset = 0
+        while True:
+            offset += len(page.result)
+            last = _is_last_page(page, offset, page_size)
+            next_page = None
+            if not last and executor is not None:
+                next_page = executor.submit(fetch_page, page_size, offset)
+            yield page
+            if last:
+                return
+            page = next_page.result() if next_page is not None else fetch_page(page_size, offset)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def iter_items(fetch_page, page_size=100, prefetch=True):
+    """Yield the items of every page returned by ``fetch_page``, see ``iter_pages``."""
+    for page in iter_pages(fetch_page, page_size, prefetch):
+        yield from page.result
+
+
+async def aiter_items(fetch_page, page_size=100, prefetch=True):
+    """Async counterpart of ``iter_items`` for coroutine ``fetch_page`` callables.
+
+    With ``prefetch`` the next page is requested as a task while the current one is consumed.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+
+    page = await fetch_page(page_size, 0)
+    offset = 0
+    next_page = None
+    try:
+        while True:
+            offset += len(page.result)
+            last = _is_last_page(page, offset, page_size)
+            if not last and prefetch:
+                next_page = asyncio.ensure_future(fetch_page(page_size, offset))
+            for item in page.result:
+                yield item
+            if last:
+                return
+            if next_page is not None:
+                page, next_page = await next_page, None
+            else:
+                page = await fetch_page(page_size, offset)
+    finally:
+        if next_page is not None:
+            next_page.cancel()
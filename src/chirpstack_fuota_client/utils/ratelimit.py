@@ -0,0 +1,83 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket letting through ``rate`` operations per second on average.
+
+    Up to ``burst`` operations go through at once after an idle period. ``acquire`` reserves its
+    tokens under a lock and then sleeps outside of it, so concurrent callers are served in
+    arrival order without holding each other up while waiting.
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity, defaults to ``rate`` (at least 1)
+        clock: Monotonic clock function, overridable for tests
+        sleep: Sleep function, overridable for tests
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(max(1.0, self.rate) if burst is None else burst)
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take ``tokens`` and return the seconds to wait before using them, 0 if available now."""
+        if tokens > self.burst:
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket of {self.burst:g}")
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available and take them, returning the seconds waited."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+class KeyedRateLimiter:
+    """One TokenBucket per key, e.g. per application or gateway ID, created on first use.
+
+    Args:
+        rate: Operations per second allowed for each key
+        burst: Burst allowed for each key, defaults to ``rate``
+        clock: Monotonic clock function, overridable for tests
+        sleep: Sleep function, overridable for tests
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        # Validate the arguments now rather than on the first acquire.
+        TokenBucket(rate, burst, clock, sleep)
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, self.clock, self.sleep)
+            return bucket
+
+    def acquire(self, key, tokens=1):
+        """Block until ``tokens`` are available for ``key`` and take them, returning the seconds waited."""
+        return self.bucket(key).acquire(tokens)
+
+    def __len__(self):
+        return len(self._buckets)
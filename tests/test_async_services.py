@@ -0,0 +1,153 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import grpc
+import pytest
+from chirpstack_api import api
+
+from chirpstack_fuota_client import AsyncChannelPool, AsyncDeviceService, AsyncFuotaService, AsyncTenantService
+from chirpstack_fuota_client.proto.fuota import fuota_pb2
+from chirpstack_fuota_client.testing import FakeChirpstackServer
+
+
+def run_with_service(service_cls, scenario):
+    """Build the service inside an event loop, as grpc.aio channels require, and run the scenario."""
+
+    async def main():
+        async with AsyncChannelPool() as pool:
+            service = service_cls("localhost:50051", "token", channel_pool=pool)
+            service.stub = MagicMock()
+            return await scenario(service)
+
+    return asyncio.run(main())
+
+
+def test_async_services_share_pooled_channel():
+    async def main():
+        async with AsyncChannelPool() as pool:
+            device_service = AsyncDeviceService("localhost:50051", "token", channel_pool=pool)
+            fuota_service = AsyncFuotaService("localhost:50051", "token", channel_pool=pool)
+            assert device_service.channel is fuota_service.channel
+            assert len(pool) == 1
+        assert len(pool) == 0
+
+    asyncio.run(main())
+
+
+def test_async_create_deployment():
+    async def scenario(service):
+        service.stub.CreateDeployment = AsyncMock(return_value=fuota_pb2.CreateDeploymentResponse(id="deployment_id"))
+        response = await service.create_deployment(
+            application_id="app_id",
+            devices=[],
+            multicast_group_type="CLASS_C",
+            multicast_dr=5,
+            multicast_frequency=868100000,
+        )
+        assert response.id == "deployment_id"
+        request = service.stub.CreateDeployment.call_args.args[0]
+        assert request.deployment.multicast_group_type == fuota_pb2.MulticastGroupType.CLASS_C
+
+    run_with_service(AsyncFuotaService, scenario)
+
+
+def test_async_get_deployment_status_failure():
+    async def scenario(service):
+        service.stub.GetDeploymentStatus = AsyncMock(side_effect=grpc.RpcError("boom"))
+        await service.get_deployment_status("deployment_id")
+
+    with pytest.raises(Exception, match="Failed to get FUOTA deployment status"):
+        run_with_service(AsyncFuotaService, scenario)
+
+
+def test_async_device_create_returns_existing():
+    existing = api.DeviceListItem(dev_eui="0011223344556677", name="node")
+
+    async def scenario(service):
+        service.stub.List = AsyncMock(return_value=api.ListDevicesResponse(total_count=1, result=[existing]))
+        service.stub.Create = AsyncMock()
+        device = await service.create("app_id", "node", "0011223344556677", "00" * 16, "LORAWAN_1_0_3")
+        assert device == existing
+        service.stub.Create.assert_not_called()
+
+    run_with_service(AsyncDeviceService, scenario)
+
+
+def test_async_device_create_sets_keys():
+    async def scenario(service):
+        service.stub.List = AsyncMock(return_value=api.ListDevicesResponse())
+        service.stub.Create = AsyncMock()
+        service.stub.CreateKeys = AsyncMock()
+        await service.create("app_id", "node", "0011223344556677", "00" * 16, "LORAWAN_1_0_3")
+        service.stub.Create.assert_awaited_once()
+        keys = service.stub.CreateKeys.call_args.args[0].device_keys
+        assert keys.nwk_key == "00" * 16
+
+    run_with_service(AsyncDeviceService, scenario)
+
+
+def test_async_optimistic_device_create_falls_back_on_conflict():
+    existing = api.DeviceListItem(dev_eui="0011223344556677", name="node")
+
+    class AlreadyExists(grpc.RpcError):
+        def code(self):
+            return grpc.StatusCode.ALREADY_EXISTS
+
+    async def scenario(service):
+        service.optimistic = True
+        service.stub.List = AsyncMock(return_value=api.ListDevicesResponse(total_count=1, result=[existing]))
+        service.stub.Create = AsyncMock(side_effect=[None, AlreadyExists()])
+        service.stub.CreateKeys = AsyncMock()
+        await service.create("app_id", "node", "0011223344556677", "00" * 16, "LORAWAN_1_0_3")
+        service.stub.List.assert_not_called()
+        assert await service.create("app_id", "node", "0011223344556677", "00" * 16, "LORAWAN_1_0_3") == existing
+        service.stub.CreateKeys.assert_awaited_once()
+
+    run_with_service(AsyncDeviceService, scenario)
+
+
+def test_async_get_deployment_logs_many():
+    async def logs(request, metadata):
+        response = fuota_pb2.GetDeploymentDeviceLogsResponse()
+        response.logs.add(command=request.dev_eui)
+        return response
+
+    async def scenario(service):
+        service.stub.GetDeploymentDeviceLogs = AsyncMock(side_effect=logs)
+        return [
+            result
+            async for result in service.get_deployment_logs_many(
+                "deployment_id", [f"{i:02x}" for i in range(5)], concurrency=2
+            )
+        ]
+
+    results = run_with_service(AsyncFuotaService, scenario)
+    assert sorted(dev_eui for dev_eui, _, _ in results) == [f"{i:02x}" for i in range(5)]
+    assert all(logs.logs[0].command == dev_eui and error is None for dev_eui, logs, error in results)
+
+
+def test_async_get_deployment_logs_many_rejects_no_concurrency():
+    async def scenario(service):
+        with pytest.raises(ValueError, match="concurrency must be at least 1"):
+            async for _ in service.get_deployment_logs_many("deployment_id", ["01"], concurrency=0):
+                pass
+        service.stub.GetDeploymentDeviceLogs.assert_not_called()
+
+    run_with_service(AsyncFuotaService, scenario)
+
+
+def test_default_async_pool_per_event_loop():
+    with FakeChirpstackServer() as server:
+
+        async def main():
+            first = AsyncTenantService(server.address, "token")
+            second = AsyncTenantService(server.address, "token")
+            assert first.channel is second.channel
+            return await first.create(f"tenant-{len(server.state.tenants)}")
+
+        # Channels of the default pool stay bound to their loop, so each run gets its own.
+        assert asyncio.run(main()) != asyncio.run(main())
+        assert len(server.state.tenants) == 2
+
+    with pytest.raises(RuntimeError, match="running event loop"):
+        AsyncTenantService("localhost:50051", "token")
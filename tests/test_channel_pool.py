@@ -0,0 +1,54 @@
+import pytest
+
+from chirpstack_fuota_client import DeviceService, FuotaService
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+
+
+@pytest.fixture
+def pool():
+    with ChannelPool() as pool:
+        yield pool
+
+
+def test_same_address_shares_channel(pool):
+    assert pool.get("localhost:50051") is pool.get("localhost:50051")
+    assert pool.get("localhost:50051") is not pool.get("localhost:50052")
+    assert len(pool) == 2
+
+
+def test_services_share_pooled_channel(pool):
+    device_service = DeviceService("localhost:50051", "token", channel_pool=pool)
+    fuota_service = FuotaService("localhost:50051", "token", channel_pool=pool)
+    assert device_service.channel is fuota_service.channel
+
+
+def test_stripes_round_robin():
+    with ChannelPool(stripes=3) as pool:
+        channels = [pool.get("localhost:50051") for _ in range(6)]
+        assert len({id(c) for c in channels}) == 3
+        assert channels[:3] == channels[3:]
+        assert ("grpc.use_local_subchannel_pool", 1) in pool.channel_options()
+
+
+def test_keepalive_options():
+    pool = ChannelPool(keepalive_time_ms=5000, keepalive_permit_without_calls=False)
+    options = dict(pool.channel_options())
+    assert options["grpc.keepalive_time_ms"] == 5000
+    assert options["grpc.keepalive_permit_without_calls"] == 0
+    # Off by default: grpc-go servers answer idle pings with GOAWAY too_many_pings.
+    assert not any(key.startswith("grpc.keepalive") for key, _ in ChannelPool().channel_options())
+
+
+def test_close_reopens_on_next_get(pool):
+    first = pool.get("localhost:50051")
+    pool.get("localhost:50052")
+    pool.close("localhost:50051")
+    assert len(pool) == 1
+    assert pool.get("localhost:50051") is not first
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_invalid_stripes():
+    with pytest.raises(ValueError):
+        ChannelPool(stripes=0)
@@ -0,0 +1,221 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import grpc
+import pytest
+from chirpstack_api import api
+
+from chirpstack_fuota_client import ChirpstackRpcError
+from chirpstack_fuota_client.api.device import DeviceService
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+from chirpstack_fuota_client.utils.ratelimit import KeyedRateLimiter
+
+
+@pytest.fixture
+def device_service():
+    with ChannelPool() as pool:
+        service = DeviceService(server_address="localhost:50051", api_token="test_token", channel_pool=pool)
+        service.stub = MagicMock(spec=api.DeviceServiceStub)
+        service.stub.List = MagicMock(return_value=api.ListDevicesResponse())
+        service.stub.Create = MagicMock()
+        service.stub.CreateKeys = MagicMock()
+        service.stub.Enqueue = MagicMock(
+            side_effect=lambda req, metadata: api.EnqueueDeviceQueueItemResponse(id=req.queue_item.dev_eui)
+        )
+        service.stub.FlushQueue = MagicMock()
+        yield service
+
+
+class StatusError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def make_devices(count):
+    return [
+        {"name": f"node-{i}", "dev_eui": f"{i:016x}", "app_key": "00" * 16, "mac_version": "LORAWAN_1_0_3"}
+        for i in range(count)
+    ]
+
+
+def test_create_many_preserves_input_order(device_service):
+    def create(req, metadata):
+        # Finish later devices first to make sure ordering does not depend on completion order.
+        time.sleep(0.01 * (5 - int(req.device.dev_eui, 16)))
+        return req.device.dev_eui
+
+    device_service.stub.Create.side_effect = create
+    result = device_service.create_many("app_id", make_devices(5), concurrency=5)
+    assert result.results == [f"{i:016x}" for i in range(5)]
+    assert result.errors == [None] * 5
+    assert result.succeeded == 5
+    assert result.throughput > 0
+    assert device_service.stub.CreateKeys.call_count == 5
+
+
+def test_create_many_reports_errors_per_device(device_service):
+    def create(req, metadata):
+        if req.device.name == "node-1":
+            raise grpc.RpcError("boom")
+
+    device_service.stub.Create.side_effect = create
+    result = device_service.create_many("app_id", make_devices(3))
+    assert [i for i, _ in result.failed] == [1]
+    assert "Failed to create device" in str(result.errors[1])
+    with pytest.raises(Exception, match="Failed to create device"):
+        result.raise_for_errors()
+
+
+def test_create_many_known_new_skips_lookup(device_service):
+    result = device_service.create_many("app_id", make_devices(4), known_new=True)
+    assert result.succeeded == 4
+    device_service.stub.List.assert_not_called()
+
+
+def test_create_many_bounds_concurrency(device_service):
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def create(req, metadata):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.pop()
+
+    device_service.stub.Create.side_effect = create
+    device_service.create_many("app_id", make_devices(12), concurrency=3)
+    assert max(peak) <= 3
+
+
+def test_create_looks_up_name_first_by_default(device_service):
+    device_service.stub.List.return_value = api.ListDevicesResponse(
+        result=[api.DeviceListItem(name="node-0", dev_eui="00")]
+    )
+    assert device_service.create("app_id", **make_devices(1)[0]).dev_eui == "00"
+    device_service.stub.Create.assert_not_called()
+
+
+def test_optimistic_create_skips_lookup(device_service):
+    device_service.optimistic = True
+    device_service.create("app_id", **make_devices(1)[0])
+    device_service.stub.List.assert_not_called()
+    keys = device_service.stub.CreateKeys.call_args.args[0].device_keys
+    assert keys.dev_eui == f"{0:016x}"
+    assert keys.nwk_key == "00" * 16
+
+
+def test_optimistic_create_falls_back_on_conflict(device_service):
+    device_service.stub.Create.side_effect = StatusError(grpc.StatusCode.ALREADY_EXISTS)
+    device_service.stub.List.return_value = api.ListDevicesResponse(
+        result=[api.DeviceListItem(name="node-0", dev_eui="00")]
+    )
+    assert device_service.create("app_id", optimistic=True, **make_devices(1)[0]).dev_eui == "00"
+    device_service.stub.CreateKeys.assert_not_called()
+
+    # A conflict on the dev_eui of a device with another name is still an error.
+    device_service.stub.List.return_value = api.ListDevicesResponse()
+    with pytest.raises(ChirpstackRpcError) as e:
+        device_service.create("app_id", optimistic=True, **make_devices(1)[0])
+    assert e.value.code == grpc.StatusCode.ALREADY_EXISTS
+
+
+def test_optimistic_create_conflict_detection_is_configurable(device_service):
+    device_service.stub.Create.side_effect = StatusError(grpc.StatusCode.INTERNAL)
+    with pytest.raises(ChirpstackRpcError):
+        device_service.create("app_id", optimistic=True, **make_devices(1)[0])
+    device_service.stub.List.assert_not_called()
+
+    device_service.is_conflict = lambda e: e.code() == grpc.StatusCode.INTERNAL
+    device_service.stub.List.return_value = api.ListDevicesResponse(
+        result=[api.DeviceListItem(name="node-0", dev_eui="00")]
+    )
+    assert device_service.create("app_id", optimistic=True, **make_devices(1)[0]).dev_eui == "00"
+
+
+def test_create_rejects_invalid_mac_version_before_creating(device_service):
+    with pytest.raises(ValueError, match="Invalid mac_version"):
+        device_service.create("app_id", "node", "00", "00" * 16, "LORAWAN_2_0", optimistic=True)
+    device_service.stub.Create.assert_not_called()
+
+
+def make_downlinks(count, gateways=1):
+    return [{"dev_eui": f"{i:016x}", "data": b"\x01", "gateway_id": f"gw-{i % gateways}"} for i in range(count)]
+
+
+def test_queue_downlink_many_reports_per_device(device_service):
+    def enqueue(req, metadata):
+        if req.queue_item.dev_eui == f"{2:016x}":
+            raise grpc.RpcError("boom")
+        return api.EnqueueDeviceQueueItemResponse(id=req.queue_item.dev_eui)
+
+    device_service.stub.Enqueue.side_effect = enqueue
+    result = device_service.queue_downlink_many(make_downlinks(4), key="gateway_id", flush=True)
+    assert [r.id if r else None for r in result.results] == [f"{0:016x}", f"{1:016x}", None, f"{3:016x}"]
+    assert [i for i, _ in result.failed] == [2]
+    assert "Failed to send downlink" in str(result.errors[2])
+    assert device_service.stub.FlushQueue.call_count == 4
+    # The rate limiting key is not sent to ChirpStack.
+    assert device_service.stub.Enqueue.call_args.args[0].queue_item.f_port == 10
+
+
+def test_queue_downlink_many_shapes_rate_per_key(device_service):
+    sleeps = []
+    clock = [0.0]
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    limiter = KeyedRateLimiter(rate=10, burst=1, clock=lambda: clock[0], sleep=sleep)
+    result = device_service.queue_downlink_many(
+        make_downlinks(6, gateways=2), concurrency=1, key="gateway_id", limiter=limiter
+    )
+    assert result.succeeded == 6
+    assert len(limiter) == 2
+    # Two gateways at 10 downlinks/s each: 6 downlinks with a burst of 1 take 0.2s.
+    assert clock[0] == pytest.approx(0.2)
+    # Downlinks alternate between gateways, keeping the input order within each gateway.
+    sent = [call.args[0].queue_item.dev_eui for call in device_service.stub.Enqueue.call_args_list]
+    assert sent == [f"{i:016x}" for i in range(6)]
+
+
+def test_queue_downlink_many_round_robins_grouped_input(device_service):
+    downlinks = [{"dev_eui": f"{i:016x}", "data": b"", "app": "a" if i < 3 else "b"} for i in range(5)]
+    device_service.queue_downlink_many(downlinks, concurrency=1, key=lambda d: d.pop("app"))
+    sent = [int(call.args[0].queue_item.dev_eui, 16) for call in device_service.stub.Enqueue.call_args_list]
+    assert sent == [0, 3, 1, 4, 2]
+
+
+def test_queue_downlink_many_flushes_each_device_once_first(device_service):
+    calls = []
+    device_service.stub.FlushQueue.side_effect = lambda req, metadata: calls.append(("flush", req.dev_eui))
+    device_service.stub.Enqueue.side_effect = lambda req, metadata: calls.append(("enqueue", req.queue_item.dev_eui))
+    downlinks = [{"dev_eui": f"{i % 2:016x}", "data": bytes([i])} for i in range(4)]
+    result = device_service.queue_downlink_many(downlinks, flush=True)
+    assert result.succeeded == 4
+    assert sorted(calls[:2]) == [("flush", f"{0:016x}"), ("flush", f"{1:016x}")]
+    assert [kind for kind, _ in calls[2:]] == ["enqueue"] * 4
+
+
+def test_queue_downlink_many_reports_flush_and_key_errors(device_service):
+    def flush(req, metadata):
+        if req.dev_eui == f"{1:016x}":
+            raise grpc.RpcError("boom")
+
+    device_service.stub.FlushQueue.side_effect = flush
+    downlinks = make_downlinks(4)
+    del downlinks[3]["gateway_id"]
+    result = device_service.queue_downlink_many(downlinks, key="gateway_id", flush=True)
+    assert [i for i, _ in result.failed] == [1, 3]
+    assert isinstance(result.errors[1], ChirpstackRpcError)
+    assert isinstance(result.errors[3], KeyError)
+    assert device_service.stub.FlushQueue.call_count == 3
+    sent = sorted(call.args[0].queue_item.dev_eui for call in device_service.stub.Enqueue.call_args_list)
+    assert sent == [f"{0:016x}", f"{2:016x}"]
@@ -0,0 +1,190 @@
+import grpc
+import pytest
+from chirpstack_api import api
+
+from chirpstack_fuota_client import ApplicationService, ChirpstackRpcError, DeviceService, FuotaService, futures
+from chirpstack_fuota_client.testing import FakeChirpstackServer
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+from chirpstack_fuota_client.utils.helpers import create_channel
+from chirpstack_fuota_client.utils.interceptors import RetryInterceptor, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def pool():
+    with ChannelPool() as pool:
+        yield pool
+
+
+def test_device_lifecycle(pool):
+    with FakeChirpstackServer(api_token="token") as server:
+        applications = ApplicationService(server.address, "token", channel_pool=pool)
+        devices = DeviceService(server.address, "token", channel_pool=pool)
+
+        application_id = applications.create("tenant", "app").id
+        result = devices.create_many(
+            application_id,
+            [
+                {"name": f"dev-{i}", "dev_eui": f"{i:016x}", "app_key": "00" * 16, "mac_version": "LORAWAN_1_0_3"}
+                for i in range(20)
+            ],
+            concurrency=4,
+        )
+        assert not result.failed
+        assert len(server.state.device_keys) == 20
+        # Listed by name: "dev-10" sorts before "dev-2".
+        listed = [d.name for d in devices.iter_all(application_id, page_size=7)]
+        assert listed == sorted(f"dev-{i}" for i in range(20))
+        assert devices.get_by_name(application_id, "dev-3").dev_eui == f"{3:016x}"
+
+        devices.queue_downlink(f"{1:016x}", b"\x01")
+        assert devices.get_queue_items(f"{1:016x}").total_count == 1
+
+        devices.delete(f"{1:016x}")
+        with pytest.raises(ChirpstackRpcError) as e:
+            devices.get(f"{1:016x}")
+        assert e.value.code == grpc.StatusCode.NOT_FOUND
+
+        unauthenticated = DeviceService(server.address, "wrong", channel_pool=pool)
+        with pytest.raises(ChirpstackRpcError) as e:
+            unauthenticated.get(f"{2:016x}")
+        assert e.value.code == grpc.StatusCode.UNAUTHENTICATED
+
+
+def test_optimistic_create(pool):
+    with FakeChirpstackServer() as server:
+        applications = ApplicationService(server.address, "token", channel_pool=pool, optimistic=True)
+        devices = DeviceService(server.address, "token", channel_pool=pool, optimistic=True)
+        application_id = applications.create("tenant", "app").id
+        assert server.calls["/api.ApplicationService/List"] == 0
+        device = {"dev_eui": f"{1:016x}", "app_key": "00" * 16, "mac_version": "LORAWAN_1_0_3"}
+
+        devices.create(application_id, "dev-1", **device)
+        assert server.calls["/api.DeviceService/List"] == 0
+        assert server.calls["/api.DeviceService/CreateKeys"] == 1
+
+        # Creating it again conflicts on the dev_eui and returns the existing device.
+        assert devices.create(application_id, "dev-1", **device).dev_eui == device["dev_eui"]
+        assert server.calls["/api.DeviceService/List"] == 1
+        assert server.calls["/api.DeviceService/CreateKeys"] == 1
+
+
+def test_future_methods(pool):
+    with FakeChirpstackServer(latency=0.02) as server:
+        applications = ApplicationService(server.address, "token", channel_pool=pool)
+        devices = DeviceService(server.address, "token", channel_pool=pool)
+        application_id = applications.create_async("tenant", "app").result().id
+        created = [
+            devices.create_async(application_id, f"dev-{i}", f"{i:016x}", "00" * 16, "LORAWAN_1_0_3", tags={"a": "1"})
+            for i in range(10)
+        ]
+        assert not any(future.done() for future in created)
+        futures.gather(created).result(timeout=5)
+        assert len(server.state.device_keys) == 10
+
+        server.fail_next("/api.DeviceService/Get", count=2)
+        future = devices.get_async(f"{0:016x}")
+        assert not future.done()
+        assert future.result(timeout=5).device.name == "dev-0"
+        assert server.calls["/api.DeviceService/Get"] == 3
+
+        devices.update_async(f"{1:016x}", "renamed", "11" * 16, "LORAWAN_1_0_3", tags={"b": "2"}).result(timeout=5)
+        device = devices.get(f"{1:016x}").device
+        assert device.name == "renamed"
+        assert dict(device.tags) == {"a": "1", "b": "2"}
+        assert server.state.device_keys[f"{1:016x}"].obj.nwk_key == "11" * 16
+
+        with pytest.raises(ChirpstackRpcError) as e:
+            devices.get_async("ffffffffffffffff").result(timeout=5)
+        assert e.value.code == grpc.StatusCode.NOT_FOUND
+
+
+def test_rejected_update_leaves_keys_unchanged(pool):
+    with FakeChirpstackServer() as server:
+        application_id = ApplicationService(server.address, "token", channel_pool=pool).create("t", "app").id
+        devices = DeviceService(server.address, "token", channel_pool=pool)
+        devices.create(application_id, "dev", "01" * 8, "00" * 16, "LORAWAN_1_0_3")
+
+        server.fail_next("/api.DeviceService/Update", grpc.StatusCode.PERMISSION_DENIED, count=2)
+        with pytest.raises(ChirpstackRpcError):
+            devices.update("01" * 8, "renamed", "11" * 16, "LORAWAN_1_0_3")
+        with pytest.raises(ChirpstackRpcError):
+            devices.update_async("01" * 8, "renamed", "11" * 16, "LORAWAN_1_0_3").result(timeout=5)
+        assert server.calls["/api.DeviceService/UpdateKeys"] == 0
+        assert server.state.device_keys["01" * 8].obj.nwk_key == "00" * 16
+
+
+def test_retried_future_does_not_block(pool):
+    class FixedBackoff(RetryPolicy):
+        def backoff(self, retry):
+            return self.initial_backoff
+
+    with FakeChirpstackServer() as server:
+        channel = create_channel(server.address, interceptors=[RetryInterceptor(FixedBackoff(initial_backoff=30))])
+        stub = api.TenantServiceStub(channel)
+        tenant_id = stub.Create(api.CreateTenantRequest(tenant=api.Tenant(name="tenant"))).id
+
+        server.fail_next("/api.TenantService/Get")
+        future = stub.Get.future(api.GetTenantRequest(id=tenant_id))
+        # The first attempt fails and the retry waits for its backoff on a timer.
+        with pytest.raises(grpc.FutureTimeoutError):
+            future.result(timeout=0.2)
+        assert future.running()
+        assert future.cancel()
+        assert future.cancelled()
+        assert future.code() == grpc.StatusCode.CANCELLED
+        with pytest.raises(grpc.FutureCancelledError):
+            future.result()
+        assert server.calls["/api.TenantService/Get"] == 1
+        channel.close()
+
+
+def test_injected_errors_are_retried(pool):
+    with FakeChirpstackServer() as server:
+        fuota = FuotaService(server.address, "token", channel_pool=pool)
+        deployment_id = fuota.create_deployment(
+            "app", [{"dev_eui": "01", "gen_app_key": "00" * 16}], "CLASS_C", 5, 869525000
+        ).id
+
+        server.fail_next("GetDeploymentStatus", count=2)
+        fuota.get_deployment_status(deployment_id)
+        assert server.calls["/fuota.FuotaServerService/GetDeploymentStatus"] == 3
+
+        # CreateDeployment is not safe to retry.
+        server.fail_next("/fuota.FuotaServerService/CreateDeployment", grpc.StatusCode.RESOURCE_EXHAUSTED)
+        with pytest.raises(ChirpstackRpcError) as e:
+            fuota.create_deployment("app", [{"dev_eui": "01", "gen_app_key": "00" * 16}], "CLASS_C", 5, 869525000)
+        assert e.value.code == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+
+def test_deployment_progression(pool):
+    clock = FakeClock()
+    with FakeChirpstackServer(phase_duration=10, device_error_rate=0.5, seed=3, clock=clock) as server:
+        fuota = FuotaService(server.address, "token", channel_pool=pool)
+        devices = [{"dev_eui": f"{i:016x}", "gen_app_key": "00" * 16} for i in range(20)]
+        deployment_id = fuota.create_deployment("app", devices, "CLASS_C", 5, 869525000).id
+
+        status = fuota.get_deployment_status(deployment_id)
+        assert not status.HasField("mc_group_setup_completed_at")
+
+        clock.now = 25
+        status = fuota.get_deployment_status(deployment_id)
+        assert status.HasField("frag_session_setup_completed_at")
+        assert not status.HasField("mc_session_completed_at")
+
+        clock.now = 50
+        events = list(fuota.watch_deployment(deployment_id, sleep=lambda interval: None))
+        assert events[-1].done
+        completed = [d for d in events[-1].status.device_status if d.HasField("frag_status_completed_at")]
+        assert 0 < len(completed) < 20
+
+        logs = fuota.get_deployment_device_logs(deployment_id, completed[0].dev_eui)
+        assert [log.command for log in logs.logs][:2] == ["McGroupSetupReq", "McGroupSetupAns"]
+        assert len(logs.logs) == 8
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 import grpc
 from chirpstack_fuota_client.api.fuota.service import FuotaService
 from chirpstack_fuota_client.proto.fuota import fuota_pb2, fuota_pb2_grpc
@@ -61,4 +61,134 @@ def test_get_deployment_device_logs_success(fuota_service, mock_stub):
 def test_get_deployment_device_logs_failure(fuota_service, mock_stub):
     mock_stub.GetDeploymentDeviceLogs.side_effect = grpc.RpcError('Failed to get deployment device logs')
     with pytest.raises(Exception, match='Failed to get FUOTA deployment device logs'):
-        fuota_service.get_deployment_device_logs(deployment_id='deployment_id', dev_eui='dev_eui')
\ No newline at end of file
+        fuota_service.get_deployment_device_logs(deployment_id='deployment_id', dev_eui='dev_eui')
+
+def _status(phases=(), devices=()):
+    status = fuota_pb2.GetDeploymentStatusResponse()
+    for i, phase in enumerate(phases):
+        getattr(status, phase).seconds = 1000 + i
+    for dev_eui, updated_at in devices:
+        status.device_status.add(dev_eui=dev_eui).updated_at.seconds = updated_at
+    return status
+
+def test_watch_deployment_yields_diffs(fuota_service, mock_stub):
+    mock_stub.GetDeploymentStatus.side_effect = [
+        _status(devices=[("01", 1), ("02", 1)]),
+        _status(devices=[("01", 1), ("02", 1)]),
+        _status(["mc_group_setup_completed_at"], devices=[("01", 2), ("02", 1)]),
+        _status(
+            [
+                "mc_group_setup_completed_at",
+                "frag_session_setup_completed_at",
+                "mc_session_completed_at",
+                "enqueue_completed_at",
+                "frag_status_completed_at",
+            ],
+            devices=[("01", 2), ("02", 3)],
+        ),
+    ]
+    sleeps = []
+    events = list(fuota_service.watch_deployment("deployment_id", sleep=sleeps.append))
+
+    assert len(events) == 3
+    assert [d.dev_eui for d in events[0].changed_devices] == ["01", "02"]
+    assert [phase for phase, _ in events[1].completed_phases] == ["mc_group_setup_completed_at"]
+    assert [d.dev_eui for d in events[1].changed_devices] == ["01"]
+    assert events[2].done
+    assert [phase for phase, _ in events[2].completed_phases][-1] == "frag_status_completed_at"
+    assert [d.dev_eui for d in events[2].changed_devices] == ["02"]
+    # Unchanged poll backs off, completed phases reset to the phase interval.
+    assert sleeps == [10.0, 15.0, 10.0]
+
+def test_watch_deployment_timeout(fuota_service, mock_stub):
+    mock_stub.GetDeploymentStatus.return_value = _status()
+    with pytest.raises(TimeoutError):
+        list(fuota_service.watch_deployment("deployment_id", timeout=0, sleep=lambda interval: None))
+
+def test_get_deployment_logs_many(fuota_service, mock_stub):
+    def logs(request, metadata):
+        if request.dev_eui == "02":
+            raise grpc.RpcError("unknown device")
+        response = fuota_pb2.GetDeploymentDeviceLogsResponse()
+        response.logs.add(f_port=201, command=request.dev_eui)
+        return response
+
+    mock_stub.GetDeploymentDeviceLogs.side_effect = logs
+    results = {
+        dev_eui: (logs, error)
+        for dev_eui, logs, error in fuota_service.get_deployment_logs_many(
+            "deployment_id", iter(["01", "02", "03"]), concurrency=2, serialize=True
+        )
+    }
+    assert set(results) == {"01", "02", "03"}
+    assert results["01"][0][0]["command"] == "01"
+    assert results["01"][1] is None
+    assert results["02"][0] is None
+    assert "Failed to get FUOTA deployment device logs" in str(results["02"][1])
+
+def test_create_sharded_deployment(fuota_service, mock_stub):
+    devices = [
+        {"dev_eui": f"{i:016x}", "gen_app_key": "00" * 16, "region": "EU868" if i < 5 else "US915"} for i in range(7)
+    ]
+    created = []
+
+    def create(request, metadata):
+        deployment = request.deployment
+        if deployment.multicast_region == fuota_pb2.US915:
+            raise grpc.RpcError("unavailable")
+        created.append([d.dev_eui for d in deployment.devices])
+        # Shards are created on several threads, so the ID comes from the request.
+        return fuota_pb2.CreateDeploymentResponse(id=f"deployment-{deployment.devices[0].dev_eui}")
+
+    mock_stub.CreateDeployment.side_effect = create
+    sharded = fuota_service.create_sharded_deployment(
+        "app_id", devices, "CLASS_C", 5, 869525000, max_devices=2, shard_by="region", concurrency=2
+    )
+
+    assert [(shard.key, len(shard.devices)) for shard in sharded.shards] == [
+        ("EU868", 2),
+        ("EU868", 2),
+        ("EU868", 1),
+        ("US915", 2),
+    ]
+    assert sorted(len(euis) for euis in created) == [1, 2, 2]
+    assert len(sharded.deployment_ids) == 3
+    assert [shard.key for shard in sharded.failed] == ["US915"]
+
+    def status(request, metadata):
+        phases = ["mc_group_setup_completed_at"]
+        if request.id == f"deployment-{0:016x}":
+            phases.append("frag_status_completed_at")
+        return _status(phases, devices=[("01", 1)])
+
+    mock_stub.GetDeploymentStatus.side_effect = status
+    aggregate = sharded.status()
+    assert aggregate["created"] == 3
+    assert aggregate["failed"] == 1
+    assert aggregate["completed"] == 1
+    assert not aggregate["done"]
+    assert aggregate["devices"] == 3
+    assert aggregate["phases"]["mc_group_setup_completed_at"] == 3
+    assert [shard.key for shard in aggregate["failed_shards"]] == ["US915"]
+
+    # A failed shard is never done, even when every created deployment completed.
+    mock_stub.GetDeploymentStatus.side_effect = lambda request, metadata: _status(["frag_status_completed_at"])
+    aggregate = sharded.status()
+    assert aggregate["completed"] == 3
+    assert not aggregate["done"]
+
+def test_sharded_deployment_done_only_when_all_shards_complete(fuota_service, mock_stub):
+    devices = [{"dev_eui": f"{i:016x}", "gen_app_key": "00" * 16} for i in range(4)]
+    mock_stub.CreateDeployment.side_effect = grpc.RpcError("unavailable")
+    sharded = fuota_service.create_sharded_deployment("app_id", devices, "CLASS_C", 5, 869525000, max_devices=2)
+    aggregate = sharded.status()
+    # Nothing created is not done.
+    assert aggregate["created"] == 0 and aggregate["failed"] == 2
+    assert not aggregate["done"]
+
+    mock_stub.CreateDeployment.side_effect = lambda request, metadata: fuota_pb2.CreateDeploymentResponse(
+        id=request.deployment.devices[0].dev_eui
+    )
+    sharded = fuota_service.create_sharded_deployment("app_id", devices, "CLASS_C", 5, 869525000, max_devices=2)
+    mock_stub.GetDeploymentStatus.side_effect = lambda request, metadata: _status(["frag_status_completed_at"])
+    assert sharded.status()["done"]
@@ -60,4 +60,167 @@ def test_create_deployment_devices():
     deployment_devices = FuotaUtils.create_deployment_devices(devices)
     assert len(deployment_devices) == 1
     assert deployment_devices[0].dev_eui == "0011223344556677"
-    assert len(deployment_devices[0].mc_root_key) == 32
\ No newline at end of file
+    assert len(deployment_devices[0].mc_root_key) == 32
+
+def test_derive_mc_root_keys_matches_single_derivation():
+    gen_app_keys = [f"{i:032x}" for i in range(10)]
+    mc_root_keys = FuotaUtils.derive_mc_root_keys(gen_app_keys)
+    assert [key.hex() for key in mc_root_keys] == [
+        FuotaUtils.get_mc_root_key_for_gen_app_key(key) for key in gen_app_keys
+    ]
+    assert FuotaUtils.derive_mc_root_keys([bytes.fromhex(gen_app_keys[3])]) == [mc_root_keys[3]]
+
+
+def test_derive_mc_root_keys_uses_cache():
+    FuotaUtils.clear_mc_root_key_cache()
+    gen_app_key = "0f" * 16
+    first = FuotaUtils.derive_mc_root_keys([gen_app_key, gen_app_key], use_cache=True)
+    hits = FuotaUtils.mc_root_key_cache.hits
+    assert FuotaUtils.derive_mc_root_keys([gen_app_key], use_cache=True) == first[:1]
+    assert FuotaUtils.mc_root_key_cache.hits == hits + 1
+    FuotaUtils.clear_mc_root_key_cache()
+    assert FuotaUtils.mc_root_key_cache.get(bytes.fromhex(gen_app_key)) is None
+
+def test_derive_mc_root_keys_cache_is_opt_in():
+    FuotaUtils.clear_mc_root_key_cache()
+    gen_app_key = "1e" * 16
+    assert FuotaUtils.derive_mc_root_keys([gen_app_key]) == FuotaUtils.derive_mc_root_keys([gen_app_key])
+    FuotaUtils.create_deployment_devices([{"dev_eui": "0011223344556677", "gen_app_key": gen_app_key}])
+    assert FuotaUtils.mc_root_key_cache.get(bytes.fromhex(gen_app_key)) is None
+
+
+def test_derive_mc_root_keys_process_pool(monkeypatch):
+    from chirpstack_fuota_client.api.fuota import utils
+
+    monkeypatch.setattr(utils, "PARALLEL_DERIVATION_THRESHOLD", 4)
+    gen_app_keys = [f"{i:032x}" for i in range(16)]
+    expected = FuotaUtils.derive_mc_root_keys(gen_app_keys)
+    assert FuotaUtils.derive_mc_root_keys(gen_app_keys, processes=2) == expected
+
+
+def test_derive_mc_root_keys_invalid_key():
+    with pytest.raises(ValueError, match="Invalid GenAppKey"):
+        FuotaUtils.derive_mc_root_keys(["0011"])
+    with pytest.raises(ValueError, match="Invalid GenAppKey"):
+        FuotaUtils.derive_mc_root_keys(["zz" * 16])
+
+
+def test_create_deployment_devices_batch():
+    devices = [{"dev_eui": f"{i:016x}", "gen_app_key": f"{i:032x}"} for i in range(3)]
+    deployment_devices, mc_root_keys = FuotaUtils.create_deployment_devices_batch(devices)
+    assert [d.dev_eui for d in deployment_devices] == [d["dev_eui"] for d in devices]
+    assert [d.mc_root_key for d in deployment_devices] == [key.hex() for key in mc_root_keys]
+
+
+def test_serialize_deployment_status_columnar():
+    pytest.importorskip("numpy")
+    status = fuota_pb2.GetDeploymentStatusResponse()
+    status.created_at.seconds = 100
+    first = status.device_status.add(dev_eui="0011223344556677")
+    first.created_at.seconds = 100
+    first.mc_group_setup_completed_at.seconds = 200
+    first.mc_group_setup_completed_at.nanos = 5
+    second = status.device_status.add(dev_eui="8899aabbccddeeff")
+    second.created_at.seconds = 101
+
+    columnar = FuotaUtils.serialize_deployment_status(status, fmt="columnar")
+    assert columnar["created_at"] == 100 * 10**9
+    assert columnar["frag_status_completed_at"] is None
+
+    devices = columnar["device_status"]
+    assert list(devices["dev_eui"]) == ["0011223344556677", "8899aabbccddeeff"]
+    assert devices["created_at"].tolist() == [100 * 10**9, 101 * 10**9]
+    assert devices["mc_group_setup_completed_at"].tolist() == [200 * 10**9 + 5, None]
+    assert devices["frag_status_completed_at"].count() == 0
+
+    stats = FuotaUtils.stage_completion_stats(devices)
+    assert stats["mc_group_setup_completed_at"] == {
+        "completed": 1,
+        "total": 2,
+        "ratio": 0.5,
+        "first": 200 * 10**9 + 5,
+        "last": 200 * 10**9 + 5,
+    }
+    assert stats["frag_status_completed_at"]["first"] is None
+
+def test_load_firmware_from_path_is_cached(tmp_path):
+    from chirpstack_fuota_client.api.fuota.firmware import FirmwareImage, load_firmware
+
+    path = tmp_path / "firmware.bin"
+    path.write_bytes(b"\x01\x02\x03" * 100)
+
+    image = load_firmware(path)
+    assert image.size == 300
+    assert bytes(image.view()) == path.read_bytes()
+    assert load_firmware(str(path)) is image
+    # Same content from a buffer resolves to the same image.
+    assert load_firmware(bytearray(path.read_bytes())) is image
+    assert load_firmware(image) is image
+    assert isinstance(image, FirmwareImage)
+
+def test_firmware_validate():
+    from chirpstack_fuota_client.api.fuota.firmware import FirmwareImage
+
+    image = FirmwareImage(b"\x00" * 101)
+    assert image.validate(50, redundancy=2) == 3
+    assert image.validate() is None
+    with pytest.raises(ValueError, match="more than the 100 bytes"):
+        image.validate(50, max_size=100)
+    with pytest.raises(ValueError, match="Fragment size"):
+        image.validate(256)
+    with pytest.raises(ValueError, match="fragments"):
+        FirmwareImage(b"\x00" * 20000).validate(1)
+    with pytest.raises(ValueError, match="empty"):
+        FirmwareImage(b"").validate(50)
+
+def test_create_deployment_request_payload_path(tmp_path):
+    path = tmp_path / "firmware.bin"
+    path.write_bytes(b"\xaa" * 120)
+    request = FuotaUtils.create_deployment_request(
+        "app_id", [], "CLASS_C", 5, 869525000, payload=path, fragmentation_fragment_size=50
+    )
+    assert request.deployment.payload == b"\xaa" * 120
+
+    with pytest.raises(ValueError):
+        FuotaUtils.create_deployment_request(
+            "app_id", [], "CLASS_C", 5, 869525000, payload=path, fragmentation_fragment_size=0
+        )
+
+def test_firmware_payload_copied_once(tmp_path):
+    from chirpstack_fuota_client.api.fuota.firmware import load_firmware
+
+    path = tmp_path / "firmware.bin"
+    path.write_bytes(b"\x55" * 120)
+    image = load_firmware(path)
+    payload = image.payload
+    for _ in range(2):
+        request = FuotaUtils.create_deployment_request(
+            "app_id", [], "CLASS_C", 5, 869525000, payload=path, fragmentation_fragment_size=50
+        )
+        assert request.deployment.payload == payload
+    # The mapped file is copied to bytes once per image, not once per deployment.
+    assert image.payload is payload
+
+def test_parity_matrix_matches_reference():
+    pytest.importorskip("numpy")
+    from chirpstack_fuota_client.api.fuota.fragmentation import matrix_line, parity_matrix
+
+    for m, redundancy in [(4, 4), (7, 5), (101, 12)]:
+        matrix = parity_matrix(m, redundancy)
+        assert [line.astype(int).tolist() for line in matrix] == [matrix_line(n, m) for n in range(1, redundancy + 1)]
+
+def test_encode_decode_fragments():
+    pytest.importorskip("numpy")
+    import random
+
+    payload = bytes(random.Random(1).randrange(256) for _ in range(1000))  # noqa: S311
+    fragments = FuotaUtils.encode_fragments(payload, 50, 10)
+    assert fragments.shape == (30, 50)
+    assert fragments[:20].tobytes() == payload
+
+    # Lose three data fragments, recover them from the redundancy fragments.
+    received = {i + 1: fragments[i].tobytes() for i in range(30) if i not in (0, 7, 19)}
+    assert FuotaUtils.decode_fragments(received, 20, size=len(payload)) == payload
+
+    with pytest.raises(ValueError):
+        FuotaUtils.decode_fragments({i + 1: fragments[i].tobytes() for i in range(3, 21)}, 20)
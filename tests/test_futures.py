@@ -0,0 +1,77 @@
+import concurrent.futures
+import threading
+
+import grpc
+import pytest
+
+from chirpstack_fuota_client import ChirpstackRpcError, futures
+
+
+class StatusError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def failed(exception):
+    future = concurrent.futures.Future()
+    future.set_exception(exception)
+    return future
+
+
+def test_then_chains_values_and_futures():
+    pending = concurrent.futures.Future()
+    chained = futures.then(pending, lambda value: futures.then(futures.completed(value + 1), lambda v: v * 10))
+    assert not chained.done()
+    pending.set_result(1)
+    assert chained.result(timeout=1) == 20
+
+
+def test_then_propagates_failures():
+    assert isinstance(futures.then(failed(KeyError("a")), lambda value: value).exception(), KeyError)
+    assert isinstance(futures.then(futures.completed(1), lambda value: 1 / 0).exception(), ZeroDivisionError)
+
+
+def test_recover_only_handles_matching_exceptions():
+    assert futures.recover(failed(KeyError("a")), lambda e: "fallback", KeyError).result() == "fallback"
+    assert futures.recover(futures.completed(1), lambda e: "fallback").result() == 1
+    assert isinstance(futures.recover(failed(ValueError()), lambda e: None, KeyError).exception(), ValueError)
+
+
+def test_wrap_errors_keeps_the_status():
+    error = futures.wrap_errors(failed(StatusError(grpc.StatusCode.NOT_FOUND)), "Failed to get device").exception()
+    assert isinstance(error, ChirpstackRpcError)
+    assert error.code == grpc.StatusCode.NOT_FOUND
+    assert str(error).startswith("Failed to get device: ")
+
+
+def test_gather_keeps_input_order():
+    pending = [concurrent.futures.Future() for _ in range(5)]
+    gathered = futures.gather(pending)
+    threads = [threading.Thread(target=future.set_result, args=(i,)) for i, future in enumerate(pending)]
+    threads.reverse()
+    for thread in threads:
+        thread.start()
+    assert gathered.result(timeout=1) == [0, 1, 2, 3, 4]
+    assert futures.gather([]).result() == []
+
+
+def test_gather_failures():
+    pending = concurrent.futures.Future()
+    gathered = futures.gather([pending, failed(KeyError("a"))])
+    # Fails as soon as one future fails, without waiting for the others.
+    assert isinstance(gathered.exception(timeout=1), KeyError)
+
+    gathered = futures.gather([futures.completed(1), failed(KeyError("a"))], return_exceptions=True)
+    result = gathered.result(timeout=1)
+    assert result[0] == 1
+    assert isinstance(result[1], KeyError)
+
+
+def test_as_completed():
+    done = [futures.completed(i) for i in range(3)]
+    assert sorted(future.result() for future in futures.as_completed(done)) == [0, 1, 2]
+    with pytest.raises(concurrent.futures.TimeoutError):
+        list(futures.as_completed([concurrent.futures.Future()], timeout=0.01))
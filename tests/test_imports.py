@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import chirpstack_fuota_client
+
+# Budget in microseconds for `import chirpstack_fuota_client`, as reported by -X importtime.
+# Eager imports of every service used to take well over 100 ms.
+IMPORT_TIME_BUDGET_US = 50_000
+
+HEAVY_MODULES = ("chirpstack_api", "Crypto", "numpy")
+
+
+def run_python(code):
+    command = [sys.executable, "-X", "importtime", "-c", code]
+    return subprocess.run(command, capture_output=True, text=True, check=True)  # noqa: S603
+
+
+def test_package_import_is_lazy():
+    result = run_python(
+        "import sys, chirpstack_fuota_client; "
+        f"print(sorted(m for m in ('grpc', 'google.protobuf') + {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert result.stdout.strip() == "[]"
+
+    package_line = [line for line in result.stderr.splitlines() if line.endswith("| chirpstack_fuota_client")]
+    cumulative_us = int(package_line[-1].split("|")[1])
+    assert cumulative_us < IMPORT_TIME_BUDGET_US
+
+
+def test_single_service_import_skips_unused_dependencies():
+    result = run_python(
+        "import logging, sys; from chirpstack_fuota_client import FuotaService; "
+        f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)); "
+        "print(len(logging.getLogger('chirpstack_fuota_client').handlers))"
+    )
+    loaded, handlers = result.stdout.split("\n")[:2]
+    assert loaded == "[]"
+    # Logging is configured on first use, not at import.
+    assert handlers == "0"
+
+
+def test_exports_resolve():
+    for name in chirpstack_fuota_client.__all__:
+        assert getattr(chirpstack_fuota_client, name) is not None
+        assert name in dir(chirpstack_fuota_client)
+    assert chirpstack_fuota_client.FuotaService.__name__ == "FuotaService"
@@ -0,0 +1,186 @@
+import asyncio
+from concurrent import futures
+from unittest.mock import MagicMock
+
+import grpc
+import pytest
+
+from chirpstack_fuota_client import ChirpstackRpcError, FuotaService
+from chirpstack_fuota_client.proto.fuota import fuota_pb2, fuota_pb2_grpc
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+from chirpstack_fuota_client.utils.interceptors import (
+    DeadlineInterceptor,
+    RetryBudget,
+    RetryInterceptor,
+    RetryPolicy,
+)
+
+
+class Outcome:
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def details(method, timeout=None):
+    return MagicMock(method=method, timeout=timeout, metadata=None, credentials=None)
+
+
+def failing_continuation(codes):
+    codes = list(codes)
+    seen = []
+
+    def continuation(client_call_details, request):
+        seen.append(client_call_details)
+        return Outcome(codes.pop(0))
+
+    return continuation, seen
+
+
+def test_deadline_applied_when_missing():
+    interceptor = DeadlineInterceptor(default_timeout=5, method_timeouts={"List": 20})
+    continuation, seen = failing_continuation([grpc.StatusCode.OK] * 3)
+    interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get"), None)
+    interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/List"), None)
+    interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get", timeout=1), None)
+    assert [d.timeout for d in seen] == [5, 20, 1]
+
+
+def test_retry_safe_method_until_success():
+    sleeps = []
+    interceptor = RetryInterceptor(sleep=sleeps.append)
+    continuation, seen = failing_continuation([
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        grpc.StatusCode.OK,
+    ])
+    outcome = interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get"), None)
+    assert outcome.code() == grpc.StatusCode.OK
+    assert len(seen) == 3
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= 5.0 for delay in sleeps)
+
+
+def test_no_retry_for_unsafe_method_or_code():
+    interceptor = RetryInterceptor(sleep=lambda delay: None)
+    continuation, seen = failing_continuation([grpc.StatusCode.UNAVAILABLE])
+    interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Create"), None)
+    assert len(seen) == 1
+
+    continuation, seen = failing_continuation([grpc.StatusCode.NOT_FOUND])
+    outcome = interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get"), None)
+    assert outcome.code() == grpc.StatusCode.NOT_FOUND
+    assert len(seen) == 1
+
+
+def test_retry_stops_at_max_attempts():
+    interceptor = RetryInterceptor(policy=RetryPolicy(max_attempts=3), sleep=lambda delay: None)
+    continuation, seen = failing_continuation([grpc.StatusCode.UNAVAILABLE] * 5)
+    outcome = interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get"), None)
+    assert outcome.code() == grpc.StatusCode.UNAVAILABLE
+    assert len(seen) == 3
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(max_tokens=4, token_ratio=1)
+    interceptor = RetryInterceptor(budget=budget, sleep=lambda delay: None)
+    continuation, seen = failing_continuation([grpc.StatusCode.UNAVAILABLE] * 10)
+    interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get"), None)
+    # Tokens go 4 -> 3 (retry allowed) -> 2 (retry refused).
+    assert len(seen) == 2
+    assert not budget.allow_retry()
+    budget.on_success()
+    assert budget.allow_retry()
+
+
+def test_retry_backoff_respects_deadline():
+    policy = RetryPolicy(initial_backoff=10, max_backoff=10)
+    policy.backoff = lambda retry: 10
+    interceptor = RetryInterceptor(policy=policy, sleep=pytest.fail)
+    continuation, seen = failing_continuation([grpc.StatusCode.UNAVAILABLE] * 2)
+    interceptor.intercept_unary_unary(continuation, details("/api.DeviceService/Get", timeout=1), None)
+    assert len(seen) == 1
+
+
+class FlakyFuotaServer(fuota_pb2_grpc.FuotaServerServiceServicer):
+    def __init__(self, failures, code=grpc.StatusCode.UNAVAILABLE):
+        self.failures = failures
+        self.code = code
+        self.calls = 0
+
+    def GetDeploymentStatus(self, request, context):
+        self.calls += 1
+        if self.calls <= self.failures:
+            context.abort(self.code, "try again")
+        return fuota_pb2.GetDeploymentStatusResponse()
+
+
+@pytest.fixture
+def flaky_server():
+    def start(failures, code=grpc.StatusCode.UNAVAILABLE):
+        servicer = FlakyFuotaServer(failures, code)
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        fuota_pb2_grpc.add_FuotaServerServiceServicer_to_server(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        servers.append(server)
+        return servicer, f"127.0.0.1:{port}"
+
+    servers = []
+    yield start
+    for server in servers:
+        server.stop(None)
+
+
+def test_service_retries_through_real_channel(flaky_server):
+    servicer, address = flaky_server(failures=2)
+    interceptors = [DeadlineInterceptor(), RetryInterceptor(policy=RetryPolicy(initial_backoff=0.01))]
+    with ChannelPool(interceptors=interceptors) as pool:
+        service = FuotaService(address, "token", channel_pool=pool)
+        service.get_deployment_status("deployment_id")
+    assert servicer.calls == 3
+
+
+def test_service_error_keeps_status_code(flaky_server):
+    servicer, address = flaky_server(failures=1, code=grpc.StatusCode.NOT_FOUND)
+    with ChannelPool() as pool:
+        service = FuotaService(address, "token", channel_pool=pool)
+        with pytest.raises(ChirpstackRpcError, match="Failed to get FUOTA deployment status") as exc_info:
+            service.get_deployment_status("deployment_id")
+    assert exc_info.value.code == grpc.StatusCode.NOT_FOUND
+    assert exc_info.value.details == "try again"
+
+
+def test_async_service_retries_through_real_channel():
+    from grpc import aio
+
+    from chirpstack_fuota_client import AsyncChannelPool, AsyncFuotaService
+    from chirpstack_fuota_client.utils.interceptors import AsyncDeadlineInterceptor, AsyncRetryInterceptor
+
+    class AsyncFlakyFuotaServer(fuota_pb2_grpc.FuotaServerServiceServicer):
+        calls = 0
+
+        async def GetDeploymentStatus(self, request, context):
+            self.calls += 1
+            if self.calls <= 2:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+            return fuota_pb2.GetDeploymentStatusResponse()
+
+    async def main():
+        servicer = AsyncFlakyFuotaServer()
+        server = aio.server()
+        fuota_pb2_grpc.add_FuotaServerServiceServicer_to_server(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        interceptors = [AsyncDeadlineInterceptor(), AsyncRetryInterceptor(policy=RetryPolicy(initial_backoff=0.01))]
+        try:
+            async with AsyncChannelPool(interceptors=interceptors) as pool:
+                service = AsyncFuotaService(f"127.0.0.1:{port}", "token", channel_pool=pool)
+                await service.get_deployment_status("deployment_id")
+        finally:
+            await server.stop(None)
+        return servicer.calls
+
+    assert asyncio.run(main()) == 3
@@ -0,0 +1,103 @@
+import asyncio
+from concurrent import futures
+from types import SimpleNamespace
+
+import grpc
+import pytest
+
+from chirpstack_fuota_client import FuotaService, RpcMetrics
+from chirpstack_fuota_client.proto.fuota import fuota_pb2, fuota_pb2_grpc
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+from chirpstack_fuota_client.utils.metrics import AsyncMetricsInterceptor
+
+STATUS_METHOD = "/fuota.FuotaServerService/GetDeploymentStatus"
+LOGS_METHOD = "/fuota.FuotaServerService/GetDeploymentDeviceLogs"
+
+
+class FuotaServer(fuota_pb2_grpc.FuotaServerServiceServicer):
+    def GetDeploymentStatus(self, request, context):
+        return fuota_pb2.GetDeploymentStatusResponse(device_status=[fuota_pb2.DeploymentDeviceStatus(dev_eui="01")])
+
+    def GetDeploymentDeviceLogs(self, request, context):
+        context.abort(grpc.StatusCode.NOT_FOUND, "unknown device")
+
+
+@pytest.fixture
+def fuota_service():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    fuota_pb2_grpc.add_FuotaServerServiceServicer_to_server(FuotaServer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    metrics = RpcMetrics()
+    with ChannelPool(metrics=metrics) as pool:
+        yield FuotaService(f"127.0.0.1:{port}", "token", channel_pool=pool), metrics
+    server.stop(None)
+
+
+def test_metrics_snapshot(fuota_service):
+    service, metrics = fuota_service
+    service.get_deployment_status("deployment_id")
+    service.get_deployment_status("deployment_id")
+    with pytest.raises(Exception, match="Failed to get FUOTA deployment device logs"):
+        service.get_deployment_device_logs("deployment_id", "01")
+
+    snapshot = metrics.snapshot()
+    status = snapshot[STATUS_METHOD]
+    assert status["calls"] == 2
+    assert status["errors"] == {}
+    assert status["in_flight"] == 0
+    assert status["request_bytes"] == 2 * fuota_pb2.GetDeploymentStatusRequest(id="deployment_id").ByteSize()
+    assert status["response_bytes"] > 0
+    assert sum(status["latency_buckets"].values()) == 2
+
+    assert snapshot[LOGS_METHOD]["errors"] == {"NOT_FOUND": 1}
+
+
+def test_metrics_prometheus_text(fuota_service):
+    service, metrics = fuota_service
+    service.get_deployment_status("deployment_id")
+    text = metrics.to_prometheus()
+    assert "# TYPE chirpstack_client_rpc_latency_seconds histogram" in text
+    assert f'chirpstack_client_rpc_calls_total{{method="{STATUS_METHOD}"}} 1' in text
+    assert f'chirpstack_client_rpc_latency_seconds_bucket{{method="{STATUS_METHOD}",le="+Inf"}} 1' in text
+    assert f'chirpstack_client_rpc_latency_seconds_count{{method="{STATUS_METHOD}"}} 1' in text
+
+
+def test_metrics_reset():
+    metrics = RpcMetrics(buckets=(1.0,))
+    token = metrics.start(STATUS_METHOD, fuota_pb2.GetDeploymentStatusRequest())
+    assert metrics.snapshot()[STATUS_METHOD]["in_flight"] == 1
+    metrics.finish(token, grpc.StatusCode.UNAVAILABLE)
+    assert metrics.snapshot()[STATUS_METHOD]["errors"] == {"UNAVAILABLE": 1}
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_metrics_finish_after_reset():
+    metrics = RpcMetrics(buckets=(1.0,))
+    token = metrics.start(STATUS_METHOD, fuota_pb2.GetDeploymentStatusRequest())
+    metrics.reset()
+    metrics.finish(token, grpc.StatusCode.OK)
+    stats = metrics.snapshot()[STATUS_METHOD]
+    assert stats["calls"] == 1 and stats["in_flight"] == 0
+
+
+def test_async_metrics_record_failed_continuation():
+    metrics = RpcMetrics()
+    interceptor = AsyncMetricsInterceptor(metrics)
+    details = SimpleNamespace(method=STATUS_METHOD)
+    request = fuota_pb2.GetDeploymentStatusRequest()
+
+    async def broken(client_call_details, request):
+        raise RuntimeError("channel closed")
+
+    async def cancelled(client_call_details, request):
+        raise asyncio.CancelledError
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(interceptor.intercept_unary_unary(broken, details, request))
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(interceptor.intercept_unary_unary(cancelled, details, request))
+    stats = metrics.snapshot()[STATUS_METHOD]
+    assert stats["calls"] == 2 and stats["in_flight"] == 0
+    assert stats["errors"] == {"UNKNOWN": 1, "CANCELLED": 1}
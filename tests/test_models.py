@@ -0,0 +1,181 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+from chirpstack_api import api, common
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from chirpstack_fuota_client import models
+from chirpstack_fuota_client.proto.fuota import fuota_pb2 as fuota
+
+
+def timestamp(seconds, nanos=0):
+    return Timestamp(seconds=seconds, nanos=nanos)
+
+
+def test_device_from_list_item():
+    item = api.DeviceListItem(
+        dev_eui="0102030405060708",
+        name="meter",
+        device_profile_id="profile",
+        device_profile_name="Class A",
+        created_at=timestamp(1_700_000_000, 5),
+    )
+    device = models.Device.from_proto(item)
+    assert device.dev_eui == "0102030405060708"
+    assert device.name == "meter"
+    assert device.device_profile_name == "Class A"
+    assert device.application_id == ""
+    assert device.created_at == 1_700_000_000_000_000_005
+    assert device.updated_at is None
+    assert device.tags is None and device.device_status is None
+    assert device.class_enabled == "CLASS_A"
+    assert not hasattr(device, "__dict__")
+
+    item.device_status.battery_level = 87.5
+    device = models.from_proto(item)
+    assert device.device_status == models.DeviceStatus(battery_level=87.5)
+
+
+def test_device_from_get_response():
+    response = api.GetDeviceResponse(
+        device=api.Device(
+            dev_eui="0102030405060708",
+            name="meter",
+            application_id="app",
+            tags={"floor": "2"},
+            variables={"k": "v"},
+        ),
+        updated_at=timestamp(10),
+        class_enabled=common.DeviceClass.CLASS_C,
+    )
+    device = models.from_proto(response)
+    assert type(device) is models.Device
+    assert device.application_id == "app"
+    assert device.updated_at == 10_000_000_000
+    # Lazy fields come from the wrapped device and the response alike.
+    assert device.tags == {"floor": "2"}
+    assert device.variables == {"k": "v"}
+    assert device.class_enabled == "CLASS_C"
+
+    device.tags = {"floor": "3"}
+    assert device.tags == {"floor": "3"} and device.variables == {"k": "v"}
+
+
+def test_enums_and_nested_models():
+    gateway = models.Gateway.from_proto(
+        api.GatewayListItem(
+            gateway_id="ff" * 8,
+            name="roof",
+            state=api.GatewayState.ONLINE,
+            location=common.Location(latitude=1.5, source=common.LocationSource.GPS),
+        )
+    )
+    assert gateway.state == "ONLINE"
+    assert gateway.location == models.Location(latitude=1.5, source="GPS")
+    assert gateway.to_dict()["location"]["source"] == "GPS"
+
+    status = models.from_proto(
+        fuota.GetDeploymentStatusResponse(
+            created_at=timestamp(1),
+            device_status=[fuota.DeploymentDeviceStatus(dev_eui="01" * 8, mc_session_completed_at=timestamp(2))],
+        )
+    )
+    assert status.created_at == 1_000_000_000
+    (device_status,) = status.device_status
+    assert device_status.dev_eui == "01" * 8
+    assert device_status.mc_session_completed_at == 2_000_000_000
+    assert models.DeploymentStatus().device_status == ()
+
+
+def test_from_protos_interns_shared_strings():
+    items = [api.DeviceListItem(dev_eui=f"{i:016x}", name=f"dev-{i}", device_profile_id="profile") for i in range(3)]
+    devices = models.Device.from_protos(items)
+    assert [device.name for device in devices] == ["dev-0", "dev-1", "dev-2"]
+    assert devices[0].device_profile_id is devices[2].device_profile_id
+
+
+def test_conversion_errors():
+    with pytest.raises(TypeError, match="Cannot convert api.Gateway to Device"):
+        models.Device.from_proto(api.Gateway())
+    with pytest.raises(TypeError, match="No model for api.DeviceQueueItem"):
+        models.from_proto(api.DeviceQueueItem())
+    with pytest.raises(TypeError):
+        models.Device(name="missing dev_eui")
+
+
+def test_init_equality_and_pickle():
+    device = models.Device("0102030405060708", "meter", tags={"floor": "2"})
+    assert device.tags == {"floor": "2"} and device.variables is None
+    assert device != models.Device("0102030405060708", "meter")
+    assert "tags" not in repr(device)
+
+    converted = models.from_proto(api.Device(dev_eui="0102030405060708", name="meter", tags={"floor": "2"}))
+    assert converted == device
+    copy = pickle.loads(pickle.dumps(converted))  # noqa: S301
+    assert copy == device and copy.to_dict() == device.to_dict()
+
+
+def test_timestamps_are_packed():
+    device = models.Device("0102030405060708", "meter")
+    assert device.created_at is None and device._stamps is None
+    device.updated_at = 5
+    assert (device.created_at, device.updated_at, device.last_seen_at) == (None, 5, None)
+    assert len(device._stamps) == 24
+    device.updated_at = None
+    assert device._stamps is None
+
+    converted = models.from_proto(api.DeviceListItem(dev_eui="01" * 8, last_seen_at=timestamp(0)))
+    assert (converted.created_at, converted.last_seen_at) == (None, 0)
+    assert models.Device("01" * 8, "meter", last_seen_at=0) == models.Device.from_proto(
+        api.DeviceListItem(dev_eui="01" * 8, name="meter", last_seen_at=timestamp(0))
+    )
+    # Models without timestamps or lazy fields have no slot for them.
+    assert models.Location.__slots__ == ("latitude", "longitude", "altitude", "source", "accuracy")
+
+
+MEMORY_SCRIPT = """
+import gc, sys
+from chirpstack_api import api
+from google.protobuf.json_format import MessageToDict
+from chirpstack_fuota_client import models
+
+COUNT = 20_000
+response = api.ListDevicesResponse()
+for i in range(COUNT):
+    item = response.result.add(dev_eui=f"{i:016x}", name=f"meter-{i}", device_profile_name="Class A")
+    item.created_at.seconds = item.updated_at.seconds = 1_700_000_000 + i
+raw = response.SerializeToString()
+del response, item
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1])
+
+# The response is parsed before measuring, so only the records held are counted.
+items = list(api.ListDevicesResponse.FromString(raw).result)
+gc.collect()
+before = rss()
+if sys.argv[1] == "models":
+    held = models.Device.from_protos(items)
+elif sys.argv[1] == "messages":
+    held = [api.DeviceListItem.FromString(item.SerializeToString()) for item in items]
+else:
+    held = [MessageToDict(item, preserving_proto_field_name=True) for item in items]
+gc.collect()
+print(rss() - before)
+"""
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="Measures the resident memory on Linux")
+def test_models_take_less_memory_than_standalone_messages_and_dicts():
+    def pages(kind):
+        command = [sys.executable, "-c", MEMORY_SCRIPT, kind]
+        return int(subprocess.run(command, capture_output=True, text=True, check=True).stdout)  # noqa: S603
+
+    # About 330 bytes per model, 520 per message and 900 per dict.
+    held = pages("models")
+    assert held < pages("messages") * 0.8
+    assert held < pages("dicts") * 0.5
@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+import pytest
+from chirpstack_api import api
+
+from chirpstack_fuota_client.api.application import ApplicationService
+from chirpstack_fuota_client.api.device import DeviceService
+from chirpstack_fuota_client.utils.cache import LRUCache, NameCache
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def pool():
+    with ChannelPool() as pool:
+        yield pool
+
+
+def test_lru_cache_evicts_least_recently_used():
+    evicted = []
+    cache = LRUCache(maxsize=2, on_evict=lambda key, value: evicted.append(key))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert evicted == ["b"]
+    assert len(cache) == 2
+
+
+def test_lru_cache_ttl_expiry():
+    clock = FakeClock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_name_cache_invalidate_by_id():
+    cache = NameCache()
+    cache.put("device", "app", "node", "0011", "device")
+    assert cache.get("device", "app", "node") == "device"
+    assert cache.get("device", "other-app", "node") is None
+    cache.invalidate_id("device", "0011")
+    assert cache.get("device", "app", "node") is None
+
+
+def test_name_cache_rename_drops_old_name():
+    cache = NameCache()
+    cache.put("application", "tenant", "old", "id", "app")
+    cache.put("application", "tenant", "new", "id", "app")
+    assert cache.get("application", "tenant", "old") is None
+    assert cache.get("application", "tenant", "new") == "app"
+
+
+def test_name_cache_reused_name_forgets_old_id():
+    cache = NameCache()
+    cache.put("device", "app", "node", "0011", "old device")
+    cache.put("device", "app", "node", "0022", "new device")
+    # Invalidating the replaced object leaves the new one cached.
+    cache.invalidate_id("device", "0011")
+    assert cache.get("device", "app", "node") == "new device"
+    assert cache._ids == {("device", "0022"): ("device", "app", "node")}
+
+
+def test_repeated_create_uses_cache(pool):
+    cache = NameCache()
+    service = ApplicationService("localhost:50051", "token", channel_pool=pool, name_cache=cache)
+    service.stub = MagicMock()
+    service.stub.List.return_value = api.ListApplicationsResponse()
+    service.stub.Create.return_value = api.CreateApplicationResponse(id="app-id")
+
+    service.create("tenant", "app")
+    existing = service.create("tenant", "app")
+    assert existing.id == "app-id"
+    assert service.stub.List.call_count == 1
+    assert service.stub.Create.call_count == 1
+
+    service.delete("app-id")
+    assert cache.get("application", "tenant", "app") is None
+
+
+def test_iter_all_populates_cache(pool):
+    cache = NameCache()
+    service = DeviceService("localhost:50051", "token", channel_pool=pool, name_cache=cache)
+    service.stub = MagicMock()
+    devices = [api.DeviceListItem(dev_eui=f"{i:016x}", name=f"node-{i}") for i in range(3)]
+    service.stub.List.return_value = api.ListDevicesResponse(total_count=3, result=devices)
+
+    assert len(list(service.iter_all("app"))) == 3
+    service.stub.List.reset_mock()
+    assert service.get_by_name("app", "node-2").dev_eui == f"{2:016x}"
+    service.stub.List.assert_not_called()
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from chirpstack_api import api
+
+from chirpstack_fuota_client.api.tenant import TenantService
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+from chirpstack_fuota_client.utils.pagination import aiter_items, iter_items, iter_pages
+
+
+def make_fetch(total, calls=None):
+    def fetch_page(limit, offset):
+        if calls is not None:
+            calls.append((limit, offset))
+        items = [api.TenantListItem(id=str(i), name=f"tenant-{i}") for i in range(offset, min(offset + limit, total))]
+        return api.ListTenantsResponse(total_count=total, result=items)
+
+    return fetch_page
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+@pytest.mark.parametrize("total", [0, 1, 10, 25])
+def test_iter_items_yields_every_item_once(total, prefetch):
+    calls = []
+    items = list(iter_items(make_fetch(total, calls), page_size=10, prefetch=prefetch))
+    assert [item.id for item in items] == [str(i) for i in range(total)]
+    assert calls == [(10, offset) for offset in range(0, max(total, 1), 10)]
+
+
+def test_iter_pages_prefetches_next_page():
+    fetched = threading.Event()
+    fetch = make_fetch(20)
+
+    def fetch_page(limit, offset):
+        page = fetch(limit, offset)
+        if offset == 10:
+            fetched.set()
+        return page
+
+    pages = iter_pages(fetch_page, page_size=10)
+    next(pages)
+    # The second page is requested before the caller asks for it.
+    assert fetched.wait(timeout=1)
+    assert len(list(pages)) == 1
+
+
+def test_iter_items_is_lazy():
+    calls = []
+    items = iter_items(make_fetch(100, calls), page_size=10, prefetch=False)
+    next(items)
+    assert calls == [(10, 0)]
+
+
+def test_aiter_items():
+    async def fetch_page(limit, offset):
+        return make_fetch(25)(limit, offset)
+
+    async def collect():
+        return [item.id async for item in aiter_items(fetch_page, page_size=10)]
+
+    assert asyncio.run(collect()) == [str(i) for i in range(25)]
+
+
+def test_tenant_iter_all():
+    with ChannelPool() as pool:
+        service = TenantService("localhost:50051", "token", channel_pool=pool)
+        service.stub = MagicMock()
+        service.stub.List.side_effect = lambda req, metadata: make_fetch(7)(req.limit, req.offset)
+        assert len(list(service.iter_all(page_size=3))) == 7
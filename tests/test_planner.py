@@ -0,0 +1,82 @@
+import pytest
+
+from chirpstack_fuota_client.api.fuota.planner import (
+    data_rate,
+    find_fastest_plan,
+    frame_airtime,
+    plan_fragmentation,
+)
+from chirpstack_fuota_client.proto.fuota import fuota_pb2
+
+
+def test_frame_airtime():
+    # SF7/125kHz, 51 byte FRMPayload: 64 byte PHY payload, no downlink CRC.
+    assert frame_airtime("EU868", 5, 51) == pytest.approx(0.118016)
+    assert frame_airtime(fuota_pb2.Region.EU868, 0, 51) > frame_airtime("EU868", 5, 51)
+    with pytest.raises(ValueError):
+        frame_airtime("EU868", 0, 52)
+    with pytest.raises(ValueError):
+        frame_airtime("US915", 0, 10)
+
+
+def test_as923_payload_limits():
+    # N (application payload), not M: 242 bytes at DR5, fragments of up to 239 bytes.
+    assert data_rate("AS923", 5).max_payload == 242
+    assert data_rate("AS923_3", 0).max_payload == 51
+    frame_airtime("AS923", 5, 242)
+    with pytest.raises(ValueError):
+        frame_airtime("AS923", 5, 243)
+    assert find_fastest_plan(10000, "AS923", drs=[5]).fragment_size == 239
+
+
+@pytest.mark.parametrize(
+    ("region", "dr", "max_payload"),
+    [
+        ("EU868", 5, 242),
+        ("EU433", 7, 242),
+        ("CN779", 3, 115),
+        ("RU864", 6, 242),
+        ("US915", 8, 53),
+        ("AU915", 13, 242),
+        ("AS923_2", 4, 242),
+        ("KR920", 2, 51),
+        ("IN865", 7, 242),
+        ("CN470", 5, 242),
+    ],
+)
+def test_payload_limit_per_region(region, dr, max_payload):
+    # N without repeater in every region.
+    assert data_rate(region, dr).max_payload == max_payload
+
+
+def test_plan_fragmentation():
+    plan = plan_fragmentation(10000, "EU868", 5, 200, redundancy=10, frequency=869_525_000)
+    assert plan.fragments == 50
+    assert plan.duty_cycle == 0.1
+    assert plan.frame_interval == pytest.approx(plan.frame_airtime * 10)
+    assert plan.transfer_time == pytest.approx(59 * plan.frame_interval + plan.frame_airtime)
+    assert 2**plan.multicast_timeout >= plan.transfer_time > 2 ** (plan.multicast_timeout - 1)
+
+    config = plan.deployment_config(unicast_timeout=30)
+    assert config["fragmentation_fragment_size"] == 200
+    assert config["fragmentation_redundancy"] == 10
+    assert config["unicast_timeout"] == 30
+
+    with pytest.raises(ValueError, match="Fragment size"):
+        plan_fragmentation(10000, "EU868", 0, 49)
+    with pytest.raises(ValueError, match="multicast timeout"):
+        plan_fragmentation(10000, "EU868", 0, 48, redundancy=10)
+
+
+def test_find_fastest_plan():
+    plan = find_fastest_plan(10000, "US915")
+    assert plan.dr == 13
+    assert plan.fragment_size == 239
+    assert plan.redundancy == 5
+
+    slow = find_fastest_plan(10000, "EU868", drs=[3])
+    assert slow.fragment_size + 3 <= 115
+    assert slow.transfer_time > plan.transfer_time
+
+    with pytest.raises(ValueError, match="No valid fragmentation plan"):
+        find_fastest_plan(10000, "EU868", drs=[0], max_transfer_time=60)
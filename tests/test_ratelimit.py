@@ -0,0 +1,70 @@
+import pytest
+
+from chirpstack_fuota_client.utils.ratelimit import KeyedRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Clock advanced by the sleeps of the bucket, so waits are recorded instead of slept."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.1)
+    assert bucket.acquire() == pytest.approx(0.1)
+    # 20 more tokens at 10/s take 2 seconds.
+    for _ in range(20):
+        bucket.acquire()
+    assert clock.now == pytest.approx(2.2)
+
+
+def test_token_bucket_refills_up_to_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 60
+    for _ in range(3):
+        assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_reservations_queue_up():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+    # Without sleeping, every caller is given a later slot than the previous one.
+    assert [bucket.reserve() for _ in range(4)] == [0, 1, 2, 3]
+
+
+def test_token_bucket_validation():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, burst=0.5)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, burst=2).acquire(3)
+    with pytest.raises(ValueError):
+        KeyedRateLimiter(rate=-1)
+
+
+def test_keyed_rate_limiter_keeps_one_bucket_per_key():
+    clock = FakeClock()
+    limiter = KeyedRateLimiter(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire("gw-1") == 0
+    assert limiter.acquire("gw-2") == 0
+    assert limiter.acquire("gw-1") == pytest.approx(1)
+    assert len(limiter) == 2
+    assert limiter.bucket("gw-1") is limiter.bucket("gw-1")
@@ -0,0 +1,165 @@
+import grpc
+import pytest
+
+from chirpstack_fuota_client import Reconciler
+from chirpstack_fuota_client.testing import FakeChirpstackServer
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+
+KEY = "00" * 16
+
+
+def device(i, profile="class-a", **kwargs):
+    return dict(
+        name=f"dev-{i}",
+        dev_eui=f"{i:016x}",
+        device_profile=profile,
+        app_key=KEY,
+        mac_version="LORAWAN_1_0_3",
+        **kwargs,
+    )
+
+
+def desired_state(devices=10):
+    return {
+        "tenants": [
+            {
+                "name": "acme",
+                "device_profiles": [
+                    {"name": "class-a", "region": "EU868", "mac_version": "LORAWAN_1_0_3", "supports_otaa": True},
+                    {"name": "class-c", "region": "EU868", "mac_version": "LORAWAN_1_0_3", "supports_class_c": True},
+                ],
+                "applications": [
+                    {"name": "meters", "description": "Water meters", "devices": [device(i) for i in range(devices)]},
+                    {"name": "valves", "devices": [device(100, "class-c")]},
+                ],
+                "gateways": [{"gateway_id": "aa" * 8, "name": "roof", "location": {"latitude": 1.5}}],
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def pool():
+    with ChannelPool() as pool:
+        yield pool
+
+
+def writes(server):
+    return sum(count for method, count in server.calls.items() if not method.endswith(("/List", "/Get")))
+
+
+def test_reconcile_creates_then_converges(pool):
+    with FakeChirpstackServer(api_token="token") as server:
+        reconciler = Reconciler(server.address, "token", channel_pool=pool, page_size=4)
+
+        plan = reconciler.reconcile(desired_state())
+        assert not plan.failed
+        assert plan.summary() == {
+            "tenant": {"create": 1},
+            "device_profile": {"create": 2},
+            "application": {"create": 2},
+            "gateway": {"create": 1},
+            "device": {"create": 11},
+        }
+        state = server.state
+        assert len(state.devices) == 11 and len(state.device_keys) == 11
+        profiles = {r.obj.name: r.obj.id for r in state.device_profiles.values()}
+        assert state.devices[f"{100:016x}"].obj.device_profile_id == profiles["class-c"]
+        assert state.gateways["aa" * 8].obj.location.latitude == 1.5
+
+        # Nothing left to do: only List calls, one per page.
+        server.calls.clear()
+        plan = reconciler.plan(desired_state())
+        assert len(plan) == 0
+        assert plan.listed == 17
+        assert writes(server) == 0
+        assert server.calls["/api.DeviceService/List"] == 4
+
+
+def test_reconcile_applies_only_the_difference(pool):
+    with FakeChirpstackServer(api_token="token") as server:
+        reconciler = Reconciler(server.address, "token", channel_pool=pool)
+        reconciler.reconcile(desired_state()).raise_for_errors()
+
+        desired = desired_state()
+        tenant = desired["tenants"][0]
+        meters, valves = tenant["applications"]
+        meters["devices"][3]["name"] = "renamed"
+        meters["devices"][4]["device_profile"] = "class-c"
+        meters["devices"].append(device(10))
+        # Moved to another application.
+        valves["devices"].append(meters["devices"].pop(0))
+        tenant["gateways"][0]["location"] = {"latitude": 2.5}
+
+        server.calls.clear()
+        plan = reconciler.plan(desired)
+        assert plan.summary() == {
+            "gateway": {"update": 1},
+            "device": {"create": 2, "delete": 1, "update": 2},
+        }
+        updates = {change.key: change.fields for change in plan.changes if change.action == "update"}
+        assert updates == {
+            "aa" * 8: ["location"],
+            f"{3:016x}": ["name"],
+            f"{4:016x}": ["device_profile_id"],
+        }
+        reconciler.apply(plan).raise_for_errors()
+        # The device delete of the move comes before its create in the other application.
+        assert server.state.devices[f"{0:016x}"].obj.application_id == plan.ids["application", ("acme", "valves")]
+        assert server.state.devices[f"{3:016x}"].obj.name == "renamed"
+        assert len(server.state.devices) == 12
+        assert writes(server) == 1 + 2 * 2 + 2 * 2 + 1
+        assert len(reconciler.plan(desired)) == 0
+
+
+def test_reconcile_prune(pool):
+    with FakeChirpstackServer(api_token="token") as server:
+        reconciler = Reconciler(server.address, "token", channel_pool=pool)
+        reconciler.reconcile(desired_state()).raise_for_errors()
+
+        desired = desired_state(devices=5)
+        tenant = desired["tenants"][0]
+        tenant["applications"].pop()
+        tenant["device_profiles"].pop()
+        tenant["gateways"] = []
+
+        assert len(reconciler.plan(desired)) == 0
+        plan = reconciler.reconcile(desired, prune=True)
+        assert not plan.failed
+        # The device of the deleted application goes along with it.
+        assert plan.summary() == {
+            "device_profile": {"delete": 1},
+            "application": {"delete": 1},
+            "gateway": {"delete": 1},
+            "device": {"delete": 5},
+        }
+        assert sorted(server.state.devices) == [f"{i:016x}" for i in range(5)]
+        assert [r.obj.name for r in server.state.device_profiles.values()] == ["class-a"]
+        assert not server.state.gateways
+        assert len(reconciler.plan(desired, prune=True)) == 0
+
+
+def test_reconcile_failed_parent_fails_children(pool):
+    with FakeChirpstackServer(api_token="token") as server:
+        reconciler = Reconciler(server.address, "token", channel_pool=pool)
+        server.fail_next("/api.ApplicationService/Create", grpc.StatusCode.UNAVAILABLE, count=1)
+
+        desired = desired_state(devices=3)
+        desired["tenants"][0]["applications"].pop()
+        plan = reconciler.reconcile(desired)
+        failed = {(change.kind, change.key) for change in plan.failed}
+        assert failed == {("application", ("acme", "meters"))} | {("device", f"{i:016x}") for i in range(3)}
+        assert isinstance(plan.failed[-1].error, LookupError)
+
+        # A second run picks up where the first one failed.
+        plan = reconciler.reconcile(desired)
+        assert plan.summary() == {"application": {"create": 1}, "device": {"create": 3}}
+        assert not plan.failed
+
+
+def test_plan_rejects_duplicates(pool):
+    desired = desired_state(devices=2)
+    desired["tenants"][0]["applications"][1]["devices"].append(device(1))
+    reconciler = Reconciler("localhost:1", "token", channel_pool=pool)
+    with pytest.raises(ValueError, match="Duplicate device"):
+        reconciler.plan(desired)
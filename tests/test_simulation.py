@@ -0,0 +1,44 @@
+import pytest
+
+from chirpstack_fuota_client.api.fuota.fragmentation import decode, encode, parity_matrix
+from chirpstack_fuota_client.api.fuota.simulation import _reconstructs, simulate_deployment, simulate_session
+from chirpstack_fuota_client.api.fuota.utils import FuotaUtils
+
+# numpy is an optional extra.
+np = pytest.importorskip("numpy")
+
+
+def test_reconstructs_matches_decoder():
+    fragments, redundancy = 40, 12
+    rng = np.random.default_rng(0)
+    received = rng.random((200, fragments + redundancy)) >= 0.15
+    payload = rng.integers(0, 256, fragments * 4, dtype=np.uint8).tobytes()
+    encoded = encode(payload, 4, redundancy)
+
+    expected = []
+    for trial in received:
+        frames = {i + 1: encoded[i].tobytes() for i in np.flatnonzero(trial)}
+        try:
+            expected.append(decode(frames, fragments) == payload)
+        except ValueError:
+            expected.append(False)
+
+    result = _reconstructs(np, parity_matrix(fragments, redundancy), received)
+    assert result.tolist() == expected
+    assert 0 < result.mean() < 1
+
+
+def test_simulate_session():
+    assert simulate_session(100, 0, 0.0, trials=10, seed=1) == 1.0
+    assert simulate_session(100, 0, 0.05, trials=200, seed=1) < 0.05
+    assert simulate_session(100, 30, 0.05, trials=200, seed=1) > 0.95
+
+
+def test_simulate_deployment():
+    config = FuotaUtils.create_deployment_config(fragmentation_fragment_size=50, fragmentation_redundancy=10)
+    result = simulate_deployment(5000, config, {"near": (900, 0.01), "far": (100, 0.3)}, trials=200, seed=1)
+    assert result.fragments == 100
+    assert result.success_probability["near"] > 0.99
+    assert result.success_probability["far"] == 0.0
+    assert result.fallback_devices["far"] == 100
+    assert result.expected_fallback_devices >= 100
@@ -0,0 +1,161 @@
+import os
+
+import pytest
+
+from chirpstack_fuota_client import (
+    ApplicationService,
+    DeviceService,
+    GatewayService,
+    Snapshot,
+    SnapshotExporter,
+    TenantService,
+)
+from chirpstack_fuota_client.testing import FakeChirpstackServer
+from chirpstack_fuota_client.utils.channel_pool import ChannelPool
+
+# numpy is an optional extra.
+np = pytest.importorskip("numpy")
+
+KEY = "00" * 16
+
+
+@pytest.fixture
+def pool():
+    with ChannelPool() as pool:
+        yield pool
+
+
+@pytest.fixture
+def server():
+    with FakeChirpstackServer(api_token="token") as server:
+        yield server
+
+
+def populate(server, pool, devices=25):
+    tenant_id = TenantService(server.address, "token", channel_pool=pool).create("acme").id
+    applications = ApplicationService(server.address, "token", channel_pool=pool)
+    meters = applications.create(tenant_id, "meters", "Water meters").id
+    valves = applications.create(tenant_id, "valves").id
+    device_service = DeviceService(server.address, "token", channel_pool=pool)
+    for i in range(devices):
+        device_service.create(
+            meters if i % 5 else valves, f"dev-{i}", f"{i:016x}", KEY, "LORAWAN_1_0_3", device_profile_id="profile"
+        )
+    gateways = GatewayService(server.address, "token", channel_pool=pool)
+    gateways.create(tenant_id, "ff" * 8, "roof", location={"latitude": 1.5, "longitude": 2.5})
+    return tenant_id, meters, valves
+
+
+def test_export(server, pool, tmp_path):
+    tenant_id, meters, valves = populate(server, pool)
+    exporter = SnapshotExporter(server.address, "token", channel_pool=pool, page_size=4)
+    snapshot = exporter.export(tenant_id, str(tmp_path))
+    assert snapshot.changes["devices"] == {"added": 25, "updated": 0, "removed": 0}
+
+    snapshot = Snapshot(str(tmp_path))
+    assert snapshot.tenant_id == tenant_id
+    devices = snapshot["devices"]
+    assert len(devices) == 25
+    assert isinstance(devices["dev_eui"], np.memmap)
+    assert devices["dev_eui"].dtype == np.uint64
+    assert sorted(devices.decode("dev_eui")) == [f"{i:016x}" for i in range(25)]
+    # Few distinct strings take a few codes.
+    assert len(devices.dictionary("application_id")) == 2
+    assert len(devices.dictionary("device_profile_id")) == 1
+    assert np.count_nonzero(devices.equals("application_id", valves)) == 5
+    assert np.count_nonzero(devices.equals("application_id", "unknown")) == 0
+    row = np.flatnonzero(devices.equals("dev_eui", f"{7:016x}"))[0]
+    assert devices.decode("name")[row] == "dev-7"
+    assert devices.decode("application_id")[row] == meters
+    assert devices["created_at"].dtype == np.dtype("datetime64[ns]")
+    assert not np.isnat(devices["updated_at"]).any()
+    assert np.isnat(devices["last_seen_at"]).all()
+    assert np.isnan(devices["battery_level"]).all()
+
+    applications = snapshot["applications"]
+    assert sorted(applications.decode("name")) == ["meters", "valves"]
+    assert applications.decode("description")[applications.equals("id", meters)][0] == "Water meters"
+    gateways = snapshot["gateways"]
+    assert list(gateways.decode("gateway_id")) == ["ff" * 8]
+    assert gateways["latitude"][0] == 1.5 and gateways["longitude"][0] == 2.5
+
+
+def files(snapshot, table, column):
+    return snapshot.manifest["tables"][table]["columns"][column]
+
+
+def all_files(snapshot):
+    return {
+        column[role]
+        for meta in snapshot.manifest["tables"].values()
+        for column in meta["columns"].values()
+        for role in ("file", "dictionary")
+        if role in column
+    }
+
+
+def test_refresh(server, pool, tmp_path):
+    tenant_id, meters, _ = populate(server, pool)
+    exporter = SnapshotExporter(server.address, "token", channel_pool=pool)
+    snapshot = exporter.export(tenant_id, str(tmp_path))
+    codes = np.array(snapshot["devices"]["name"])
+    names = snapshot["devices"].dictionary("name").tolist()
+
+    def inode(file):
+        return os.stat(tmp_path / file).st_ino
+
+    inodes = {file: inode(file) for file in os.listdir(tmp_path)}
+
+    # Nothing changed: no column file is rewritten.
+    refreshed = exporter.refresh(str(tmp_path))
+    assert refreshed.changes["devices"] == {"added": 0, "updated": 0, "removed": 0}
+    assert refreshed.manifest["tables"] == snapshot.manifest["tables"]
+    assert {file: inode(file) for file in os.listdir(tmp_path) if file != "manifest.json"} == {
+        file: ino for file, ino in inodes.items() if file != "manifest.json"
+    }
+
+    devices = DeviceService(server.address, "token", channel_pool=pool)
+    devices.update(f"{3:016x}", "renamed", KEY, "LORAWAN_1_0_3", application_id=meters)
+    devices.delete(f"{4:016x}")
+    devices.create(meters, "dev-new", f"{100:016x}", KEY, "LORAWAN_1_0_3")
+
+    refreshed = exporter.refresh(str(tmp_path))
+    assert refreshed.changes == {
+        "applications": {"added": 0, "updated": 0, "removed": 0},
+        "devices": {"added": 1, "updated": 1, "removed": 1},
+        "gateways": {"added": 0, "updated": 0, "removed": 0},
+    }
+    table = refreshed["devices"]
+    assert len(table) == 25
+    assert "renamed" in table.decode("name") and "dev-4" not in table.decode("name")
+    # Dictionaries only grow, so codes from the previous snapshot still decode the same.
+    assert table.dictionary("name").tolist()[: len(names)] == names
+    assert [names[code] for code in codes] == [str(name) for name in table.dictionary("name")[codes]]
+    assert files(refreshed, "applications", "name") == files(snapshot, "applications", "name")
+    assert files(refreshed, "devices", "name")["file"] != files(snapshot, "devices", "name")["file"]
+
+
+def test_refresh_keeps_open_snapshot_consistent(server, pool, tmp_path):
+    tenant_id, meters, _ = populate(server, pool)
+    exporter = SnapshotExporter(server.address, "token", channel_pool=pool)
+    snapshot = exporter.export(tenant_id, str(tmp_path))
+    devices = DeviceService(server.address, "token", channel_pool=pool)
+    devices.update(f"{3:016x}", "renamed", KEY, "LORAWAN_1_0_3", application_id=meters)
+    devices.delete(f"{4:016x}")
+
+    previous = exporter.refresh(str(tmp_path))
+    # Columns first mapped after the refresh still match the manifest the snapshot was opened with.
+    assert len(snapshot["devices"]["name"]) == len(snapshot["devices"]) == 25
+    assert "dev-3" in snapshot["devices"].decode("name")
+
+    # The next refresh removes the files used by neither the new snapshot nor the previous one.
+    refreshed = exporter.refresh(str(tmp_path))
+    assert refreshed.manifest["generation"] == 2
+    assert not os.path.exists(tmp_path / files(snapshot, "devices", "name")["file"])
+    assert set(os.listdir(tmp_path)) == all_files(refreshed) | all_files(previous) | {"manifest.json"}
+
+
+def test_open_rejects_other_directories(tmp_path):
+    (tmp_path / "manifest.json").write_text('{"format": "other"}')
+    with pytest.raises(ValueError, match="not a version 1 snapshot"):
+        Snapshot(str(tmp_path))